@@ -0,0 +1,249 @@
+# benchmarks/run_benchmarks.py
+"""
+Benchmarks des fonctions chaudes du jeu sur des parties synthétiques (cf. scenarios.py), sans fenêtre
+(driver SDL "dummy"). Chaque benchmark est répété; le débit (opérations / seconde) est comparé à une
+référence enregistrée pour signaler les régressions.
+
+    python benchmarks/run_benchmarks.py                      # scénario medium, comparé à baseline.json
+    python benchmarks/run_benchmarks.py --size all --repeat 7
+    python benchmarks/run_benchmarks.py --save-baseline      # enregistre les résultats comme référence
+
+Code de sortie 1 si au moins un benchmark est plus lent que la référence au-delà de --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)  # Chemins des assets relatifs à la racine du projet
+
+import pygame
+import game_config as cfg
+import settings
+import quality_governor
+import objects
+import scenarios
+
+DEFAULT_BASELINE_PATH = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+SIM_DELTA_TIME = 1.0 / 60
+
+
+# Chaque benchmark: setup(game_state) -> (fonction mesurée, opérations par appel).
+# mutates_state: la partie évolue à chaque appel, elle est reconstruite avant chaque répétition.
+
+def setup_find_target(game_state):
+    turrets, enemies = game_state.turrets, game_state.enemies
+
+    def run():
+        for turret in turrets: turret.find_target(enemies)
+
+    return run, len(turrets)
+
+
+def setup_handle_collisions(game_state):
+    scenarios.make_enemies_invulnerable(game_state)
+    projectiles = list(game_state.projectiles)
+
+    def run():
+        game_state.handle_collisions()
+        for projectile in projectiles: projectile.active = True  # Mêmes projectiles à chaque appel
+
+    return run, 1
+
+
+def setup_trigger_aoe_damage(game_state):
+    field_rect = scenarios.get_field_rect(game_state)
+    radius = game_state.scaler.tile_size * 3
+
+    def run():
+        game_state.trigger_aoe_damage(field_rect.center, radius, 0)
+
+    return run, 1
+
+
+def setup_update_resource_production_consumption(game_state):
+    return game_state.update_resource_production_consumption, 1
+
+
+def setup_draw_game_world(game_state):
+    return game_state.draw_game_world, 1
+
+
+def setup_compute_mortar_launch_angles(game_state):
+    mortar = next(turret for turret in game_state.turrets if turret.type == "mortar_turret")
+    v0 = mortar.projectile_initial_speed
+    targets = [(enemy.rect.centerx - mortar.rect.centerx, mortar.rect.centery - enemy.rect.centery)
+               for enemy in game_state.enemies]
+
+    def run():
+        for relative_x, relative_y in targets: objects.compute_mortar_launch_angles_rad(relative_x, relative_y, v0)
+
+    return run, len(targets)
+
+
+def setup_sim_tick(game_state):
+    def run():
+        game_state.update_game_logic(SIM_DELTA_TIME)
+
+    return run, 1
+
+
+def setup_full_frame(game_state):
+    def run():
+        game_state.update_game_logic(SIM_DELTA_TIME)
+        game_state.draw_game_world()
+
+    return run, 1
+
+
+BENCHMARKS = [
+    {"name": "find_target", "setup": setup_find_target, "mutates_state": False},
+    {"name": "handle_collisions", "setup": setup_handle_collisions, "mutates_state": False},
+    {"name": "trigger_aoe_damage", "setup": setup_trigger_aoe_damage, "mutates_state": False},
+    {"name": "update_resource_production_consumption", "setup": setup_update_resource_production_consumption,
+     "mutates_state": False},
+    {"name": "draw_game_world", "setup": setup_draw_game_world, "mutates_state": False},
+    {"name": "compute_mortar_launch_angles_rad", "setup": setup_compute_mortar_launch_angles, "mutates_state": False},
+    {"name": "sim_tick", "setup": setup_sim_tick, "mutates_state": True},
+    {"name": "full_frame", "setup": setup_full_frame, "mutates_state": True},
+]
+
+
+def time_calls(run, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations): run()
+    return time.perf_counter() - start
+
+
+def run_benchmark(benchmark, size_name, repeat, min_time):
+    # Nombre d'appels calibré pour que chaque répétition dure au moins min_time
+    game_state = scenarios.build_scenario(size_name)
+    run, ops_per_call = benchmark["setup"](game_state)
+    run()  # Premier appel hors mesure: chargements et mises à l'échelle paresseux (sprites, projectiles)
+    iterations = 1
+    while True:
+        elapsed = time_calls(run, iterations)
+        if elapsed >= min_time or iterations >= 1 << 20: break
+        iterations *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    ops_per_sec_samples = []
+    for _ in range(repeat):
+        if benchmark["mutates_state"]:
+            run, ops_per_call = benchmark["setup"](scenarios.build_scenario(size_name))
+            run()
+        elapsed = time_calls(run, iterations)
+        ops_per_sec_samples.append(iterations * ops_per_call / elapsed if elapsed > 0 else float("inf"))
+    return {
+        "iterations": iterations,
+        "ops_per_call": ops_per_call,
+        "ops_per_sec_median": statistics.median(ops_per_sec_samples),
+        "ops_per_sec_mean": statistics.fmean(ops_per_sec_samples),
+        "ops_per_sec_stdev": statistics.stdev(ops_per_sec_samples) if len(ops_per_sec_samples) > 1 else 0.0,
+        "ops_per_sec_min": min(ops_per_sec_samples),
+        "ops_per_sec_max": max(ops_per_sec_samples),
+    }
+
+
+def compare_to_baseline(results, baseline_results, tolerance):
+    # Retourne {clé: (ratio, verdict)}; ratio = débit actuel / débit de référence (médianes)
+    comparisons = {}
+    for key, result in results.items():
+        baseline_result = baseline_results.get(key)
+        if not baseline_result or not baseline_result.get("ops_per_sec_median"): continue
+        ratio = result["ops_per_sec_median"] / baseline_result["ops_per_sec_median"]
+        verdict = "REGRESSION" if ratio < 1 - tolerance else "plus rapide" if ratio > 1 + tolerance else "ok"
+        comparisons[key] = (ratio, verdict)
+    return comparisons
+
+
+def load_baseline(path):
+    # Retourne le fichier de référence entier ({} si absent ou illisible)
+    try:
+        with open(path, "r", encoding="utf-8") as baseline_file:
+            return json.load(baseline_file)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"AVERTISSEMENT: Référence illisible ({path}): {e}")
+        return {}
+
+
+def apply_benchmark_settings():
+    # Réglages de l'écran Options (préréglage "high") sans surcouches de debug. cfg.DEBUG_OVERLAYS est dérivé
+    # de DEBUG_MODE à l'import de game_config: remettre DEBUG_MODE à False ne l'éteint pas.
+    benchmark_settings = settings.get_default_settings()
+    benchmark_settings["debug_overlays"] = False
+    settings.apply_settings(benchmark_settings)
+    quality_governor.governor.level = quality_governor.LEVEL_FULL
+    return {key: value for key, value in benchmark_settings.items() if key != "preset"}
+
+
+def get_machine_info(benchmark_settings):
+    # Les réglages font partie de la référence: des résultats mesurés avec d'autres réglages ne se comparent pas
+    return {"platform": platform.platform(), "python": sys.version.split()[0], "pygame": pygame.version.ver,
+            "processor": platform.processor(), "settings": benchmark_settings,
+            "large_battlefield": cfg.LARGE_BATTLEFIELD_MODE, "quality_level": quality_governor.governor.level}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks des fonctions chaudes sur des parties synthétiques.")
+    parser.add_argument("--size", default="medium", choices=sorted(scenarios.SCENARIO_SIZES) + ["all"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="durée minimale d'une répétition (s)")
+    parser.add_argument("--filter", default="", help="ne lance que les benchmarks dont le nom contient ce texte")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="enregistre les résultats comme référence")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="écart toléré avant de signaler (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    cfg.DEBUG_MODE = False
+    machine_info = get_machine_info(apply_benchmark_settings())
+    size_names = list(scenarios.SCENARIO_SIZES) if args.size == "all" else [args.size]
+    baseline = {} if args.save_baseline else load_baseline(args.baseline)
+    baseline_results = baseline.get("results", {})
+    baseline_settings = {key: baseline.get("machine", {}).get(key)
+                         for key in ("settings", "large_battlefield", "quality_level")}
+    current_settings = {key: machine_info[key] for key in baseline_settings}
+    if baseline_results and baseline_settings != current_settings:
+        print(f"AVERTISSEMENT: Référence mesurée avec d'autres réglages ({baseline_settings}), "
+              f"comparaison peu fiable: relancer avec --save-baseline")
+    results = {}
+    for size_name in size_names:
+        print(f"--- Scénario {size_name}: (tourelles par type, ennemis, projectiles) = "
+              f"{scenarios.SCENARIO_SIZES[size_name]}")
+        for benchmark in BENCHMARKS:
+            if args.filter not in benchmark["name"]: continue
+            key = f"{size_name}/{benchmark['name']}"
+            result = results[key] = run_benchmark(benchmark, size_name, max(1, args.repeat), args.min_time)
+            comparison = compare_to_baseline({key: result}, baseline_results, args.tolerance).get(key)
+            comparison_text = f"  x{comparison[0]:.2f} {comparison[1]}" if comparison else ""
+            print(f"{benchmark['name']:<40} {result['ops_per_sec_median']:>14,.1f} ops/s "
+                  f"(±{result['ops_per_sec_stdev']:,.1f}, min {result['ops_per_sec_min']:,.1f}){comparison_text}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({"machine": machine_info, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "results": results}, baseline_file, indent=2)
+        print(f"Référence enregistrée: {args.baseline}")
+        return 0
+    if not baseline_results:
+        print(f"Pas de référence ({args.baseline}): relancer avec --save-baseline pour en créer une.")
+        return 0
+    regressions = [key for key, (_, verdict) in compare_to_baseline(results, baseline_results, args.tolerance).items()
+                   if verdict == "REGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} régression(s): {', '.join(regressions)}")
+        return 1
+    print("Aucune régression par rapport à la référence.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
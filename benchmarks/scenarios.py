@@ -0,0 +1,112 @@
+# benchmarks/scenarios.py
+# Parties synthétiques pour les benchmarks: grille remplie, N tourelles de chaque type, M ennemis
+# répartis sur le champ de bataille, P projectiles en vol. Tout est construit par les chemins du jeu
+# (try_place_items_on_tiles, spawn_enemy, Projectile) pour mesurer le code tel qu'il tourne en partie.
+import math
+import random
+import pygame
+import game_config as cfg
+import utility_functions as util
+import game_functions
+import objects
+
+TURRET_TYPES = ("machine_gun_turret", "mortar_turret", "flamethrower_turret", "sniper_turret")
+ENEMY_TYPE_IDS = (1, 2, 3)
+
+# Tailles des scénarios: (tourelles par type, ennemis, projectiles)
+SCENARIO_SIZES = {
+    "small": (2, 20, 20),
+    "medium": (4, 60, 80),
+    "large": (8, 150, 250),
+}
+
+
+class BenchmarkClock:
+    # Remplace pygame.time.Clock: les benchmarks fixent eux-mêmes le pas de simulation
+    def tick(self, framerate=0): return 0
+    def get_fps(self): return 0.0
+    def get_rawtime(self): return 0
+    def get_time(self): return 0
+
+
+def create_screen():
+    if not pygame.get_init(): pygame.init()
+    screen = pygame.display.get_surface()
+    if screen is None: screen = pygame.display.set_mode((cfg.REF_WIDTH, cfg.REF_HEIGHT))
+    return screen
+
+
+def expand_grid_fully(game_state):
+    for direction in ("up", "side"):
+        while game_state.get_next_expansion_cost(direction) != "Max":
+            game_state.try_expand_build_area(direction)
+
+
+def get_grid_tiles_bottom_up(game_state):
+    return [(r, c) for r in range(game_state.grid_bottom_row, game_state.grid_origin_row - 1, -1)
+            for c in range(game_state.grid_width_tiles)]
+
+
+def place_base(game_state, turrets_per_type):
+    # Frames partout, puis assez de générateurs pour alimenter toutes les tourelles, puis les tourelles
+    expand_grid_fully(game_state)
+    tiles = get_grid_tiles_bottom_up(game_state)
+    game_state.try_place_items_on_tiles("frame", tiles)
+    power_needed = sum(objects.get_item_stats(turret_type).get(cfg.STAT_POWER_CONSUMPTION, 0) * turrets_per_type
+                       for turret_type in TURRET_TYPES)
+    generator_power = objects.get_item_stats("generator").get(cfg.STAT_POWER_PRODUCTION, 0)
+    generator_count = math.ceil(power_needed / generator_power) if generator_power > 0 else 0
+    turret_count = turrets_per_type * len(TURRET_TYPES)
+    if generator_count + turret_count > len(tiles):
+        raise ValueError(f"Grille trop petite: {len(tiles)} cases pour {generator_count} générateurs "
+                         f"et {turret_count} tourelles")
+    game_state.try_place_items_on_tiles("generator", tiles[:generator_count])
+    turret_tiles = iter(tiles[generator_count:])
+    for turret_type in TURRET_TYPES:
+        game_state.try_place_items_on_tiles(turret_type, [next(turret_tiles) for _ in range(turrets_per_type)])
+
+
+def get_field_rect(game_state):
+    # Champ de bataille: de la base au bord droit de la zone de jeu, entre la barre du haut et le menu
+    scaler = game_state.scaler
+    top = scaler.screen_origin_y + scaler.ui_top_bar_height
+    bottom = scaler.screen_origin_y + scaler.usable_h - scaler.ui_build_menu_height
+    left = game_state.buildable_area_rect_pixels.right
+    right = scaler.screen_origin_x + scaler.usable_w
+    return pygame.Rect(left, top, max(1, right - left), max(1, bottom - top))
+
+
+def spread_enemies(game_state, enemy_count, rng):
+    field_rect = get_field_rect(game_state)
+    for i in range(enemy_count):
+        game_state.spawn_enemy(ENEMY_TYPE_IDS[i % len(ENEMY_TYPE_IDS)])
+        enemy = game_state.enemies[-1]
+        enemy.set_position((rng.randint(field_rect.left, field_rect.right), rng.randint(field_rect.top, field_rect.bottom)))
+
+
+def spread_projectiles(game_state, projectile_count, rng):
+    field_rect = get_field_rect(game_state)
+    for _ in range(projectile_count):
+        origin = (rng.randint(field_rect.left, field_rect.right), rng.randint(field_rect.top, field_rect.bottom))
+        game_state.projectiles.append(objects.Projectile("bullet", origin, rng.uniform(-30, 30), game_state.scaler))
+
+
+def build_scenario(size_name, seed=0):
+    turrets_per_type, enemy_count, projectile_count = SCENARIO_SIZES[size_name]
+    screen = create_screen()
+    game_state = game_functions.GameState(util.Scaler(*screen.get_size()))
+    game_state.init_new_game(screen, BenchmarkClock(), seed=seed)
+    game_state.money = 10 ** 9
+    game_state.iron_stock = 10 ** 9  # Ramené à la capacité au premier tick: assez pour un benchmark
+    place_base(game_state, turrets_per_type)
+    rng = random.Random(seed)
+    spread_enemies(game_state, enemy_count, rng)
+    spread_projectiles(game_state, projectile_count, rng)
+    game_state.time_to_next_wave_seconds = float("inf")  # Seuls les ennemis du scénario sont simulés
+    return game_state
+
+
+def make_enemies_invulnerable(game_state):
+    # Pour les benchmarks qui appliquent des dégâts: la scène reste identique d'une itération à l'autre
+    for enemy in game_state.enemies:
+        enemy.max_hp = enemy.current_hp = float("inf")
@@ -0,0 +1,123 @@
+# camera.py
+import pygame
+import game_config as cfg
+import utility_functions as util
+
+
+class Camera:
+    """
+    Vue sur le monde, posée au-dessus du Scaler. Les positions des objets (rect) sont en coordonnées
+    monde; l'écran montre le rectangle view_rect de ce monde. Tant que le monde tient dans l'écran,
+    l'offset reste (0, 0) et coordonnées monde et écran sont identiques.
+    """
+
+    def __init__(self, scaler: util.Scaler):
+        self.scaler = scaler
+        self.offset_x, self.offset_y = 0, 0
+        self.world_rect = pygame.Rect(0, 0, scaler.actual_w, scaler.actual_h)
+
+    @property
+    def offset(self):
+        return self.offset_x, self.offset_y
+
+    def get_view_rect(self):
+        return pygame.Rect(self.offset_x, self.offset_y, self.scaler.actual_w, self.scaler.actual_h)
+
+    def set_world_rect(self, world_rect):
+        # Le monde couvre toujours au moins l'écran
+        self.world_rect = world_rect.union(pygame.Rect(0, 0, self.scaler.actual_w, self.scaler.actual_h))
+        self.clamp()
+
+    def clamp(self):
+        max_x = self.world_rect.right - self.scaler.actual_w
+        max_y = self.world_rect.bottom - self.scaler.actual_h
+        self.offset_x = int(min(max(self.offset_x, self.world_rect.left), max_x))
+        self.offset_y = int(min(max(self.offset_y, self.world_rect.top), max_y))
+
+    def pan(self, dx, dy):
+        self.offset_x += dx
+        self.offset_y += dy
+        self.clamp()
+
+    def update_from_keys(self, delta_time):
+        # Flèches: défilement de la vue (sans effet si le monde tient dans l'écran)
+        keys = pygame.key.get_pressed()
+        direction_x = keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]
+        direction_y = keys[pygame.K_DOWN] - keys[pygame.K_UP]
+        if direction_x or direction_y:
+            speed = self.scaler.scale_value(cfg.BASE_CAMERA_PAN_SPEED) * delta_time
+            self.pan(round(direction_x * speed), round(direction_y * speed))
+
+    def world_to_screen(self, world_pos):
+        return world_pos[0] - self.offset_x, world_pos[1] - self.offset_y
+
+    def screen_to_world(self, screen_pos):
+        return screen_pos[0] + self.offset_x, screen_pos[1] + self.offset_y
+
+    def rect_to_screen(self, world_rect):
+        return world_rect.move(-self.offset_x, -self.offset_y)
+
+
+class StaticLayerCache:
+    """
+    Fond de grille et bâtiments (qui ne bougent pas) pré-rendus par blocs de CHUNK x CHUNK cases.
+    Seuls les blocs visibles sont dessinés; un bloc n'est redessiné que si une de ses cases a changé.
+    """
+
+    def __init__(self, chunk_tiles):
+        self.chunk_tiles = max(1, int(chunk_tiles))
+        self.chunks = {}  # {(bloc ligne, bloc colonne): Surface}
+        self.layout_key = None
+
+    def mark_tile_dirty(self, grid_r, grid_c):
+        self.chunks.pop((grid_r // self.chunk_tiles, grid_c // self.chunk_tiles), None)
+
+    def invalidate_all(self):
+        self.chunks.clear()
+
+    def draw(self, screen, game_state, camera: Camera):
+        tile_size = game_state.scaler.tile_size
+        if tile_size <= 0: return
+        layout_key = (game_state.grid_origin_row, game_state.grid_width_tiles, tile_size)
+        if layout_key != self.layout_key:
+            self.invalidate_all()
+            self.layout_key = layout_key
+        # Cases visibles, limitées à la grille
+        view_rect = camera.get_view_rect()
+        origin_x, origin_y = game_state.grid_origin_pixels
+        first_r = max(game_state.grid_origin_row, (view_rect.top - origin_y) // tile_size)
+        last_r = min(game_state.grid_bottom_row, (view_rect.bottom - origin_y) // tile_size)
+        first_c = max(0, (view_rect.left - origin_x) // tile_size)
+        last_c = min(game_state.grid_width_tiles - 1, (view_rect.right - origin_x) // tile_size)
+        if first_r > last_r or first_c > last_c: return
+        chunk_px = self.chunk_tiles * tile_size
+        blit_sequence = []
+        for chunk_r in range(first_r // self.chunk_tiles, last_r // self.chunk_tiles + 1):
+            for chunk_c in range(first_c // self.chunk_tiles, last_c // self.chunk_tiles + 1):
+                chunk_surface = self.chunks.get((chunk_r, chunk_c))
+                if chunk_surface is None:
+                    chunk_surface = self.render_chunk(game_state, chunk_r, chunk_c, chunk_px)
+                    self.chunks[(chunk_r, chunk_c)] = chunk_surface
+                blit_sequence.append((chunk_surface, camera.world_to_screen(
+                    (origin_x + chunk_c * chunk_px, origin_y + chunk_r * chunk_px))))
+        screen.blits(blit_sequence, doreturn=False)
+
+    def render_chunk(self, game_state, chunk_r, chunk_c, chunk_px):
+        scaler = game_state.scaler
+        tile_size = scaler.tile_size
+        chunk_surface = pygame.Surface((chunk_px, chunk_px), pygame.SRCALPHA)
+        border_thickness = scaler.scale_value(cfg.BASE_GRID_BORDER_THICKNESS)
+        reinforced_row = game_state.get_reinforced_row_index()
+        for r in range(chunk_r * self.chunk_tiles, (chunk_r + 1) * self.chunk_tiles):
+            for c in range(chunk_c * self.chunk_tiles, (chunk_c + 1) * self.chunk_tiles):
+                if not game_state.is_tile_in_grid(r, c): continue
+                tile_rect = pygame.Rect((c - chunk_c * self.chunk_tiles) * tile_size,
+                                        (r - chunk_r * self.chunk_tiles) * tile_size, tile_size, tile_size)
+                is_reinforced_spot = r == reinforced_row and c < game_state.grid_initial_width_tiles
+                pygame.draw.rect(chunk_surface, cfg.COLOR_GRID_REINFORCED if is_reinforced_spot else cfg.COLOR_GRID_DEFAULT,
+                                 tile_rect)
+                pygame.draw.rect(chunk_surface, cfg.COLOR_GRID_BORDER, tile_rect, border_thickness)
+                building = game_state.tile_index.get_top(r, c)
+                if building is not None and building.active and building.sprite:
+                    chunk_surface.blit(building.sprite, tile_rect.topleft)
+        return chunk_surface
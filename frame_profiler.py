@@ -0,0 +1,107 @@
+# frame_profiler.py
+import time
+import game_config as cfg
+
+# Zones mesurées, dans l'ordre d'affichage de l'overlay (F3)
+ZONE_INPUT = "input"
+ZONE_WAVES = "waves"
+ZONE_TURRETS = "turrets"
+ZONE_PROJECTILES = "projectiles"
+ZONE_ENEMIES = "enemies"
+ZONE_COLLISIONS = "collisions"
+ZONE_CLEANUP = "cleanup"
+ZONE_DRAW_WORLD = "draw_world"
+ZONE_DRAW_UI = "draw_ui"
+ZONES = (ZONE_INPUT, ZONE_WAVES, ZONE_TURRETS, ZONE_PROJECTILES, ZONE_ENEMIES, ZONE_COLLISIONS, ZONE_CLEANUP,
+         ZONE_DRAW_WORLD, ZONE_DRAW_UI)
+
+
+class RingBuffer:
+    """Les N dernières valeurs, avec leur somme tenue à jour (moyenne en O(1))."""
+
+    def __init__(self, size):
+        self.size = max(1, int(size))
+        self.values = [0.0] * self.size
+        self.next_index = 0
+        self.count = 0
+        self.total = 0.0
+
+    def push(self, value):
+        self.total += value - self.values[self.next_index]
+        self.values[self.next_index] = value
+        self.next_index = (self.next_index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def average(self):
+        return self.total / self.count if self.count else 0.0
+
+    def get_ordered_values(self):
+        # Du plus ancien au plus récent
+        if self.count < self.size: return self.values[:self.count]
+        return self.values[self.next_index:] + self.values[:self.next_index]
+
+
+class _ZoneTimer:
+    # Un seul objet par zone, réutilisé à chaque frame (pas d'allocation dans la boucle)
+    __slots__ = ("frame_totals", "zone_name", "start_time")
+
+    def __init__(self, frame_totals, zone_name):
+        self.frame_totals = frame_totals
+        self.zone_name = zone_name
+        self.start_time = 0.0
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.frame_totals[self.zone_name] += time.perf_counter() - self.start_time
+
+
+class _NullZone:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_NULL_ZONE = _NullZone()
+
+
+class FrameProfiler:
+    """
+    Temps passé par sous-système, frame par frame: `with profiler.zone(ZONE_...):` autour de chaque étape.
+    Désactivé (par défaut), zone() renvoie un contexte vide partagé: rien n'est mesuré ni stocké.
+    """
+
+    def __init__(self, history_frames=cfg.PROFILER_HISTORY_FRAMES):
+        self.enabled = False
+        self.frame_totals = dict.fromkeys(ZONES, 0.0)  # Secondes cumulées dans la frame en cours
+        self.zone_timers = {zone_name: _ZoneTimer(self.frame_totals, zone_name) for zone_name in ZONES}
+        self.zone_history = {zone_name: RingBuffer(history_frames) for zone_name in ZONES}
+        self.frame_time_history = RingBuffer(history_frames)
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_totals.update(dict.fromkeys(ZONES, 0.0))
+        if cfg.DEBUG_MODE: print(f"FRAME_PROFILER: {'activé' if self.enabled else 'désactivé'}")
+
+    def zone(self, zone_name):
+        if not self.enabled: return _NULL_ZONE
+        return self.zone_timers[zone_name]
+
+    def end_frame(self, frame_time_seconds):
+        # Clôt la frame précédente: ses totaux par zone et son temps de travail passent dans l'historique
+        if not self.enabled: return
+        for zone_name in ZONES:
+            self.zone_history[zone_name].push(self.frame_totals[zone_name])
+            self.frame_totals[zone_name] = 0.0
+        self.frame_time_history.push(frame_time_seconds)
+
+    def get_zone_average_ms(self, zone_name):
+        return self.zone_history[zone_name].average() * 1000
+
+
+profiler = FrameProfiler()  # Instance unique: main.py bascule l'overlay (F3) et clôt chaque frame
@@ -0,0 +1,164 @@
+# frame_stats.py
+import json
+import math
+import os
+import platform
+import sys
+import time
+import pygame
+import game_config as cfg
+
+# Sous-états d'une partie, avec le numéro de vague ils forment la clé de chaque histogramme
+SUB_STATE_PREP = "prep"  # Entre deux vagues (ou avant la première)
+SUB_STATE_WAVE = "wave"
+SUB_STATE_PAUSED = "paused"
+
+# Raisons de fin de session, reprises dans le rapport
+END_GAME_OVER = "game_over"
+END_MENU = "menu"
+END_RESTART = "restart"
+END_QUIT = "quit"
+
+
+class FrameTimeHistogram:
+    """
+    Temps de frame rangés dans des bacs fixes de cfg.FRAME_STATS_BIN_MS (le dernier reçoit tout ce qui
+    dépasse cfg.FRAME_STATS_MAX_MS). Taille constante quelle que soit la durée de la partie; les
+    percentiles sont exacts à un bac près, le maximum est exact.
+    """
+
+    def __init__(self):
+        self.bins = [0] * (int(cfg.FRAME_STATS_MAX_MS / cfg.FRAME_STATS_BIN_MS) + 1)
+        self.frame_count = 0
+        self.over_budget_count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.gc_pause_total_ms = 0.0  # Pauses du ramasse-miettes pendant ces frames (gc_policy)
+        self.gc_pause_max_ms = 0.0
+
+    def add(self, frame_ms, budget_ms, gc_pause_ms=0.0):
+        self.bins[min(int(frame_ms / cfg.FRAME_STATS_BIN_MS), len(self.bins) - 1)] += 1
+        self.frame_count += 1
+        self.total_ms += frame_ms
+        self.max_ms = max(self.max_ms, frame_ms)
+        if budget_ms and frame_ms > budget_ms: self.over_budget_count += 1
+        self.gc_pause_total_ms += gc_pause_ms
+        self.gc_pause_max_ms = max(self.gc_pause_max_ms, gc_pause_ms)
+
+    def merge(self, other):
+        for i, bin_count in enumerate(other.bins): self.bins[i] += bin_count
+        self.frame_count += other.frame_count
+        self.over_budget_count += other.over_budget_count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+        self.gc_pause_total_ms += other.gc_pause_total_ms
+        self.gc_pause_max_ms = max(self.gc_pause_max_ms, other.gc_pause_max_ms)
+
+    def get_percentile_ms(self, percentile):
+        # Borne haute du bac contenant la frame de ce rang (jamais au-delà du maximum mesuré)
+        if not self.frame_count: return 0.0
+        target_rank = max(1, math.ceil(percentile / 100 * self.frame_count))
+        cumulative_count = 0
+        for i, bin_count in enumerate(self.bins):
+            cumulative_count += bin_count
+            if cumulative_count >= target_rank:
+                return min((i + 1) * cfg.FRAME_STATS_BIN_MS, self.max_ms)
+        return self.max_ms
+
+    def get_summary(self):
+        return {
+            "frames": self.frame_count,
+            "mean_ms": round(self.total_ms / self.frame_count, 3) if self.frame_count else 0.0,
+            "p50_ms": round(self.get_percentile_ms(50), 3),
+            "p95_ms": round(self.get_percentile_ms(95), 3),
+            "p99_ms": round(self.get_percentile_ms(99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "over_budget": self.over_budget_count,
+            "gc_pause_total_ms": round(self.gc_pause_total_ms, 3),
+            "gc_pause_max_ms": round(self.gc_pause_max_ms, 3),
+        }
+
+
+class FrameStatsSession:
+    """
+    Temps de travail de chaque frame d'une partie (hors attente du tick), par (vague, sous-état).
+    main.py ouvre la session au lancement d'une partie et la clôt à sa fin; le rapport JSON est
+    écrit dans cfg.FRAME_STATS_REPORT_DIR.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.histograms = {}  # {(numéro de vague, sous-état): FrameTimeHistogram}
+        self.is_tutorial = False
+        self.budget_ms = 0.0
+        self.started_at = 0.0
+
+    def start(self, is_tutorial):
+        self.finish(END_RESTART)  # Filet de sécurité: main.py clôt la session précédente avec l'état de sa partie
+        if not cfg.FRAME_STATS_ENABLED: return
+        self.active = True
+        self.histograms = {}
+        self.is_tutorial = is_tutorial
+        self.budget_ms = 1000.0 / cfg.FPS if cfg.FPS > 0 else 0.0
+        self.started_at = time.time()
+
+    def record_frame(self, frame_ms, wave_number, sub_state, gc_pause_ms=0.0):
+        if not self.active: return
+        histogram = self.histograms.get((wave_number, sub_state))
+        if histogram is None:
+            histogram = self.histograms[(wave_number, sub_state)] = FrameTimeHistogram()
+        histogram.add(frame_ms, self.budget_ms, gc_pause_ms)
+
+    def finish(self, end_reason, game_state=None):
+        # Retourne le chemin du rapport écrit (None si aucune session ou aucune frame)
+        if not self.active: return None
+        self.active = False
+        if not self.histograms: return None
+        report = self.build_report(end_reason, game_state)
+        report_path = os.path.join(cfg.FRAME_STATS_REPORT_DIR,
+                                   time.strftime("frames_%Y%m%d_%H%M%S.json", time.localtime(self.started_at)))
+        try:
+            os.makedirs(cfg.FRAME_STATS_REPORT_DIR, exist_ok=True)
+            with open(report_path, "w", encoding="utf-8") as report_file:
+                json.dump(report, report_file, indent=2)
+        except OSError as e:
+            print(f"AVERTISSEMENT: Écriture du rapport de frames échouée ({report_path}): {e}")
+            return None
+        session_summary = report["session"]
+        print(f"FRAME_STATS: {session_summary['frames']} frames, p50 {session_summary['p50_ms']} ms, "
+              f"p99 {session_summary['p99_ms']} ms, max {session_summary['max_ms']} ms -> {report_path}")
+        return report_path
+
+    def build_report(self, end_reason, game_state=None):
+        session_histogram = FrameTimeHistogram()
+        wave_entries = []
+        for (wave_number, sub_state), histogram in sorted(self.histograms.items()):
+            session_histogram.merge(histogram)
+            wave_entry = {"wave": wave_number, "sub_state": sub_state}
+            wave_entry.update(histogram.get_summary())
+            wave_entries.append(wave_entry)
+        return {
+            "end_reason": end_reason,
+            "mode": "tutorial" if self.is_tutorial else "game",
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "duration_sec": round(time.time() - self.started_at, 1),
+            "waves_reached": game_state.current_wave_number if game_state else None,
+            "seed": game_state.rng.seed if game_state else None,  # Pour rejouer la même partie (cfg.RNG_SEED)
+            "budget_ms": round(self.budget_ms, 3),
+            "bin_ms": cfg.FRAME_STATS_BIN_MS,
+            # Pour comparer des builds et des machines entre elles
+            "machine": {"platform": platform.platform(), "python": sys.version.split()[0],
+                        "pygame": pygame.version.ver, "processor": platform.processor()},
+            "display": {"render_scale": cfg.RENDER_SCALE, "fps_cap": cfg.FPS, "vsync": cfg.VSYNC,
+                        "smooth_scaling": cfg.SMOOTH_SCALING},
+            "session": session_histogram.get_summary(),
+            "waves": wave_entries,
+        }
+
+
+def get_sub_state(game_state, is_paused):
+    if is_paused: return SUB_STATE_PAUSED
+    return SUB_STATE_WAVE if game_state.wave_in_progress else SUB_STATE_PREP
+
+
+session = FrameStatsSession()  # Instance unique, alimentée par main.py
@@ -8,7 +8,12 @@ SCREEN_MARGIN_HORIZONTAL = 190 # Marge invisible en pixels à GAUCHE et à DROIT
 REF_WIDTH = 1920
 REF_HEIGHT = 1080
 GAME_TITLE = "The Last Stand: 1941"
-FPS = 60
+FPS = 60  # Limite en jeu (60, 120 ou 144)
+MENU_FPS = 30  # Limite des écrans statiques (menu, lore, pause, game over)
+WINDOW_RESIZABLE = True  # VIDEORESIZE: le Scaler est recalculé sur place (cf. Scaler.rebuild)
+MIN_WINDOW_WIDTH = 800
+MIN_WINDOW_HEIGHT = 450
+FULLSCREEN_TOGGLE_KEY = pygame.K_F11
 
 # --- Dimensions et Positions de Base (pour REF_WIDTH x REF_HEIGHT) ---
 BASE_TILE_SIZE = 90
@@ -46,10 +51,22 @@ BASE_GRID_MAX_EXPANSION_UP_TILES = 2
 BASE_GRID_MAX_EXPANSION_SIDEWAYS_STEPS = 2
 BASE_GRID_EXPANSION_SIDEWAYS_TILES_PER_STEP = 4
 BASE_GRID_OFFSET_X = 0
+# Grand champ de bataille: base jusqu'à 100x30 cases, plus grande que l'écran (caméra aux flèches)
+LARGE_BATTLEFIELD_MODE = False
+LARGE_BATTLEFIELD_MAX_EXPANSION_UP_TILES = 26
+LARGE_BATTLEFIELD_MAX_EXPANSION_SIDEWAYS_STEPS = 24
+BASE_CAMERA_PAN_SPEED = 900  # Pixels de référence par seconde
+STATIC_LAYER_CHUNK_TILES = 8  # Grille + bâtiments pré-rendus par blocs de 8x8 cases
 BASE_GRID_BORDER_THICKNESS = 1
 
+# --- File de rendu ---
+BASE_RENDER_QUEUE_BUCKET_HEIGHT = 4  # Hauteur (px de référence) d'une bande de tri par rect.bottom
+
 # --- Placement Preview ---
 PLACEMENT_PREVIEW_ALPHA = 128
+PLACEMENT_VALIDITY_CACHE_MAX_ENTRIES = 512  # Vidé entièrement au-delà
+PLACEMENT_MASK_ALPHA = 60  # Surbrillance des cases valides quand un objet est sélectionné
+BASE_DRAG_BUILD_BORDER_THICKNESS = 3  # Contour du rectangle de placement par glisser
 
 # --- Menu Pause ---
 BASE_PAUSE_MENU_BUTTON_WIDTH = 250
@@ -58,6 +75,12 @@ BASE_PAUSE_MENU_SPACING = 20
 BASE_PAUSE_MENU_BUTTON_BLOCK_Y_OFFSET = 50
 BASE_PAUSE_MENU_BUTTON_START_Y_OFFSET = 70
 
+# --- Menu Options ---
+BASE_OPTIONS_MENU_BUTTON_WIDTH = 560
+BASE_OPTIONS_MENU_BUTTON_HEIGHT = 46
+BASE_OPTIONS_MENU_SPACING = 12
+BASE_OPTIONS_MENU_START_Y_OFFSET = 170
+
 # --- Menu Game Over ---
 BASE_GAMEOVER_MENU_BUTTON_WIDTH = 250
 BASE_GAMEOVER_MENU_BUTTON_HEIGHT = 50
@@ -163,8 +186,25 @@ STATE_LORE = "lore_screen"
 STATE_TUTORIAL = "tutorial"
 STATE_OPTIONS = "options_menu"
 STATE_GAME_OVER = "game_over"
+STATE_PAUSED = "paused"
 STATE_QUIT = "quit_game"
 
+# --- Limite de FPS par état (un seul clock.tick par frame dans main.py) ---
+STATE_FPS_CAPS = {
+    STATE_MENU: MENU_FPS,
+    STATE_LORE: MENU_FPS,
+    STATE_OPTIONS: MENU_FPS,
+    STATE_GAMEPLAY: FPS,
+    STATE_TUTORIAL: FPS,
+    STATE_PAUSED: MENU_FPS,
+    STATE_GAME_OVER: MENU_FPS,
+}
+
+# --- Rendu à la demande des écrans statiques ---
+# Ces états bloquent sur pygame.event.wait et ne redessinent que si l'entrée ou le survol change
+IDLE_STATES = (STATE_MENU, STATE_LORE, STATE_OPTIONS, STATE_PAUSED, STATE_GAME_OVER)
+IDLE_EVENT_WAIT_TIMEOUT_MS = 500
+
 # --- Clés pour les Dictionnaires de Stats ---
 STAT_ID = "id_type"
 STAT_SPRITE_DEFAULT_NAME = "sprite_default_name"
@@ -357,4 +397,82 @@ EXPANSION_COST_INCREASE_FACTOR_UP = 1.5
 EXPANSION_COST_INCREASE_FACTOR_SIDE = 1.8
 
 #boolean to toggle the debug mode
-DEBUG_MODE = True
\ No newline at end of file
+DEBUG_MODE = True
+
+# --- Réglages de performance (écran Options) ---
+# Valeurs par défaut, remplacées au démarrage par celles de SETTINGS_FILE_PATH (cf. settings.apply_settings)
+SETTINGS_FILE_PATH = "settings.json"
+RENDER_SCALE = 1.0  # < 1: le jeu est dessiné dans une surface réduite puis agrandie à l'affichage
+VSYNC = False
+SMOOTH_SCALING = True  # False: pygame.transform.scale (plus proche voisin) au lieu de smoothscale
+FLAME_PARTICLE_DENSITY = 1.0  # Part des particules de chaque jet de lance-flammes (dégâts totaux conservés)
+SHOW_ENEMY_HP_BARS = True
+DEBUG_OVERLAYS = DEBUG_MODE  # Rectangles et zone utilisable dessinés par-dessus le monde
+
+# --- Gouverneur de qualité (cf. quality_governor.py) ---
+QUALITY_GOVERNOR_ENABLED = True
+QUALITY_GOVERNOR_WINDOW_FRAMES = 60  # Moyenne glissante sur ~1 s
+QUALITY_GOVERNOR_STEP_DOWN_RATIO = 1.10  # Palier abandonné au-delà de 110% du temps de frame cible
+QUALITY_GOVERNOR_STEP_UP_RATIO = 0.70  # Palier retrouvé sous 70% (hystérésis)
+QUALITY_GOVERNOR_COOLDOWN_SEC = 2.0  # Délai minimum entre deux changements de palier
+QUALITY_GOVERNOR_FLAME_DENSITY_FACTOR = 0.5
+QUALITY_GOVERNOR_HP_BAR_MAX_RATIO = 0.5  # Palier "barres de vie réduites": seulement sous 50% de vie
+
+# --- Profileur par sous-système (cf. frame_profiler.py) ---
+PROFILER_TOGGLE_KEY = pygame.K_F3
+PROFILER_HISTORY_FRAMES = 120
+BASE_PROFILER_OVERLAY_WIDTH = 330
+BASE_PROFILER_SPARKLINE_HEIGHT = 60
+COLOR_PROFILER_OVERLAY_BG = (0, 0, 0, 170)
+COLOR_PROFILER_SPARKLINE = (120, 220, 120)
+COLOR_PROFILER_BUDGET_LINE = (220, 80, 80)
+
+# --- Statistiques de temps de frame par partie et par vague (cf. frame_stats.py) ---
+FRAME_STATS_ENABLED = False  # True: un rapport JSON par partie dans FRAME_STATS_REPORT_DIR
+FRAME_STATS_BIN_MS = 0.5
+FRAME_STATS_MAX_MS = 250.0  # Au-delà: dernier bac (le maximum exact reste enregistré)
+FRAME_STATS_REPORT_DIR = "reports"
+
+# --- Capture cProfile des frames lentes (cf. profile_capture.py) ---
+PROFILE_CAPTURE_KEY = pygame.K_F4
+PROFILE_CAPTURE_FRAMES = 30
+PROFILE_CAPTURE_AUTO = False  # True: capture déclenchée aussi par une frame lente (sinon touche PROFILE_CAPTURE_KEY seule)
+PROFILE_CAPTURE_AUTO_RATIO = 4.0  # Déclenchement auto après une frame de plus de 4x le budget (1 / FPS)
+PROFILE_CAPTURE_AUTO_COOLDOWN_SEC = 30.0
+PROFILE_CAPTURE_DIR = os.path.join(FRAME_STATS_REPORT_DIR, "profiles")
+
+# --- Flux de métriques JSONL par partie (cf. metrics_stream.py) ---
+METRICS_STREAM_ENABLED = False
+METRICS_STREAM_INTERVAL_SEC = 1.0  # 0: un enregistrement par frame
+METRICS_STREAM_QUEUE_SIZE = 256  # File pleine: l'enregistrement est abandonné (compté), la frame n'attend jamais
+METRICS_STREAM_DIR = FRAME_STATS_REPORT_DIR
+METRICS_STREAM_STOP_TIMEOUT_SEC = 2.0
+
+# --- Serveur de métriques local pour les tests d'endurance (cf. metrics_server.py) ---
+METRICS_SERVER_ENABLED = False
+METRICS_SERVER_HOST = "127.0.0.1"  # Jamais exposé hors de la machine
+METRICS_SERVER_PORT = 9464
+METRICS_SERVER_PUBLISH_INTERVAL_SEC = 1.0
+METRICS_SERVER_WINDOW_FRAMES = 600  # Percentiles de temps de frame sur les ~10 dernières secondes de jeu
+
+# --- Rapport mémoire (cf. memory_report.py) ---
+MEMORY_REPORT_KEY = pygame.K_F5
+MEMORY_REPORT_ON_GAME_OVER = False  # True: un rapport à chaque game over, en plus de la touche
+MEMORY_REPORT_TRACEMALLOC_AT_STARTUP = False  # Sinon la touche démarre tracemalloc jusqu'au rapport suivant
+MEMORY_REPORT_TOP_N = 25
+
+# --- Ramasse-miettes piloté par les vagues (cf. gc_policy.py) ---
+GC_POLICY_ENABLED = True
+GC_WAVE_THRESHOLDS = (7000, 20, 1000)  # Pendant une vague: génération 2 quasiment jamais collectée
+GC_FULL_COLLECT_MIN_GAP_SEC = 3.0  # Collection complète en fin de vague si la suivante est au moins à cette distance
+
+# --- Hasard de la partie (cf. game_rng.py) ---
+RNG_SEED = None  # None: nouvelle graine à chaque partie; un entier rend les parties reproductibles
+
+# --- Simulation à pas fixe et enregistrement des parties (cf. gamemodes.py, input_recording.py, replay_player.py) ---
+SIM_TICK_RATE = 60  # Ticks de simulation par seconde, indépendants de FPS (à 120/144 FPS, le dessin interpole entre deux ticks)
+SIM_TICK_SEC = 1.0 / SIM_TICK_RATE
+SIM_MAX_TICKS_PER_FRAME = 5  # Au-delà (machine trop lente), le jeu ralentit au lieu de rattraper son retard
+REPLAY_RECORD_ENABLED = False  # True: chaque partie est enregistrée (quelques lignes par seconde), rejouable avec replay_player.py
+REPLAY_DIR = os.path.join(FRAME_STATS_REPORT_DIR, "replays")
+REPLAY_CHECKPOINT_INTERVAL_TICKS = 600  # Point de contrôle de l'état (vérifié au rejeu): 10 s de jeu à 60 ticks/s
@@ -1,18 +1,28 @@
 # game_functions.py
 import pygame
-import random
 import os
 import game_config as cfg
 import utility_functions as util
 import objects
 import ui_functions
 import wave_definitions
+import render_queue
+import tile_occupancy
+import placement_overlay
+import storage_clusters
+import miner_columns
+import camera
+import quality_governor
+import frame_profiler
+import game_rng
+import input_recording
 
 
 class GameState:
     #initialisation of GameState
-    def __init__(self, scaler: util.Scaler):
+    def __init__(self, scaler: util.Scaler, seed=None):
         self.scaler = scaler;
+        self.rng = game_rng.GameRng(seed)
         self.screen = None;
         self.clock = None
         self.game_over_flag = False;
@@ -20,6 +30,9 @@ class GameState:
         self.is_tutorial = False
         self.total_time_elapsed_seconds = 0.0;
         self.time_to_next_wave_seconds = 0.0
+        self.sim_tick_index = 0  # Ticks de simulation à pas fixe depuis le début de la partie (cf. gamemodes)
+        self.sim_time_accumulator = 0.0  # Temps réel pas encore simulé (moins d'un tick)
+        self.sim_interpolation_alpha = 1.0  # Part du tick suivant déjà écoulée: le dessin interpole les positions
         self.current_wave_number = 0;
         self.wave_in_progress = False
         self.enemies_in_current_wave_to_spawn = [];
@@ -39,8 +52,28 @@ class GameState:
         self.current_expansion_up_tiles = 0;
         self.current_expansion_sideways_steps = 0
         self.grid_initial_width_tiles = cfg.BASE_GRID_INITIAL_WIDTH_TILES
-        self.game_grid = [[None for _ in range(self.grid_width_tiles)] for _ in range(self.grid_height_tiles)]
+        # Grille préallouée à sa taille maximale: les coordonnées logiques (ligne, colonne) d'un objet ne
+        # changent jamais. L'expansion vers le haut déplace seulement grid_origin_row (première ligne visible).
+        # Mode grand champ de bataille: la base peut dépasser l'écran, la caméra défile (flèches)
+        if cfg.LARGE_BATTLEFIELD_MODE:
+            self.max_expansion_up_tiles = cfg.LARGE_BATTLEFIELD_MAX_EXPANSION_UP_TILES
+            self.max_expansion_sideways_steps = cfg.LARGE_BATTLEFIELD_MAX_EXPANSION_SIDEWAYS_STEPS
+        else:
+            self.max_expansion_up_tiles = cfg.BASE_GRID_MAX_EXPANSION_UP_TILES
+            self.max_expansion_sideways_steps = cfg.BASE_GRID_MAX_EXPANSION_SIDEWAYS_STEPS
+        self.grid_capacity_rows = cfg.BASE_GRID_INITIAL_HEIGHT_TILES + self.max_expansion_up_tiles
+        self.grid_capacity_cols = cfg.BASE_GRID_INITIAL_WIDTH_TILES + \
+                                  self.max_expansion_sideways_steps * cfg.BASE_GRID_EXPANSION_SIDEWAYS_TILES_PER_STEP
+        self.grid_origin_row = self.max_expansion_up_tiles
+        self.grid_bottom_row = self.grid_capacity_rows - 1
+        self.game_grid = [[None for _ in range(self.grid_capacity_cols)] for _ in range(self.grid_capacity_rows)]
+        self.grid_origin_pixels = (0, 0)  # Position écran de la case logique (0, 0), cf. update_buildable_area_rect
+        self.tile_index = tile_occupancy.TileOccupancyIndex()  # Structure / bâtiment / tourelle par case
+        self.storage_clusters = storage_clusters.StorageClusterIndex()  # Bonus d'adjacence des stockages
+        self.miner_columns = miner_columns.MinerColumnIndex()  # Piles verticales de mines (sprites empilés)
         self.buildable_area_rect_pixels = pygame.Rect(0, 0, 0, 0)
+        self.camera = camera.Camera(self.scaler)  # Positions des objets en coordonnées monde
+        self.static_layer = camera.StaticLayerCache(cfg.STATIC_LAYER_CHUNK_TILES)  # Grille + bâtiments
         self.buildings = [];
         self.turrets = [];
         self.enemies = [];
@@ -49,33 +82,44 @@ class GameState:
         self.selected_item_to_place_type = None;
         self.placement_preview_sprite = None
         self.is_placement_valid_preview = False
+        self.drag_build_start_tile = None  # Case où le clic gauche a commencé (placement par glisser)
+        self.grid_revision = 0  # Incrémenté à chaque modification de la grille (placement, expansion, destruction)
+        self.placement_validity_cache = {}
+        self.placement_overlay = placement_overlay.PlacementMaskOverlay()  # Cases valides pour l'objet sélectionné
         self.ui_icons = {};
         self.last_error_message = "";
         self.error_message_timer = 0.0
         self.tutorial_message = "";
         self.tutorial_message_timer = 0.0;
         self.score = 0
+        self.kills = 0
         self.all_wave_definitions = {};
         self.max_waves = 0;
         self.all_waves_completed = False
-
-    def init_new_game(self, screen, clock, is_tutorial=False):
-        self.__init__(self.scaler)  # Réinitialise tous les attributs
+        self.frozen_world_surface = None  # Dernière image du monde, réutilisée en pause / game over
+        self.scale_generation = self.scaler.generation  # Génération du Scaler des sprites / positions actuels
+        self.scale_tile_size = self.scaler.tile_size
+        self.render_queue = render_queue.RenderQueue(self.scaler.actual_h,
+                                                     self.scaler.scale_value(cfg.BASE_RENDER_QUEUE_BUCKET_HEIGHT))
+
+    def init_new_game(self, screen, clock, is_tutorial=False, seed=None):
+        self.__init__(self.scaler, seed)  # Réinitialise tous les attributs (et le hasard: nouvelle graine)
+        if cfg.DEBUG_MODE: print(f"GAME: graine de la partie {self.rng.seed}")
         self.screen = screen;
         self.clock = clock;
         self.is_tutorial = is_tutorial
         self.load_ui_icons();
         self.update_buildable_area_rect()
-        initial_bottom_row_idx = self.grid_height_tiles - 1
+        initial_bottom_row_idx = self.grid_bottom_row
         for c in range(self.grid_initial_width_tiles):
             grid_r, grid_c = initial_bottom_row_idx, c
-            if 0 <= grid_r < self.grid_height_tiles and 0 <= grid_c < self.grid_width_tiles and self.game_grid[grid_r][
-                grid_c] is None:
-                pixel_pos = util.convert_grid_to_pixels((grid_r, grid_c), (
-                self.buildable_area_rect_pixels.x, self.buildable_area_rect_pixels.y), self.scaler)
+            if self.is_tile_in_grid(grid_r, grid_c) and self.game_grid[grid_r][grid_c] is None:
+                pixel_pos = util.convert_grid_to_pixels((grid_r, grid_c), self.grid_origin_pixels,
+                                                    self.scaler)
                 try:
                     foundation_obj = objects.Building("foundation", pixel_pos, (grid_r, grid_c), self.scaler)
                     self.game_grid[grid_r][grid_c] = foundation_obj;
+                    self.add_item_to_grid_indexes(foundation_obj)
                     self.buildings.append(foundation_obj)
                 except Exception as e:
                     if cfg.DEBUG_MODE: print(f"ERROR placing initial foundation: {e}")
@@ -111,44 +155,120 @@ class GameState:
         grid_bottom_abs = self.scaler.screen_origin_y + self.scaler.usable_h - menu_h
         start_y = grid_bottom_abs - grid_h_px
         self.buildable_area_rect_pixels = pygame.Rect(start_x, start_y, grid_w_px, grid_h_px)
+        # Seule transformation monde -> écran: la ligne logique grid_origin_row est en haut de la zone
+        self.grid_origin_pixels = (start_x, start_y - self.grid_origin_row * tile_size)
+        # Le monde couvre l'écran, la base et la zone d'apparition des ennemis
+        world_rect = self.buildable_area_rect_pixels.inflate(2 * tile_size, 2 * tile_size)
+        world_rect.width = max(world_rect.width, self.get_enemy_spawn_x() - world_rect.left)
+        self.camera.set_world_rect(world_rect)
+
+    def ensure_scale_current(self):
+        # Appelé avant chaque mise à jour / dessin: ne fait rien tant que la fenêtre n'a pas changé de taille
+        if self.scale_generation != self.scaler.generation:
+            self.apply_scale_change()
+
+    def apply_scale_change(self):
+        # Tout ce qui dépend de l'échelle est re-dérivé des coordonnées logiques et des sprites originaux
+        # déjà chargés (util.sprite_cache): ni nouveau GameState, ni relecture des images sur le disque.
+        old_origin_x, old_origin_y = self.grid_origin_pixels
+        scale_ratio = self.scaler.tile_size / self.scale_tile_size if self.scale_tile_size > 0 else 1.0
+        self.scale_generation = self.scaler.generation
+        self.scale_tile_size = self.scaler.tile_size
+        self.update_buildable_area_rect()
+        new_origin_x, new_origin_y = self.grid_origin_pixels
+
+        def map_point(world_pos):
+            # Même position relative à la grille, à la nouvelle échelle
+            return (new_origin_x + (world_pos[0] - old_origin_x) * scale_ratio,
+                    new_origin_y + (world_pos[1] - old_origin_y) * scale_ratio)
+
+        objects.set_scaled_gravity(self.scaler.gravity)
+        tile_size = self.scaler.tile_size
+        for building in self.buildings:
+            building.rescale_to_tile(util.convert_grid_to_pixels(building.grid_pos, self.grid_origin_pixels,
+                                                                 self.scaler), self.scaler)
+        for turret in self.turrets:
+            grid_r, grid_c = turret.grid_pos
+            turret.rescale_to_tile((new_origin_x + grid_c * tile_size + tile_size // 2,
+                                    new_origin_y + grid_r * tile_size + tile_size // 2), self.scaler)
+        for enemy in self.enemies:
+            if enemy.active: enemy.rescale(map_point, scale_ratio)
+        for projectile in self.projectiles:
+            if projectile.active: projectile.rescale(map_point, scale_ratio)
+        for effect in self.particle_effects:
+            if effect.active: effect.rescale(map_point, scale_ratio)
+        # Grille et masque de placement: leur clé de layout contient la taille de case, ils se reconstruisent seuls
+        self.static_layer.invalidate_all()
+        self.render_queue = render_queue.RenderQueue(self.scaler.actual_h,
+                                                     self.scaler.scale_value(cfg.BASE_RENDER_QUEUE_BUCKET_HEIGHT))
+        self.frozen_world_surface = None
+        if cfg.DEBUG_MODE: print(f"GAME_STATE: Échelle mise à jour (génération {self.scale_generation}, "
+                                 f"case {tile_size}px)")
+
+    def get_enemy_spawn_x(self):
+        spawn_offset = self.scaler.scale_value(cfg.BASE_ENEMY_SPAWN_X_OFFSET)
+        return max(self.scaler.screen_origin_x + self.scaler.usable_w,
+                   self.buildable_area_rect_pixels.right + self.scaler.tile_size) + spawn_offset
+
+    def is_tile_in_grid(self, grid_r, grid_c):
+        return self.grid_origin_row <= grid_r <= self.grid_bottom_row and 0 <= grid_c < self.grid_width_tiles
 
     def draw_game_world(self):
-        self.screen.fill(cfg.COLOR_BACKGROUND)
-        if cfg.DEBUG_MODE:
+        # L'écran est déjà rempli par main.main_application_loop (un seul fill par frame)
+        if cfg.DEBUG_OVERLAYS:
             usable_rect = self.scaler.get_usable_rect()
             debug_surf = pygame.Surface(usable_rect.size, pygame.SRCALPHA)
             debug_surf.fill((50, 0, 0, 30));
             self.screen.blit(debug_surf, usable_rect.topleft)
             pygame.draw.rect(self.screen, (255, 0, 0, 100), usable_rect, 1)
 
-        ui_functions.draw_base_grid(self.screen, self, self.scaler)
-
-        buildings_to_draw = sorted([b for b in self.buildings if b.active and hasattr(b, 'rect')],
-                                   key=lambda o: o.rect.bottom)
-        for building in buildings_to_draw:
-            building.draw(self.screen)
-            if cfg.DEBUG_MODE: util.draw_debug_rect(self.screen, building.rect, cfg.COLOR_BLUE, 1)
-
-        turrets_to_draw = sorted([t for t in self.turrets if t.active and hasattr(t, 'rect')],
-                                 key=lambda o: o.rect.bottom)
-        for turret in turrets_to_draw:
-            turret.draw(self.screen)
-            if cfg.DEBUG_MODE: util.draw_debug_rect(self.screen, turret.rect, cfg.COLOR_CYAN, 1)
-
-        other_objects = []
-        for lst_attr in ['enemies', 'projectiles', 'particle_effects']:
-            for obj in getattr(self, lst_attr, []):
-                if obj and obj.active and hasattr(obj, 'rect'): other_objects.append(obj)
-        other_objects.sort(key=lambda o: o.rect.bottom)
-        for obj in other_objects:
-            obj.draw(self.screen)
-            if cfg.DEBUG_MODE:
-                if isinstance(obj, objects.Enemy) and hasattr(obj, 'hitbox'):
-                    util.draw_debug_rect(self.screen, obj.hitbox, cfg.COLOR_GREEN, 1)
-                elif hasattr(obj, 'rect'):
-                    util.draw_debug_rect(self.screen, obj.rect, cfg.COLOR_YELLOW, 1)
+        # Grille et bâtiments: blocs pré-rendus, seuls ceux dans la vue de la caméra sont dessinés
+        self.static_layer.draw(self.screen, self, self.camera)
+
+        # Soumission à la file de rendu (triée par rect.bottom à l'insertion), puis un blits() par couche.
+        # La file écarte tout ce qui est hors de la vue.
+        self.render_queue.set_view(self.camera.get_view_rect())
+        for turret in self.turrets:
+            if turret.active: turret.submit_draw(self.render_queue, render_queue.LAYER_TURRETS)
+        for entity_list in (self.enemies, self.projectiles):
+            for obj in entity_list:
+                if obj.active: obj.submit_draw(self.render_queue, render_queue.LAYER_ENTITIES, self.sim_interpolation_alpha)
+        for effect in self.particle_effects:
+            if effect.active: effect.submit_draw(self.render_queue, render_queue.LAYER_ENTITIES)
+        self.render_queue.flush(self.screen)
+
+        if cfg.SHOW_ENEMY_HP_BARS: self.draw_enemy_hp_bars()
+
+        if cfg.DEBUG_OVERLAYS:
+            to_screen = self.camera.rect_to_screen
+            for building in self.buildings:
+                if building.active: util.draw_debug_rect(self.screen, to_screen(building.rect), cfg.COLOR_BLUE, 1)
+            for turret in self.turrets:
+                if turret.active:
+                    turret.draw_debug(self.screen, self.camera.offset)
+                    util.draw_debug_rect(self.screen, to_screen(turret.rect), cfg.COLOR_CYAN, 1)
+            for enemy in self.enemies:
+                if enemy.active: util.draw_debug_rect(self.screen, to_screen(enemy.hitbox), cfg.COLOR_GREEN, 1)
+            for obj in self.projectiles + self.particle_effects:
+                if obj.active: util.draw_debug_rect(self.screen, to_screen(obj.rect), cfg.COLOR_YELLOW, 1)
 
+        self.placement_overlay.draw(self.screen, self)
         ui_functions.draw_placement_preview(self.screen, self, self.scaler)
+        ui_functions.draw_drag_build_area(self.screen, self, self.scaler)
+
+    def draw_enemy_hp_bars(self):
+        # Une seule passe sur les ennemis blessés, barres pré-rendues envoyées en un seul blits()
+        hp_bar_blits = []
+        view_rect = self.camera.get_view_rect()
+        # Gouverneur de qualité: au dernier palier, seules les barres des ennemis bien entamés sont dessinées
+        max_hp_ratio = cfg.QUALITY_GOVERNOR_HP_BAR_MAX_RATIO if quality_governor.governor.is_degraded(
+            quality_governor.LEVEL_FEWER_HP_BARS) else 1.0
+        for enemy in self.enemies:
+            if enemy.active and enemy.current_hp < enemy.max_hp * max_hp_ratio and view_rect.colliderect(enemy.rect):
+                hp_bar_blit = enemy.get_hp_bar_blit(self.sim_interpolation_alpha)
+                if hp_bar_blit: hp_bar_blits.append((hp_bar_blit[0], self.camera.world_to_screen(hp_bar_blit[1])))
+        if hp_bar_blits:
+            self.screen.blits(hp_bar_blits, doreturn=False)
 
     def draw_game_ui_elements(self):
         if not self.game_paused and not self.game_over_flag:
@@ -160,18 +280,21 @@ class GameState:
                                                                                                          self.scaler)
             if self.tutorial_message and self.tutorial_message_timer > 0: ui_functions.draw_tutorial_message(
                 self.screen, self.tutorial_message, self, self.scaler)
+        if cfg.DEBUG_OVERLAYS: ui_functions.draw_debug_hud(self.screen, self, self.scaler)
         if self.game_paused:
             ui_functions.draw_pause_screen(self.screen, self.scaler)
         elif self.game_over_flag:
             ui_functions.draw_game_over_screen(self.screen, self.score, self.scaler)
 
     def get_reinforced_row_index(self):
-        return self.current_expansion_up_tiles + (cfg.BASE_GRID_INITIAL_HEIGHT_TILES - 1)
+        return self.grid_bottom_row  # Coordonnée logique: ne change plus avec l'expansion
 
     def set_time_for_first_wave(self):
         self.time_to_next_wave_seconds = cfg.WAVE_INITIAL_PREP_TIME_SEC; self.current_wave_number = 0
 
     def toggle_pause(self):
+        input_recording.recorder.record(self.sim_tick_index, input_recording.ACTION_PAUSE)
+        self.drag_build_start_tile = None
         self.game_paused = not self.game_paused; print(f"Game Paused: {self.game_paused}")
 
     def trigger_game_over(self):
@@ -234,9 +357,6 @@ class GameState:
                 self.time_to_next_wave_seconds = cfg.WAVE_TIME_BETWEEN_WAVES_SEC
 
     def spawn_enemy(self, enemy_type_id, variant_data=None):
-
-        spawn_x_on_screen = 900
-        spawn_y_on_screen = 1920
         game_area_top_y = self.scaler.screen_origin_y + self.scaler.ui_top_bar_height
         game_area_bottom_y = self.scaler.screen_origin_y + self.scaler.usable_h - self.scaler.ui_build_menu_height
         game_h = game_area_bottom_y - game_area_top_y
@@ -247,76 +367,132 @@ class GameState:
             actual_min_y = game_area_top_y + min_y_off + self.scaler.scale_value(cfg.BASE_ENEMY_SPAWN_Y_PADDING)
             actual_max_y = game_area_top_y + max_y_off - self.scaler.scale_value(cfg.BASE_ENEMY_SPAWN_Y_PADDING)
             if actual_min_y < actual_max_y:
-                spawn_y = random.randint(actual_min_y, actual_max_y)
+                spawn_y = self.rng.spawn.randint(actual_min_y, actual_max_y)
             elif cfg.DEBUG_MODE:
                 print(f"WARN: Spawn Y range invalid after padding. Min:{actual_min_y}, Max:{actual_max_y}")
         elif cfg.DEBUG_MODE:
             print("WARN: Game area height too small for spawn padding.")
 
-        if enemy_type_id == 4:  # Supposons que 4 est l'ID du Kamikaze
-            new_enemy = objects.KamikazePlane((spawn_x_on_screen, spawn_y_on_screen), enemy_type_id, variant_data,
-                                              self.scaler)
-        else:  # Pour les autres types d'ennemis
-            new_enemy = objects.Enemy((spawn_x_on_screen, spawn_y_on_screen), enemy_type_id, variant_data, self.scaler)
-
-        spawn_x = self.scaler.screen_origin_x + self.scaler.usable_w + self.scaler.scale_value(
-            cfg.BASE_ENEMY_SPAWN_X_OFFSET)
-        new_enemy = objects.Enemy((spawn_x, spawn_y), enemy_type_id, variant_data, self.scaler)
+        spawn_x = self.get_enemy_spawn_x()
+        new_enemy = objects.Enemy((spawn_x, spawn_y), enemy_type_id, variant_data, self.scaler, self.rng.spawn)
         self.enemies.append(new_enemy)
 
     def handle_player_input(self, event, mouse_pos_pixels):
         if self.game_over_flag or self.game_paused: return
+        world_mouse_pos = self.camera.screen_to_world(mouse_pos_pixels)  # Le menu reste en coordonnées écran
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:
                 clicked_item = ui_functions.check_build_menu_click(self, mouse_pos_pixels, self.scaler)
                 if clicked_item:
                     if clicked_item.startswith("expand_"):
                         self.try_expand_build_area(clicked_item.split("_")[1]);
-                        self.selected_item_to_place_type = None;
-                        self.placement_preview_sprite = None
+                        self.select_item_to_place(None)
                     else:
-                        self.selected_item_to_place_type = clicked_item
-                        item_stats = objects.get_item_stats(clicked_item)
-                        s_name, p_prefix = None, None
-                        if objects.is_building_type(clicked_item):
-                            p_prefix = cfg.BUILDING_SPRITE_PATH
-                            if clicked_item == "miner" and cfg.STAT_SPRITE_VARIANTS_DICT in item_stats: s_name = \
-                            item_stats[cfg.STAT_SPRITE_VARIANTS_DICT].get("single")
-                            if not s_name: s_name = item_stats.get(cfg.STAT_SPRITE_DEFAULT_NAME)
-                        elif objects.is_turret_type(clicked_item):
-                            p_prefix = cfg.TURRET_SPRITE_PATH;
-                            s_name = item_stats.get(cfg.STAT_TURRET_BASE_SPRITE_NAME)
-                        if s_name and p_prefix:
-                            self.placement_preview_sprite = util.load_sprite(os.path.join(p_prefix, s_name))
-                        else:
-                            self.placement_preview_sprite = None
+                        self.select_item_to_place(clicked_item)
                     return
                 elif self.selected_item_to_place_type:
-                    self.try_place_item_on_grid(mouse_pos_pixels)
+                    # Le placement se fait au relâchement: un clic simple pose une case, un glisser un rectangle
+                    self.drag_build_start_tile = util.convert_pixels_to_grid(world_mouse_pos, self.grid_origin_pixels,
+                                                                             self.scaler)
             elif event.button == 3:
-                self.selected_item_to_place_type = None; self.placement_preview_sprite = None
-        if self.selected_item_to_place_type:
-            is_valid, _, _ = self.check_placement_validity(self.selected_item_to_place_type, mouse_pos_pixels)
-            self.is_placement_valid_preview = is_valid
-        else:
+                self.select_item_to_place(None)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.drag_build_start_tile:
+            start_tile, self.drag_build_start_tile = self.drag_build_start_tile, None
+            if not self.selected_item_to_place_type: return
+            end_tile = self.get_drag_build_end_tile(world_mouse_pos)
+            if end_tile == start_tile or not self.is_tile_in_grid(*start_tile):
+                self.try_place_item_on_grid(world_mouse_pos)
+            else:
+                self.place_items_in_rect(self.selected_item_to_place_type, start_tile, end_tile)
+        # La validité de l'aperçu n'est plus évaluée ici à chaque événement (MOUSEMOTION compris):
+        # refresh_placement_preview() s'en charge une fois par frame.
+
+    # Actions de jeu: les entrées souris y sont ramenées en coordonnées de grille, puis enregistrées
+    # (input_recording) au tick courant pour que replay_player.py puisse les rejouer telles quelles.
+
+    def select_item_to_place(self, item_type):
+        # item_type None: désélection (clic droit, expansion)
+        input_recording.recorder.record(self.sim_tick_index, input_recording.ACTION_SELECT, item_type)
+        self.selected_item_to_place_type = item_type
+        self.placement_preview_sprite = None
+        if not item_type:
+            self.drag_build_start_tile = None
+            return
+        item_stats = objects.get_item_stats(item_type)
+        s_name, p_prefix = None, None
+        if objects.is_building_type(item_type):
+            p_prefix = cfg.BUILDING_SPRITE_PATH
+            if item_type == "miner" and cfg.STAT_SPRITE_VARIANTS_DICT in item_stats: s_name = \
+            item_stats[cfg.STAT_SPRITE_VARIANTS_DICT].get("single")
+            if not s_name: s_name = item_stats.get(cfg.STAT_SPRITE_DEFAULT_NAME)
+        elif objects.is_turret_type(item_type):
+            p_prefix = cfg.TURRET_SPRITE_PATH;
+            s_name = item_stats.get(cfg.STAT_TURRET_BASE_SPRITE_NAME)
+        if s_name and p_prefix:
+            self.placement_preview_sprite = util.load_sprite(os.path.join(p_prefix, s_name))
+
+    def place_item_at(self, item_type_to_place, grid_pos):
+        input_recording.recorder.record(self.sim_tick_index, input_recording.ACTION_PLACE, item_type_to_place,
+                                        *grid_pos)
+        is_valid, (grid_r, grid_c), error_msg_placement = self.get_cached_placement_validity(item_type_to_place,
+                                                                                             grid_pos)
+        if not is_valid:
+            self.show_error_message(error_msg_placement)
+            if cfg.DEBUG_MODE: print(
+                f"Placement invalide pour {item_type_to_place} à ({grid_r},{grid_c}): {error_msg_placement}")
+            return []
+        return self.try_place_items_on_tiles(item_type_to_place, [(grid_r, grid_c)])
+
+    def place_items_in_rect(self, item_type_to_place, start_tile, end_tile):
+        input_recording.recorder.record(self.sim_tick_index, input_recording.ACTION_PLACE_RECT, item_type_to_place,
+                                        *start_tile, *end_tile)
+        return self.try_place_items_on_tiles(item_type_to_place, self.get_drag_build_tiles(start_tile, end_tile))
+
+    def refresh_placement_preview(self, mouse_pixel_pos):
+        # Appelé une fois par frame: les mouvements de souris sont regroupés en une seule évaluation
+        self.placement_overlay.refresh(self)
+        if not self.selected_item_to_place_type:
             self.is_placement_valid_preview = False
+            return
+        grid_pos = util.convert_pixels_to_grid(self.camera.screen_to_world(mouse_pixel_pos), self.grid_origin_pixels,
+                                               self.scaler)
+        is_valid, _, _ = self.get_cached_placement_validity(self.selected_item_to_place_type, grid_pos)
+        self.is_placement_valid_preview = is_valid
+
+    def get_cached_placement_validity(self, item_type_to_place, grid_pos):
+        # Le résultat ne dépend que de la case, de la grille, de l'argent et de l'énergie
+        cache_key = (item_type_to_place, grid_pos, self.grid_revision, self.money,
+                     self.electricity_produced, self.electricity_consumed)
+        result = self.placement_validity_cache.get(cache_key)
+        if result is None:
+            if len(self.placement_validity_cache) >= cfg.PLACEMENT_VALIDITY_CACHE_MAX_ENTRIES:
+                self.placement_validity_cache.clear()
+            result = self.check_placement_validity_at(item_type_to_place, grid_pos[0], grid_pos[1])
+            self.placement_validity_cache[cache_key] = result
+        return result
 
     def check_placement_validity(self, item_type_to_place, mouse_pixel_pos):
-        grid_r, grid_c = util.convert_pixels_to_grid(mouse_pixel_pos, (
-        self.buildable_area_rect_pixels.x, self.buildable_area_rect_pixels.y), self.scaler)
-        if not (0 <= grid_r < self.grid_height_tiles and 0 <= grid_c < self.grid_width_tiles): return False, (
-        grid_r, grid_c), "Hors de la zone."
-
-        item_on_grid = self.game_grid[grid_r][grid_c]
-        item_below = self.game_grid[grid_r + 1][grid_c] if grid_r + 1 < self.grid_height_tiles else None
-        stats_to_place = objects.get_item_stats(item_type_to_place)
+        grid_r, grid_c = util.convert_pixels_to_grid(mouse_pixel_pos, self.grid_origin_pixels, self.scaler)
+        return self.check_placement_validity_at(item_type_to_place, grid_r, grid_c)
+
+    def check_placement_validity_at(self, item_type_to_place, grid_r, grid_c):
+        if not self.is_tile_in_grid(grid_r, grid_c): return False, (grid_r, grid_c), "Hors de la zone."
+        rules_ok, error_message = self.check_placement_rules_at(item_type_to_place, grid_r, grid_c)
+        if not rules_ok: return False, (grid_r, grid_c), error_message
+        resources_ok, error_message = self.check_placement_resources(item_type_to_place)
+        return resources_ok, (grid_r, grid_c), error_message
+
+    def check_placement_rules_at(self, item_type_to_place, grid_r, grid_c):
+        # Règles qui ne dépendent que de la case et de celle du dessous (cf. placement_overlay)
+        item_on_grid = self.tile_index.get_top(grid_r, grid_c)
+        item_below = self.tile_index.get_top(grid_r + 1, grid_c) if grid_r < self.grid_bottom_row else None
         placement_requirement_met = False
         error_message = "Placement non autorisé."
 
         if item_type_to_place == "frame":
             can_place_on_empty_with_support = False
             is_first_row_on_empty_grid_part = (
-                        item_on_grid is None and item_below is None and grid_r == self.grid_height_tiles - 1)
+                        item_on_grid is None and item_below is None and grid_r == self.grid_bottom_row)
 
             if item_on_grid is None:
                 if is_first_row_on_empty_grid_part:
@@ -360,9 +536,7 @@ class GameState:
 
         elif objects.is_turret_type(item_type_to_place):
             if item_on_grid and isinstance(item_on_grid, objects.Building) and item_on_grid.type == "frame":
-                already_has_turret_at_pos = any(
-                    turret.grid_pos == (grid_r, grid_c) for turret in self.turrets if turret.active)
-                if not already_has_turret_at_pos:
+                if not self.tile_index.has_turret(grid_r, grid_c):
                     placement_requirement_met = True
                 else:
                     error_message = "Une tourelle existe déjà sur cette structure."
@@ -376,41 +550,94 @@ class GameState:
         else:
             error_message = f"Type d'objet inconnu pour placement: {item_type_to_place}"
 
-        if not placement_requirement_met: return False, (grid_r, grid_c), error_message
+        return placement_requirement_met, error_message
 
+    def check_placement_resources(self, item_type_to_place, pending_cost=0, pending_power_balance=0):
+        # Identique pour toutes les cases: argent et énergie.
+        # pending_*: ce qui est déjà engagé par les cases précédentes d'un placement groupé (drag)
+        stats_to_place = objects.get_item_stats(item_type_to_place)
         cost_money = stats_to_place.get(cfg.STAT_COST_MONEY, 0);
         # cost_iron = stats_to_place.get(cfg.STAT_COST_IRON, 0) # Iron cost for building is removed
-        if self.money < cost_money: return False, (grid_r, grid_c), f"Pas assez d'argent (${cost_money})"
+        if self.money - pending_cost < cost_money: return False, f"Pas assez d'argent (${cost_money})"
         # if self.iron_stock < cost_iron: return False, (grid_r, grid_c), f"Pas assez de fer ({cost_iron} Fe)" # MODIFIED: Removed iron check for placement
 
         power_prod_impact = stats_to_place.get(cfg.STAT_POWER_PRODUCTION, 0);
         power_conso_impact = stats_to_place.get(cfg.STAT_POWER_CONSUMPTION, 0)
         if power_conso_impact > 0 and power_prod_impact == 0 and item_type_to_place != "storage":
-            if self.electricity_produced < (self.electricity_consumed + power_conso_impact):
-                return False, (grid_r, grid_c), "Pas assez d'énergie!"
-        return True, (grid_r, grid_c), "OK"
+            if self.electricity_produced + pending_power_balance < (self.electricity_consumed + power_conso_impact):
+                return False, "Pas assez d'énergie!"
+        return True, "OK"
 
     def try_place_item_on_grid(self, mouse_pixel_pos):
+        # mouse_pixel_pos en coordonnées monde (cf. camera.screen_to_world)
         item_type_to_place = self.selected_item_to_place_type;
         if not item_type_to_place: return
-        is_valid, (grid_r, grid_c), error_msg_placement = self.check_placement_validity(item_type_to_place,
-                                                                                        mouse_pixel_pos)
-        if not is_valid:
-            self.show_error_message(error_msg_placement)
-            if cfg.DEBUG_MODE: print(
-                f"Placement invalide pour {item_type_to_place} à ({grid_r},{grid_c}): {error_msg_placement}")
-            return
+        click_grid_pos = util.convert_pixels_to_grid(mouse_pixel_pos, self.grid_origin_pixels, self.scaler)
+        self.place_item_at(item_type_to_place, click_grid_pos)
+
+    def get_drag_build_end_tile(self, mouse_pixel_pos):
+        # Limitée à la grille pour que le rectangle ne déborde pas quand la souris sort de la zone
+        grid_r, grid_c = util.convert_pixels_to_grid(mouse_pixel_pos, self.grid_origin_pixels, self.scaler)
+        grid_r = min(max(grid_r, self.grid_origin_row), self.grid_bottom_row)
+        grid_c = min(max(grid_c, 0), self.grid_width_tiles - 1)
+        return grid_r, grid_c
+
+    def get_drag_build_tiles(self, start_tile, end_tile):
+        # Rectangle entre les deux cases, du bas vers le haut pour que chaque rangée serve de support à la suivante
+        r_min, r_max = min(start_tile[0], end_tile[0]), max(start_tile[0], end_tile[0])
+        c_min, c_max = min(start_tile[1], end_tile[1]), max(start_tile[1], end_tile[1])
+        return [(r, c) for r in range(r_max, r_min - 1, -1) for c in range(c_min, c_max + 1)]
+
+    def try_place_items_on_tiles(self, item_type_to_place, tiles):
+        """
+        Place l'objet sur chaque case dans l'ordre donné. Chaque case est validée en tenant compte des
+        objets déjà posés par ce même appel. Le coût total est débité une seule fois et les mises à jour
+        dépendantes (sprites, adjacence, énergie) sont faites en une passe à la fin.
+        """
         stats_to_place = objects.get_item_stats(item_type_to_place)
-        self.money -= stats_to_place.get(cfg.STAT_COST_MONEY, 0);
-        # self.iron_stock -= stats_to_place.get(cfg.STAT_COST_IRON, 0) # MODIFIED: Removed iron deduction for placement
+        cost_money = stats_to_place.get(cfg.STAT_COST_MONEY, 0)
+        power_balance_per_item = stats_to_place.get(cfg.STAT_POWER_PRODUCTION, 0) - stats_to_place.get(
+            cfg.STAT_POWER_CONSUMPTION, 0)
+        placed_items = []
+        first_error_message = None
+        for grid_r, grid_c in tiles:
+            pending_cost = cost_money * len(placed_items)
+            is_valid = self.is_tile_in_grid(grid_r, grid_c)
+            error_msg_placement = "Hors de la zone."
+            if is_valid:
+                is_valid, error_msg_placement = self.check_placement_rules_at(item_type_to_place, grid_r, grid_c)
+            if is_valid:
+                is_valid, error_msg_placement = self.check_placement_resources(
+                    item_type_to_place, pending_cost, power_balance_per_item * len(placed_items))
+            if not is_valid:
+                if first_error_message is None: first_error_message = error_msg_placement
+                if cfg.DEBUG_MODE: print(
+                    f"Placement invalide pour {item_type_to_place} à ({grid_r},{grid_c}): {error_msg_placement}")
+                continue
+            newly_created_item = self.create_item_on_tile(item_type_to_place, grid_r, grid_c)
+            if newly_created_item:
+                placed_items.append(newly_created_item)
+            elif cfg.DEBUG_MODE:
+                print(f"ERREUR: Échec de création de l'objet {item_type_to_place} après validation.")
 
-        pixel_pos_for_new_item = util.convert_grid_to_pixels((grid_r, grid_c), (
-        self.buildable_area_rect_pixels.x, self.buildable_area_rect_pixels.y), self.scaler)
+        if not placed_items:
+            if first_error_message: self.show_error_message(first_error_message)
+            return placed_items
+        self.money -= cost_money * len(placed_items)
+        # self.iron_stock -= stats_to_place.get(cfg.STAT_COST_IRON, 0) # MODIFIED: Removed iron deduction for placement
+        self.apply_placement_side_effects()
+        if cfg.DEBUG_MODE: print(f"Placed {len(placed_items)} x {item_type_to_place} "
+                                 f"({[item.grid_pos for item in placed_items]})")
+        return placed_items
+
+    def create_item_on_tile(self, item_type_to_place, grid_r, grid_c):
+        # Crée l'objet et met à jour game_grid / tile_index, sans les mises à jour dépendantes
+        pixel_pos_for_new_item = util.convert_grid_to_pixels((grid_r, grid_c), self.grid_origin_pixels, self.scaler)
         if objects.is_turret_type(item_type_to_place):
-            tile_center_x = self.buildable_area_rect_pixels.x + grid_c * self.scaler.tile_size + self.scaler.tile_size // 2
-            tile_center_y = self.buildable_area_rect_pixels.y + grid_r * self.scaler.tile_size + self.scaler.tile_size // 2
+            tile_center_x = self.grid_origin_pixels[0] + grid_c * self.scaler.tile_size + self.scaler.tile_size // 2
+            tile_center_y = self.grid_origin_pixels[1] + grid_r * self.scaler.tile_size + self.scaler.tile_size // 2
             pixel_pos_for_new_item = (tile_center_x, tile_center_y)
-        item_on_grid_before_placement = self.game_grid[grid_r][grid_c]
+        item_on_grid_before_placement = self.tile_index.get_top(grid_r, grid_c)
         newly_created_item = None
 
         if item_type_to_place == "frame":
@@ -422,6 +649,7 @@ class GameState:
                                                                                    'is_reinforced_foundation', False):
                 newly_created_item.set_as_reinforced_frame(True)
                 if item_on_grid_before_placement in self.buildings: item_on_grid_before_placement.active = False
+                self.remove_item_from_grid_indexes(item_on_grid_before_placement)
             else:
                 newly_created_item.set_as_reinforced_frame(False)
             self.game_grid[grid_r][grid_c] = newly_created_item
@@ -441,6 +669,7 @@ class GameState:
             if item_on_grid_before_placement and isinstance(item_on_grid_before_placement, objects.Building) and \
                     item_on_grid_before_placement.type == "frame":
                 item_on_grid_before_placement.active = False
+                self.remove_item_from_grid_indexes(item_on_grid_before_placement)
                 if cfg.DEBUG_MODE: print(f"Frame à ({grid_r},{grid_c}) remplacée par un mineur.")
             self.game_grid[grid_r][grid_c] = newly_created_item
 
@@ -451,100 +680,79 @@ class GameState:
             if item_on_grid_before_placement and isinstance(item_on_grid_before_placement,
                                                             objects.Building) and item_on_grid_before_placement.type == "frame":
                 item_on_grid_before_placement.active = False
+                self.remove_item_from_grid_indexes(item_on_grid_before_placement)
             self.game_grid[grid_r][grid_c] = newly_created_item
 
-        if newly_created_item:
-            if hasattr(newly_created_item,
-                       'update_sprite_based_on_context'): newly_created_item.update_sprite_based_on_context(
-                self.game_grid, grid_r, grid_c, self.scaler)
-            for dr_n, dc_n in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                nr, nc = grid_r + dr_n, grid_c + dc_n
-                if 0 <= nr < self.grid_height_tiles and 0 <= nc < self.grid_width_tiles:
-                    neighbor = self.game_grid[nr][nc]
-                    if neighbor and hasattr(neighbor,
-                                            'update_sprite_based_on_context'): neighbor.update_sprite_based_on_context(
-                        self.game_grid, nr, nc, self.scaler)
-            if hasattr(newly_created_item, 'apply_adjacency_bonus_effect'):
-                self.check_and_apply_adjacency_bonus(newly_created_item, grid_r, grid_c)
-                if newly_created_item.type == "storage":
-                    for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                        nr, nc = grid_r + dr, grid_c + dc
-                        if 0 <= nr < self.grid_height_tiles and 0 <= nc < self.grid_width_tiles:
-                            neighbor_item = self.game_grid[nr][nc]
-                            if neighbor_item and neighbor_item.type == "storage": self.check_and_apply_adjacency_bonus(
-                                neighbor_item, nr, nc)
-            self.update_resource_production_consumption()
-            if cfg.DEBUG_MODE: print(f"Placed {item_type_to_place} at ({grid_r},{grid_c})")
-        else:
-            if cfg.DEBUG_MODE: print(f"ERREUR: Échec de création de l'objet {item_type_to_place} après validation.")
-            self.money += stats_to_place.get(cfg.STAT_COST_MONEY, 0);
-            # self.iron_stock += stats_to_place.get(cfg.STAT_COST_IRON, 0) # MODIFIED: Removed iron refund
+        if newly_created_item: self.add_item_to_grid_indexes(newly_created_item)
+        return newly_created_item
+
+    def add_item_to_grid_indexes(self, item):
+        self.tile_index.place(item)
+        self.static_layer.mark_tile_dirty(*item.grid_pos)
+        if item.type == "storage":
+            self.storage_clusters.add(item)
+            self.iron_storage_capacity = cfg.BASE_IRON_CAPACITY + self.storage_clusters.total_capacity_increase
+        elif item.type == "miner":
+            self.refresh_miner_sprites(self.miner_columns.add(*item.grid_pos))
+
+    def remove_item_from_grid_indexes(self, item):
+        self.tile_index.remove(item)
+        self.static_layer.mark_tile_dirty(*item.grid_pos)
+        if item.type == "storage":
+            self.storage_clusters.remove(item)
+            self.iron_storage_capacity = cfg.BASE_IRON_CAPACITY + self.storage_clusters.total_capacity_increase
+        elif item.type == "miner":
+            self.refresh_miner_sprites(self.miner_columns.remove(*item.grid_pos))
+
+    def refresh_miner_sprites(self, changed_cells):
+        # Seules les extrémités de piles dont la clé de sprite a changé
+        for grid_r, grid_c in changed_cells:
+            miner = self.tile_index.get(tile_occupancy.LAYER_BUILDING, grid_r, grid_c)
+            if miner is not None and miner.type == "miner":
+                miner.set_stack_sprite_key(self.miner_columns.get_sprite_key(grid_r, grid_c), self.scaler)
+                self.static_layer.mark_tile_dirty(grid_r, grid_c)
+
+    def apply_placement_side_effects(self):
+        # Une seule passe pour tout un lot. Les bonus d'adjacence des stockages (storage_clusters) et les
+        # sprites de mines empilées (miner_columns) sont déjà tenus à jour à l'ajout dans les index.
+        self.grid_revision += 1
+        self.update_resource_production_consumption()
 
     def get_placement_requirement_message(self, item_type, existing_item_on_grid, grid_r_coord, grid_c_coord):
-        _, _, msg = self.check_placement_validity(item_type, util.convert_grid_to_pixels((grid_r_coord, grid_c_coord), (
-        self.buildable_area_rect_pixels.x, self.buildable_area_rect_pixels.y), self.scaler))
+        _, _, msg = self.check_placement_validity_at(item_type, grid_r_coord, grid_c_coord)
         return msg != "OK", msg
 
-    def check_and_apply_adjacency_bonus(self, item, r, c):
-        if not item or not hasattr(item, 'apply_adjacency_bonus_effect'): return
-        if item.type == "storage":
-            adjacent_similar_items_count = 0
-            for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < self.grid_height_tiles and 0 <= nc < self.grid_width_tiles and \
-                        self.game_grid[nr][nc] and self.game_grid[nr][nc].type == "storage":
-                    adjacent_similar_items_count += 1
-            item.apply_adjacency_bonus_effect(adjacent_similar_items_count)
-
     def try_expand_build_area(self, direction):
+        input_recording.recorder.record(self.sim_tick_index, input_recording.ACTION_EXPAND, direction)
         cost_expansion = self.get_next_expansion_cost(direction)
         if cost_expansion == "Max": self.show_error_message("Expansion max atteinte."); return
         if not isinstance(cost_expansion, (int, float)) or cost_expansion <= 0: self.show_error_message(
             "Coût d'expansion invalide."); return
         if self.money >= cost_expansion:
             self.money -= cost_expansion
+            # Grille préallouée: ni les objets ni leurs positions à l'écran ne bougent, O(1)
             if direction == "up":
-                self.current_expansion_up_tiles += 1;
-                new_row = [None for _ in range(self.grid_width_tiles)];
-                self.game_grid.insert(0, new_row);
+                self.current_expansion_up_tiles += 1
+                self.grid_origin_row -= 1
                 self.grid_height_tiles += 1
-                for r_idx in range(1, self.grid_height_tiles):
-                    for c_idx in range(self.grid_width_tiles):
-                        item_obj = self.game_grid[r_idx][c_idx]
-                        if item_obj: item_obj.grid_pos = (item_obj.grid_pos[0] + 1, item_obj.grid_pos[1])
             elif direction == "side":
-                self.current_expansion_sideways_steps += 1;
-                tiles_to_add = cfg.BASE_GRID_EXPANSION_SIDEWAYS_TILES_PER_STEP
-                for r_idx in range(self.grid_height_tiles): self.game_grid[r_idx].extend(
-                    [None for _ in range(tiles_to_add)])
-                self.grid_width_tiles += tiles_to_add
+                self.current_expansion_sideways_steps += 1
+                self.grid_width_tiles += cfg.BASE_GRID_EXPANSION_SIDEWAYS_TILES_PER_STEP
             self.update_buildable_area_rect()
-            for r_val in range(self.grid_height_tiles):
-                for c_val in range(self.grid_width_tiles):
-                    item_obj = self.game_grid[r_val][c_val]
-                    if item_obj:
-                        item_obj.rect.topleft = util.convert_grid_to_pixels((r_val, c_val), (
-                        self.buildable_area_rect_pixels.x, self.buildable_area_rect_pixels.y), self.scaler)
-                        if hasattr(item_obj, 'update_sprite_based_on_context'): item_obj.update_sprite_based_on_context(
-                            self.game_grid, r_val, c_val, self.scaler)
-            self.update_resource_production_consumption();
+            self.grid_revision += 1
             self.show_error_message("Zone de base étendue!")
             if cfg.DEBUG_MODE: print(f"Expanded grid to {self.grid_width_tiles}x{self.grid_height_tiles}")
         else:
             self.show_error_message(f"Pas assez d'argent ({cost_expansion}$)")
 
     def update_resource_production_consumption(self):
-        total_electricity_produced, total_electricity_consumed, total_iron_storage_increase = 0, 0, 0
+        total_electricity_produced, total_electricity_consumed = 0, 0
         all_constructs = self.buildings + self.turrets
         for item in all_constructs:
             if not item.active: continue
             item_stats = objects.get_item_stats(item.type)
             total_electricity_produced += item_stats.get(cfg.STAT_POWER_PRODUCTION, 0)
             total_electricity_consumed += item_stats.get(cfg.STAT_POWER_CONSUMPTION, 0)
-            if isinstance(item, objects.Building) and item.type == "storage":
-                base_storage = item_stats.get(cfg.STAT_IRON_STORAGE_INCREASE, 0)
-                bonus_storage = getattr(item, 'current_adjacency_bonus_value', 0)
-                total_iron_storage_increase += (base_storage + bonus_storage)
         is_globally_powered = total_electricity_produced >= total_electricity_consumed
         effective_iron_production_pm = 0
         for item in all_constructs:
@@ -562,7 +770,7 @@ class GameState:
         self.electricity_produced = total_electricity_produced
         self.electricity_consumed = total_electricity_consumed
         self.iron_production_per_minute = effective_iron_production_pm
-        self.iron_storage_capacity = cfg.BASE_IRON_CAPACITY + total_iron_storage_increase
+        self.iron_storage_capacity = cfg.BASE_IRON_CAPACITY + self.storage_clusters.total_capacity_increase
         self.iron_production_per_tick_display = self.iron_production_per_minute / 60.0
 
     def update_resources_per_tick(self, delta_time):
@@ -571,30 +779,37 @@ class GameState:
 
     def update_game_logic(self, delta_time):
         if self.game_over_flag or self.game_paused: return
+        profiler = frame_profiler.profiler
         self.total_time_elapsed_seconds += delta_time
         self.update_ui_message_timers(delta_time)
-        self.update_timers_and_waves(delta_time)
+        with profiler.zone(frame_profiler.ZONE_WAVES):
+            self.update_timers_and_waves(delta_time)
         self.update_resources_per_tick(delta_time)
         power_available_overall = self.electricity_produced >= self.electricity_consumed
-        for turret in self.turrets:
-            if turret.active: turret.update(delta_time, self.enemies, power_available_overall, self, self.scaler)
+        with profiler.zone(frame_profiler.ZONE_TURRETS):
+            for turret in self.turrets:
+                if turret.active: turret.update(delta_time, self.enemies, power_available_overall, self, self.scaler)
         for building in self.buildings:
             if building.active: building.update(delta_time, self, self.scaler)
-        for proj in self.projectiles:
-            if proj.active: proj.update(delta_time, self, self.scaler)
-        for enemy in self.enemies:
-            if enemy.active:
-                enemy.update(delta_time, self, self.scaler)
-                base_line_x = self.buildable_area_rect_pixels.left
-                if enemy.active and enemy.rect.right < base_line_x:
-                    self.city_take_damage(enemy.get_city_damage())
-                    enemy.active = False
-                    if self.city_hp > 0 and cfg.DEBUG_MODE: print(
-                        f"Ville touchée par {getattr(enemy, 'type_id', 'unknown')}! HP restants: {self.city_hp}")
+        with profiler.zone(frame_profiler.ZONE_PROJECTILES):
+            for proj in self.projectiles:
+                if proj.active: proj.update(delta_time, self, self.scaler)
+        with profiler.zone(frame_profiler.ZONE_ENEMIES):
+            for enemy in self.enemies:
+                if enemy.active:
+                    enemy.update(delta_time, self, self.scaler)
+                    base_line_x = self.buildable_area_rect_pixels.left
+                    if enemy.active and enemy.rect.right < base_line_x:
+                        self.city_take_damage(enemy.get_city_damage())
+                        enemy.active = False
+                        if self.city_hp > 0 and cfg.DEBUG_MODE: print(
+                            f"Ville touchée par {getattr(enemy, 'type_id', 'unknown')}! HP restants: {self.city_hp}")
         for effect in self.particle_effects:
             if effect.active: effect.update(delta_time, self, self.scaler)
-        self.handle_collisions();
-        self.cleanup_inactive_objects()
+        with profiler.zone(frame_profiler.ZONE_COLLISIONS):
+            self.handle_collisions();
+        with profiler.zone(frame_profiler.ZONE_CLEANUP):
+            self.cleanup_inactive_objects()
         if self.city_hp <= 0 and not self.game_over_flag: self.trigger_game_over()
 
     def city_take_damage(self, amount):
@@ -627,6 +842,7 @@ class GameState:
                         if not enemy.active:
                             self.money += enemy.get_money_value();
                             self.score += enemy.get_score_value()
+                            self.kills += 1
                             self.enemies_in_wave_remaining = max(0, self.enemies_in_wave_remaining - 1)
                         break
         for proj_to_remove in projectiles_to_remove_after_loop:
@@ -642,8 +858,29 @@ class GameState:
                 if not enemy.active:
                     self.money += enemy.get_money_value();
                     self.score += enemy.get_score_value()
+                    self.kills += 1
                     self.enemies_in_wave_remaining = max(0, self.enemies_in_wave_remaining - 1)
 
+    def get_metrics_record(self):
+        # Instantané compact de la partie pour metrics_stream (types simples uniquement, sérialisables en JSON)
+        return {
+            "sim_time": round(self.total_time_elapsed_seconds, 3),
+            "wave": self.current_wave_number,
+            "wave_in_progress": self.wave_in_progress,
+            "enemies": len(self.enemies),
+            "projectiles": len(self.projectiles),
+            "turrets": len(self.turrets),
+            "buildings": len(self.buildings),
+            "spawn_queue": len(self.enemies_in_current_wave_to_spawn),
+            "money": self.money,
+            "iron": round(self.iron_stock, 2),
+            "power_produced": self.electricity_produced,
+            "power_consumed": self.electricity_consumed,
+            "power_balance": self.electricity_produced - self.electricity_consumed,
+            "kills": self.kills,
+            "city_hp": self.city_hp,
+        }
+
     def cleanup_inactive_objects(self):
         self.enemies = [e for e in self.enemies if e.active]
         self.projectiles = [p for p in self.projectiles if p.active]
@@ -661,11 +898,11 @@ class GameState:
 
     def get_next_expansion_cost(self, direction):
         if direction == "up":
-            if self.current_expansion_up_tiles >= cfg.BASE_GRID_MAX_EXPANSION_UP_TILES: return "Max"
+            if self.current_expansion_up_tiles >= self.max_expansion_up_tiles: return "Max"
             return int(
                 cfg.BASE_EXPANSION_COST_UP * (cfg.EXPANSION_COST_INCREASE_FACTOR_UP ** self.current_expansion_up_tiles))
         elif direction == "side":
-            if self.current_expansion_sideways_steps >= cfg.BASE_GRID_MAX_EXPANSION_SIDEWAYS_STEPS: return "Max"
+            if self.current_expansion_sideways_steps >= self.max_expansion_sideways_steps: return "Max"
             return int(cfg.BASE_EXPANSION_COST_SIDE * (
                         cfg.EXPANSION_COST_INCREASE_FACTOR_SIDE ** self.current_expansion_sideways_steps))
         return "N/A"
@@ -690,6 +927,7 @@ class GameState:
         if generator_hit and generator_hit.active and not missed:
             # 1. Détruire le générateur
             generator_hit.active = False  #  inactif
+            self.remove_item_from_grid_indexes(generator_hit)
             # if generator_hit in self.buildings: self.buildings.remove(generator_hit)
 
             # 2. Remplacer par une ruine dans game_grid
@@ -700,12 +938,15 @@ class GameState:
             if "ruin" in objects.BUILDING_STATS:
                 ruin_obj = objects.Building("ruin", ruin_pixel_pos, (grid_r, grid_c), self.scaler)
                 self.game_grid[grid_r][grid_c] = ruin_obj
+                self.add_item_to_grid_indexes(ruin_obj)
                 self.buildings.append(ruin_obj)  # add to the draw list
                 if cfg.DEBUG_MODE: print(f"  Generator {generator_hit.id} at ({grid_r},{grid_c}) replaced by ruin.")
             elif cfg.DEBUG_MODE:
                 print(f"  ERREUR: Type 'ruin' non trouvé dans BUILDING_STATS. Case laissée vide.")
                 self.game_grid[grid_r][grid_c] = None  # Laisser vide si pas de ruine définie
 
+            self.grid_revision += 1
+
             # 3. Mettre à jour la production/consommation d'énergie
             self.update_resource_production_consumption()
 
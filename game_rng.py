@@ -0,0 +1,42 @@
+# game_rng.py
+import random
+import game_config as cfg
+
+# Flux nommés: chaque flux a son propre générateur, dérivé de la graine de la partie. Un tirage en plus
+# dans un flux ne décale pas les autres (ex: la densité de particules réglable ne touche pas aux vagues).
+STREAM_SPAWN = "spawn"  # Apparition des ennemis: hauteur, taille (hitbox)
+STREAM_VISUALS = "visuals"  # Tirages dont le nombre dépend des réglages de qualité (particules de flamme)
+STREAM_COMBAT = "combat"  # Tirs des tourelles (élévation du mortier)
+STREAMS = (STREAM_SPAWN, STREAM_VISUALS, STREAM_COMBAT)
+
+
+def new_seed():
+    return random.SystemRandom().randrange(2 ** 32)
+
+
+class GameRng:
+    """
+    Hasard d'une partie: une graine, un random.Random par flux. Deux parties avec la même graine et les
+    mêmes actions donnent la même simulation (benchmarks répétables, rejeu des parties enregistrées).
+    """
+
+    def __init__(self, seed=None):
+        if seed is None: seed = cfg.RNG_SEED if cfg.RNG_SEED is not None else new_seed()
+        self.seed = seed
+        # Graine texte "graine:flux": déterministe d'une exécution à l'autre (pas de hash() randomisé)
+        self.streams = {name: random.Random(f"{seed}:{name}") for name in STREAMS}
+
+    def get_stream(self, name):
+        return self.streams[name]
+
+    @property
+    def spawn(self):
+        return self.streams[STREAM_SPAWN]
+
+    @property
+    def visuals(self):
+        return self.streams[STREAM_VISUALS]
+
+    @property
+    def combat(self):
+        return self.streams[STREAM_COMBAT]
@@ -1,183 +1,173 @@
 # gamemodes.py
 import pygame
-import sys
 import game_config as cfg
 import utility_functions as util
 import game_functions  # Assuming GameState has toggle_pause, trigger_game_over, handle_player_input methods
 import ui_functions
+import frame_profiler
+import input_recording
+
+# Action renvoyée par les menus pause / game over pour relancer le mode courant
+ACTION_RESTART = "restart_game"
+# clock.tick arrondit à la milliseconde: une frame de 16 ms à 60 FPS compte pour un tick (avance rattrapée ensuite)
+SIM_TICK_SNAP_SEC = 0.002
+
+# Example tutorial steps (could be loaded from a config file)
+TUTORIAL_STEPS = [
+    {"id": 0, "msg": "Bienvenue! Construisez une 'Structure' (Frame) sur une case vide.",
+     "condition": lambda gs: gs.tile_index.has_type("frame")},
+    {"id": 1, "msg": "Super! Maintenant, construisez un 'Générateur' sur la structure.",
+     "condition": lambda gs: gs.tile_index.has_type("generator")},
+    {"id": 2, "msg": "Bien joué! Les générateurs produisent de l'énergie. Essayez une 'Mine de Fer'.",
+     "condition": lambda gs: gs.tile_index.has_type("miner")},
+    {"id": 3, "msg": "Excellent! Les mines produisent du fer. Préparez-vous à vous défendre!",
+     "condition": lambda gs: False},  # End
+]
+
+# Les modes ne possèdent plus leur propre boucle: main.main_application_loop appelle ces
+# fonctions une fois par frame (un seul tick, un seul fill, un seul flip pour toute l'application).
+
+
+def start_game_mode(screen, clock, game_state_instance: game_functions.GameState, is_tutorial=False, seed=None):
+    # init_new_game is called to reset its state for this specific game mode run (seed: rejeu, cf. replay_player.py)
+    game_state_instance.init_new_game(screen, clock, is_tutorial=is_tutorial, seed=seed)
+    if is_tutorial:
+        game_state_instance.tutorial_step_index = 0
+        if TUTORIAL_STEPS:
+            game_state_instance.show_tutorial_message(TUTORIAL_STEPS[0]["msg"], 9999)  # Long duration
+        if cfg.DEBUG_MODE: print("GAMEMODE: Lancement du Mode Tutoriel...")
+        return cfg.STATE_TUTORIAL
+    if cfg.DEBUG_MODE: print("GAMEMODE: Lancement du Mode de Jeu Principal...")
+    return cfg.STATE_GAMEPLAY
 
 
-def run_main_game_mode(screen, clock, game_state_instance: game_functions.GameState, scaler: util.Scaler):
-    # game_state_instance is already initialized with the scaler in main.py
-    # init_new_game is called to reset its state for this specific game mode run
-    game_state_instance.init_new_game(screen, clock, is_tutorial=False)  # Pass False for main game
-    # game_state_instance.running_game = True # This is managed by the while loop condition below
-    # game_paused and game_over_flag are reset by init_new_game
+def get_active_mode_state(game_state_instance: game_functions.GameState):
+    return cfg.STATE_TUTORIAL if game_state_instance.is_tutorial else cfg.STATE_GAMEPLAY
 
-    if cfg.DEBUG_MODE: print("GAMEMODE: Lancement du Mode de Jeu Principal...")
 
-    running_this_mode = True  # Local loop control
-    while running_this_mode:
-        delta_time = clock.tick(cfg.FPS) / 1000.0
-        mouse_pos = pygame.mouse.get_pos()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running_this_mode = False
-                return cfg.STATE_QUIT  # Signal to main app to quit
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    if game_state_instance.game_over_flag:
-                        if cfg.DEBUG_MODE: print("GAMEMODE: ESC on Game Over screen, returning to MENU.")
-                        running_this_mode = False
-                        return cfg.STATE_MENU
-                    else:
-                        game_state_instance.toggle_pause()
-                        if cfg.DEBUG_MODE: print(
-                            f"GAMEMODE: ESC pressed. Pause toggled. Paused: {game_state_instance.game_paused}")
-
-            # --- Event handling based on game sub-state (paused, game over, active) ---
-            if game_state_instance.game_paused:
-                action = ui_functions.check_pause_menu_click(event, mouse_pos, scaler)  # Pass scaler
-                if action:
-                    if cfg.DEBUG_MODE: print(f"GAMEMODE: Pause menu action: {action}")
-                    if action == "resume":
-                        game_state_instance.toggle_pause()
-                    elif action == "restart_game":
-                        if cfg.DEBUG_MODE: print("GAMEMODE: Action Recommencer depuis pause.")
-                        running_this_mode = False
-                        return "restart_game"
-                    elif action == cfg.STATE_MENU:
-                        running_this_mode = False
-                        return cfg.STATE_MENU
-                    elif action == cfg.STATE_QUIT:
-                        running_this_mode = False
-                        return cfg.STATE_QUIT
-
-            elif game_state_instance.game_over_flag:
-                action = ui_functions.check_game_over_menu_click(event, mouse_pos, scaler)  # Pass scaler
-                if action:
-                    if cfg.DEBUG_MODE: print(f"GAMEMODE: Game Over menu action: {action}")
-                    if action == "retry":
-                        if cfg.DEBUG_MODE: print("GAMEMODE: Action Recommencer (Retry) depuis game over.")
-                        running_this_mode = False
-                        return "restart_game"
-                    elif action == cfg.STATE_MENU:
-                        running_this_mode = False
-                        return cfg.STATE_MENU
-                    elif action == cfg.STATE_QUIT:
-                        running_this_mode = False
-                        return cfg.STATE_QUIT
-
-            else:  # Game is active (not paused, not game over)
-                game_state_instance.handle_player_input(event, mouse_pos)
-
-        # --- Logic Update ---
-        if not game_state_instance.game_paused and not game_state_instance.game_over_flag:
-            game_state_instance.update_game_logic(delta_time)
-            # Check for game over condition AFTER updating logic (e.g., city_hp drops to 0)
-            # GameState's update_game_logic or a dedicated method should set game_state_instance.game_over_flag
-            if hasattr(game_state_instance,
-                       'city_hp') and game_state_instance.city_hp <= 0 and not game_state_instance.game_over_flag:
-                game_state_instance.trigger_game_over()
-                if cfg.DEBUG_MODE: print("GAMEMODE: Game Over condition met (City HP <= 0).")
-
-        else:  # Still update UI message timers even if paused/game over
-            game_state_instance.update_ui_message_timers(delta_time)
-
-        # --- Drawing (Layered Approach) ---
-        # 1. Game World (Background, Grid, Objects, Placement Preview)
-        game_state_instance.draw_game_world()
-
-        # 2. Static UI and Modal UI (Top Bar, Build Menu, Messages, Pause/Game Over Screens)
-        game_state_instance.draw_game_ui_elements()
+# --- Jeu actif (principal ou tutoriel) ---
 
-        pygame.display.flip()
-
-    if cfg.DEBUG_MODE: print("GAMEMODE: Main game loop ended.")
-    return cfg.STATE_MENU  # Default return to menu if loop exits unexpectedly
-
-
-def run_tutorial_mode(screen, clock, game_state_instance: game_functions.GameState, scaler: util.Scaler):
-    game_state_instance.init_new_game(screen, clock, is_tutorial=True)
-    if cfg.DEBUG_MODE: print("GAMEMODE: Lancement du Mode Tutoriel...")
-
-    # Example tutorial steps (could be loaded from a config file)
-    tutorial_steps = [
-        {"id": 0, "msg": "Bienvenue! Construisez une 'Structure' (Frame) sur une case vide.",
-         "condition": lambda gs: any(b.type == "frame" for b in gs.buildings)},
-        {"id": 1, "msg": "Super! Maintenant, construisez un 'Générateur' sur la structure.",
-         "condition": lambda gs: any(b.type == "generator" for b in gs.buildings)},
-        {"id": 2, "msg": "Bien joué! Les générateurs produisent de l'énergie. Essayez une 'Mine de Fer'.",
-         "condition": lambda gs: any(b.type == "miner" for b in gs.buildings)},
-        {"id": 3, "msg": "Excellent! Les mines produisent du fer. Préparez-vous à vous défendre!",
-         "condition": lambda gs: False},  # End
-    ]
-    current_tutorial_step_index = 0
-    if tutorial_steps:
-        game_state_instance.show_tutorial_message(tutorial_steps[current_tutorial_step_index]["msg"],
-                                                  9999)  # Long duration
-
-    running_this_mode = True
-    while running_this_mode:
-        delta_time = clock.tick(cfg.FPS) / 1000.0
-        mouse_pos = pygame.mouse.get_pos()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running_this_mode = False
-                return cfg.STATE_QUIT
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    if game_state_instance.game_over_flag:  # Should not happen in tutorial
-                        running_this_mode = False
-                        return cfg.STATE_MENU
-                    else:
-                        game_state_instance.toggle_pause()
-
-            if game_state_instance.game_paused:
-                action = ui_functions.check_pause_menu_click(event, mouse_pos, scaler)
-                if action:
-                    if action == "resume":
-                        game_state_instance.toggle_pause()
-                    elif action == "restart_game":  # Or "restart_tutorial"
-                        running_this_mode = False
-                        return "restart_tutorial"
-                    elif action == cfg.STATE_MENU:
-                        running_this_mode = False
-                        return cfg.STATE_MENU
-                    elif action == cfg.STATE_QUIT:
-                        running_this_mode = False
-                        return cfg.STATE_QUIT
-            # No game_over_flag check
-            else:  # Game is active
-                game_state_instance.handle_player_input(event, mouse_pos)
-                game_state_instance.update_tutorial_specific_logic(event)  # For any event-driven tutorial logic
-
-        # Tutorial Progression Check
-        if not game_state_instance.game_paused and current_tutorial_step_index < len(tutorial_steps):
-            current_step_data = tutorial_steps[current_tutorial_step_index]
-            if current_step_data["condition"](game_state_instance):
-                current_tutorial_step_index += 1
-                if current_tutorial_step_index < len(tutorial_steps):
-                    game_state_instance.show_tutorial_message(tutorial_steps[current_tutorial_step_index]["msg"], 9999)
-                else:
-                    game_state_instance.show_tutorial_message("Tutoriel Terminé! Bravo!",
-                                                              5)  # Short message then maybe auto-exit
-                    #running_this_mode = False; return cfg.STATE_MENU
-
-        if not game_state_instance.game_paused and not game_state_instance.game_over_flag:
-            game_state_instance.update_game_logic(delta_time)  # General game logic (timers, etc.)
-            game_state_instance.update_tutorial_progression(delta_time)  # For time-based tutorial steps
-        else:
-            game_state_instance.update_ui_message_timers(delta_time)
+def handle_game_mode_event(event, mouse_pos, game_state_instance: game_functions.GameState, scaler: util.Scaler):
+    """Retourne le prochain état de l'application, ou None pour rester dans le mode courant."""
+    game_state_instance.ensure_scale_current()  # La fenêtre a pu être redimensionnée par un événement précédent
+    if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+        game_state_instance.toggle_pause()
+        if cfg.DEBUG_MODE: print(f"GAMEMODE: ESC pressed. Pause toggled. Paused: {game_state_instance.game_paused}")
+        return cfg.STATE_PAUSED
 
-        game_state_instance.draw_game_world()
+    game_state_instance.handle_player_input(event, mouse_pos)
+    if game_state_instance.is_tutorial:
+        game_state_instance.update_tutorial_specific_logic(event)  # For any event-driven tutorial logic
+    return None
+
+
+def update_tutorial_steps(game_state_instance: game_functions.GameState):
+    step_index = getattr(game_state_instance, 'tutorial_step_index', 0)
+    if step_index >= len(TUTORIAL_STEPS): return
+    if TUTORIAL_STEPS[step_index]["condition"](game_state_instance):
+        step_index += 1
+        if step_index < len(TUTORIAL_STEPS):
+            game_state_instance.show_tutorial_message(TUTORIAL_STEPS[step_index]["msg"], 9999)
+        else:
+            game_state_instance.show_tutorial_message("Tutoriel Terminé! Bravo!", 5)  # Short message
+        game_state_instance.tutorial_step_index = step_index
+
+
+def step_game_mode(game_state_instance: game_functions.GameState):
+    """Un tick de simulation de durée fixe (cfg.SIM_TICK_SEC): même suite de ticks en jeu et au rejeu."""
+    if game_state_instance.is_tutorial:
+        update_tutorial_steps(game_state_instance)
+
+    game_state_instance.update_game_logic(cfg.SIM_TICK_SEC)
+    if game_state_instance.is_tutorial:
+        game_state_instance.update_tutorial_progression(cfg.SIM_TICK_SEC)  # For time-based tutorial steps
+    game_state_instance.sim_tick_index += 1
+    input_recording.recorder.on_sim_tick(game_state_instance)
+
+    # Check for game over condition AFTER updating logic (e.g., city_hp drops to 0)
+    if game_state_instance.city_hp <= 0 and not game_state_instance.game_over_flag:
+        game_state_instance.trigger_game_over()
+        if cfg.DEBUG_MODE: print("GAMEMODE: Game Over condition met (City HP <= 0).")
+    if game_state_instance.game_over_flag:
+        return cfg.STATE_GAME_OVER
+    return None
+
+
+def update_game_mode(delta_time, game_state_instance: game_functions.GameState):
+    game_state_instance.ensure_scale_current()
+    # Autant de ticks fixes que le temps écoulé en contient; le reste attend la frame suivante
+    game_state_instance.sim_time_accumulator += delta_time
+    next_state = None
+    tick_count = 0
+    while game_state_instance.sim_time_accumulator >= cfg.SIM_TICK_SEC - SIM_TICK_SNAP_SEC and next_state is None:
+        if tick_count == cfg.SIM_MAX_TICKS_PER_FRAME:
+            game_state_instance.sim_time_accumulator = 0.0
+            break
+        game_state_instance.sim_time_accumulator -= cfg.SIM_TICK_SEC
+        next_state = step_game_mode(game_state_instance)
+        tick_count += 1
+    # Affichage plus rapide que la simulation (120/144 FPS): les frames entre deux ticks interpolent les positions
+    game_state_instance.sim_interpolation_alpha = min(1.0, max(0.0, game_state_instance.sim_time_accumulator / cfg.SIM_TICK_SEC))
+
+    game_state_instance.camera.update_from_keys(delta_time)
+    game_state_instance.refresh_placement_preview(util.get_mouse_pos())  # Une évaluation par frame
+    return next_state
+
+
+def draw_game_mode(game_state_instance: game_functions.GameState, use_frozen_world=False):
+    game_state_instance.ensure_scale_current()  # Efface l'image figée si l'échelle a changé
+    # 1. Game World (Grid, Objects, Placement Preview)
+    with frame_profiler.profiler.zone(frame_profiler.ZONE_DRAW_WORLD):
+        if use_frozen_world:
+            # Pause / game over: le monde est dessiné une seule fois puis réutilisé tel quel
+            if game_state_instance.frozen_world_surface is None:
+                game_state_instance.draw_game_world()
+                game_state_instance.frozen_world_surface = game_state_instance.screen.copy()
+            else:
+                game_state_instance.screen.blit(game_state_instance.frozen_world_surface, (0, 0))
+        else:
+            game_state_instance.draw_game_world()
+    # 2. Static UI and Modal UI (Top Bar, Build Menu, Messages, Pause/Game Over Screens)
+    with frame_profiler.profiler.zone(frame_profiler.ZONE_DRAW_UI):
         game_state_instance.draw_game_ui_elements()
 
-        pygame.display.flip()
 
-    if cfg.DEBUG_MODE: print("GAMEMODE: Tutorial loop ended.")
-    return cfg.STATE_MENU
\ No newline at end of file
+# --- Pause ---
+
+def handle_paused_event(event, mouse_pos, game_state_instance: game_functions.GameState, scaler: util.Scaler):
+    if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+        game_state_instance.toggle_pause()
+        return get_active_mode_state(game_state_instance)
+
+    action = ui_functions.check_pause_menu_click(event, mouse_pos, scaler)
+    if not action: return None
+    if cfg.DEBUG_MODE: print(f"GAMEMODE: Pause menu action: {action}")
+    if action == "resume":
+        game_state_instance.toggle_pause()
+        return get_active_mode_state(game_state_instance)
+    if action == "restart_game":
+        if cfg.DEBUG_MODE: print("GAMEMODE: Action Recommencer depuis pause.")
+        return ACTION_RESTART
+    return action  # cfg.STATE_MENU ou cfg.STATE_QUIT
+
+
+# --- Game Over ---
+
+def handle_game_over_event(event, mouse_pos, game_state_instance: game_functions.GameState, scaler: util.Scaler):
+    if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+        if cfg.DEBUG_MODE: print("GAMEMODE: ESC on Game Over screen, returning to MENU.")
+        return cfg.STATE_MENU
+
+    action = ui_functions.check_game_over_menu_click(event, mouse_pos, scaler)
+    if not action: return None
+    if cfg.DEBUG_MODE: print(f"GAMEMODE: Game Over menu action: {action}")
+    if action == "retry":
+        if cfg.DEBUG_MODE: print("GAMEMODE: Action Recommencer (Retry) depuis game over.")
+        return ACTION_RESTART
+    return action  # cfg.STATE_MENU ou cfg.STATE_QUIT
+
+
+def update_modal_screen(delta_time, game_state_instance: game_functions.GameState):
+    # Still update UI message timers even if paused/game over
+    game_state_instance.update_ui_message_timers(delta_time)
+    return None
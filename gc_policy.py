@@ -0,0 +1,75 @@
+# gc_policy.py
+import gc
+import time
+import game_config as cfg
+
+
+class GcPolicy:
+    """
+    Ramasse-miettes piloté par les vagues: les objets chargés au démarrage sont gelés (gc.freeze, plus
+    jamais parcourus), les seuils sont relevés pendant une vague pour repousser les collections coûteuses,
+    et une collection complète est faite dans le creux entre deux vagues. Les pauses sont mesurées via
+    gc.callbacks et relevées une fois par frame par main.py.
+    """
+
+    def __init__(self):
+        self.default_thresholds = gc.get_threshold()
+        self.wave_thresholds_active = False
+        self.was_wave_in_progress = False
+        self.collection_start = 0.0
+        self.frame_pause_seconds = 0.0  # Pauses GC depuis le dernier pop_frame_pause_ms()
+        self.pause_total_seconds = 0.0
+        self.pause_max_seconds = 0.0
+        self.full_collections = 0
+
+    def install(self):
+        if self.on_gc_event not in gc.callbacks: gc.callbacks.append(self.on_gc_event)
+
+    def on_gc_event(self, phase, info):
+        if phase == "start":
+            self.collection_start = time.perf_counter()
+            return
+        pause = time.perf_counter() - self.collection_start
+        self.frame_pause_seconds += pause
+        self.pause_total_seconds += pause
+        self.pause_max_seconds = max(self.pause_max_seconds, pause)
+
+    def pop_frame_pause_ms(self):
+        frame_pause_ms = self.frame_pause_seconds * 1000.0
+        self.frame_pause_seconds = 0.0
+        return frame_pause_ms
+
+    def freeze_loaded_objects(self):
+        # Après le chargement des assets: ce qui vit maintenant vivra toute la partie
+        if not cfg.GC_POLICY_ENABLED: return
+        gc.collect()
+        gc.freeze()
+        if cfg.DEBUG_MODE: print(f"GC_POLICY: {gc.get_freeze_count()} objets gelés")
+
+    def set_wave_thresholds(self, is_active):
+        if is_active == self.wave_thresholds_active: return
+        self.wave_thresholds_active = is_active
+        gc.set_threshold(*(cfg.GC_WAVE_THRESHOLDS if is_active else self.default_thresholds))
+
+    def update(self, game_state, is_game_running):
+        # Appelé une fois par frame, après le tick; hors partie (menus, pause) les seuils par défaut s'appliquent
+        self.frame_pause_seconds = 0.0  # Pauses de l'attente et des frames non mesurées: pas pour cette frame
+        if not cfg.GC_POLICY_ENABLED: return
+        is_wave_in_progress = is_game_running and game_state.wave_in_progress
+        self.set_wave_thresholds(is_wave_in_progress)
+        if (self.was_wave_in_progress and not is_wave_in_progress and is_game_running
+                and game_state.time_to_next_wave_seconds >= cfg.GC_FULL_COLLECT_MIN_GAP_SEC):
+            # Fin de vague, la suivante est assez loin: le coût de la collection complète ne gêne pas le jeu
+            collect_start = time.perf_counter()
+            gc.collect()
+            self.full_collections += 1
+            if cfg.DEBUG_MODE: print(f"GC_POLICY: collection complète entre deux vagues "
+                                     f"({(time.perf_counter() - collect_start) * 1000:.1f} ms)")
+        self.was_wave_in_progress = is_wave_in_progress
+
+    def restore_defaults(self):
+        self.set_wave_thresholds(False)
+        self.was_wave_in_progress = False
+
+
+policy = GcPolicy()  # Instance unique: main.py l'installe au démarrage et la met à jour à chaque frame
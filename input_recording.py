@@ -0,0 +1,160 @@
+# input_recording.py
+import json
+import os
+import time
+import zlib
+import game_config as cfg
+import quality_governor
+
+FORMAT_VERSION = 1
+
+# Lignes du fichier: un en-tête JSON, puis [tick, action, arguments...], le tick étant l'indice du tick de
+# simulation (GameState.sim_tick_index) avant lequel l'action s'applique
+ACTION_SELECT = "select"  # [tick, "select", type | null]: objet choisi dans le menu de construction
+ACTION_PLACE = "place"  # [tick, "place", type, ligne, colonne]: clic sur une case
+ACTION_PLACE_RECT = "place_rect"  # [tick, "place_rect", type, l0, c0, l1, c1]: placement par glisser
+ACTION_EXPAND = "expand"  # [tick, "expand", "up" | "side"]
+ACTION_PAUSE = "pause"  # [tick, "pause"]: pause ou reprise
+ACTION_QUALITY = "quality"  # [tick, "quality", palier]: le palier du gouverneur change la densité des flammes
+ACTION_RESIZE = "resize"  # [tick, "resize", largeur, hauteur]: nouvelle surface de rendu
+RECORD_CHECKPOINT = "check"  # [tick, "check", {...}]: état de la partie, comparé au rejeu
+RECORD_END = "end"  # [tick, "end", raison, {...}]
+
+
+def build_checkpoint(game_state):
+    # Résumé de l'état simulé: égal au tick près entre l'enregistrement et le rejeu si tout est déterministe
+    enemy_state = [(enemy.rect.center, enemy.current_hp) for enemy in game_state.enemies]
+    return {
+        "wave": game_state.current_wave_number,
+        "money": game_state.money,
+        "iron": game_state.iron_stock,
+        "city_hp": game_state.city_hp,
+        "score": game_state.score,
+        "kills": game_state.kills,
+        "enemies": len(game_state.enemies),
+        "projectiles": len(game_state.projectiles),
+        "turrets": len(game_state.turrets),
+        "buildings": len(game_state.buildings),
+        "enemy_crc": zlib.crc32(repr(enemy_state).encode("utf-8")),
+    }
+
+
+def build_header(game_state):
+    # Tout ce qui, hors actions, influe sur la simulation: le rejeu l'applique avant de créer la partie
+    return {
+        "format": FORMAT_VERSION,
+        "seed": game_state.rng.seed,
+        "tick_rate": cfg.SIM_TICK_RATE,
+        "render_size": [game_state.scaler.actual_w, game_state.scaler.actual_h],
+        "render_scale": cfg.RENDER_SCALE,
+        "tutorial": game_state.is_tutorial,
+        "large_battlefield": cfg.LARGE_BATTLEFIELD_MODE,
+        "flame_density": cfg.FLAME_PARTICLE_DENSITY,
+        "quality_level": quality_governor.governor.level,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def apply_action(game_state, record):
+    # Rejoue une action enregistrée (hors ACTION_RESIZE, propre à l'affichage du lecteur); False si inconnue
+    action, args = record[1], record[2:]
+    if action == ACTION_SELECT:
+        game_state.select_item_to_place(args[0])
+    elif action == ACTION_PLACE:
+        game_state.place_item_at(args[0], (args[1], args[2]))
+    elif action == ACTION_PLACE_RECT:
+        game_state.place_items_in_rect(args[0], (args[1], args[2]), (args[3], args[4]))
+    elif action == ACTION_EXPAND:
+        game_state.try_expand_build_area(args[0])
+    elif action == ACTION_PAUSE:
+        game_state.toggle_pause()
+    elif action == ACTION_QUALITY:
+        quality_governor.governor.set_level(args[0])
+    else:
+        return False
+    return True
+
+
+def read_recording(path):
+    """Retourne (en-tête, enregistrements). Une dernière ligne tronquée (jeu interrompu) est ignorée."""
+    with open(path, "r", encoding="utf-8") as recording_file:
+        lines = recording_file.read().splitlines()
+    if not lines: raise ValueError(f"Enregistrement vide: {path}")
+    header = json.loads(lines[0])
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Format d'enregistrement non pris en charge: {header.get('format')}")
+    records = []
+    for line_number, line in enumerate(lines[1:], start=2):
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            if line_number != len(lines): raise
+            print(f"AVERTISSEMENT: Dernière ligne tronquée ignorée ({path}:{line_number})")
+    return header, records
+
+
+class InputRecorder:
+    """
+    Enregistre chaque partie pour la rejouer (replay_player.py): l'en-tête (graine, cadence de simulation,
+    taille de rendu...), puis les actions du joueur datées par le tick de simulation et un point de contrôle
+    toutes les cfg.REPLAY_CHECKPOINT_INTERVAL_TICKS. Fichier en ajout seul, vidé à chaque ligne: seules
+    quelques lignes par seconde, et un plantage ne perd rien de ce qui précède.
+    """
+
+    def __init__(self):
+        self.file = None
+        self.path = None
+
+    @property
+    def active(self):
+        return self.file is not None
+
+    def start(self, game_state):
+        # Appelé après GameState.init_new_game: la graine de la partie est connue
+        self.close()
+        if not cfg.REPLAY_RECORD_ENABLED: return
+        path = os.path.join(cfg.REPLAY_DIR, time.strftime("replay_%Y%m%d_%H%M%S") + f"_{game_state.rng.seed}.jsonl")
+        try:
+            os.makedirs(cfg.REPLAY_DIR, exist_ok=True)
+            self.file = open(path, "a", encoding="utf-8")
+        except OSError as e:
+            print(f"AVERTISSEMENT: Enregistrement de la partie désactivé ({path}): {e}")
+            return
+        self.path = path
+        self.write_line(build_header(game_state))
+        if cfg.DEBUG_MODE: print(f"INPUT_RECORDING: enregistrement dans {path}")
+
+    def write_line(self, record):
+        if self.file is None: return
+        try:
+            self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self.file.flush()
+        except OSError as e:
+            print(f"AVERTISSEMENT: Écriture de l'enregistrement échouée ({self.path}): {e}")
+            self.close()
+
+    def record(self, tick_index, action, *args):
+        if self.file is None: return
+        self.write_line([tick_index, action, *args])
+
+    def on_sim_tick(self, game_state):
+        # Appelé après chaque tick de simulation (gamemodes.step_game_mode)
+        if self.file is None or game_state.sim_tick_index % cfg.REPLAY_CHECKPOINT_INTERVAL_TICKS: return
+        self.write_line([game_state.sim_tick_index, RECORD_CHECKPOINT, build_checkpoint(game_state)])
+
+    def finish(self, game_state, end_reason):
+        if self.file is None: return
+        self.write_line([game_state.sim_tick_index, RECORD_END, end_reason, build_checkpoint(game_state)])
+        if cfg.DEBUG_MODE and self.path: print(f"INPUT_RECORDING: {self.path} ({end_reason})")
+        self.close()
+
+    def close(self):
+        if self.file is None: return
+        recording_file, self.file = self.file, None
+        try:
+            recording_file.close()
+        except OSError as e:
+            print(f"AVERTISSEMENT: Fermeture de l'enregistrement échouée ({self.path}): {e}")
+
+
+recorder = InputRecorder()  # Instance unique: main.py l'ouvre à chaque nouvelle partie, GameState y écrit ses actions
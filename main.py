@@ -2,123 +2,340 @@
 import pygame
 import sys
 import os
+import time
+import tracemalloc
 import game_config as cfg
 import utility_functions as util
 import ui_functions
 import gamemodes
 import game_functions
+import settings
+import quality_governor
+import frame_profiler
+import frame_stats
+import profile_capture
+import metrics_stream
+import metrics_server
+import memory_report
+import gc_policy
+import input_recording
+
+
+# Couleur de fond de chaque état: le seul screen.fill de la frame est fait ici
+STATE_FILL_COLORS = {
+    cfg.STATE_MENU: cfg.COLOR_MENU_BACKGROUND,
+    cfg.STATE_LORE: cfg.COLOR_MENU_BACKGROUND,
+    cfg.STATE_OPTIONS: cfg.COLOR_MENU_BACKGROUND,
+}
+
+
+def set_display_mode(size, fullscreen=False):
+    if fullscreen:
+        size, flags = (0, 0), pygame.FULLSCREEN  # Résolution du bureau
+    else:
+        flags = pygame.RESIZABLE if cfg.WINDOW_RESIZABLE else 0
+    if cfg.VSYNC:
+        try:
+            return pygame.display.set_mode(size, flags, vsync=1)
+        except pygame.error as e:
+            print(f"AVERTISSEMENT: VSync indisponible ({e}), affichage sans vsync.")
+    return pygame.display.set_mode(size, flags)
+
+
+def get_render_size(window_size):
+    return max(1, int(window_size[0] * cfg.RENDER_SCALE)), max(1, int(window_size[1] * cfg.RENDER_SCALE))
+
+
+def create_render_surface(display_surface):
+    # cfg.RENDER_SCALE < 1: le jeu est dessiné dans une surface réduite, agrandie une fois par frame (present_frame)
+    window_size = display_surface.get_size()
+    render_size = get_render_size(window_size)
+    util.set_render_surface_size(render_size, window_size)
+    if render_size == window_size: return display_surface
+    return pygame.Surface(render_size).convert()
+
+
+def present_frame(display_surface, render_surface):
+    if render_surface is not display_surface:
+        util.scale_surface(render_surface, display_surface.get_size(), display_surface)
+    pygame.display.flip()
+
+
+def get_state_fps_cap(application_state):
+    return cfg.STATE_FPS_CAPS.get(application_state, cfg.FPS)
+
+
+def handle_state_event(application_state, event, mouse_pos, game_state_instance, scaler):
+    if application_state == cfg.STATE_MENU:
+        return ui_functions.check_main_menu_click(event, mouse_pos, scaler)
+
+    elif application_state == cfg.STATE_LORE:
+        if event.type == pygame.MOUSEBUTTONDOWN or \
+           (event.type == pygame.KEYDOWN and (event.key == pygame.K_SPACE or event.key == pygame.K_ESCAPE)):
+            return cfg.STATE_MENU
+
+    elif application_state in (cfg.STATE_GAMEPLAY, cfg.STATE_TUTORIAL):
+        return gamemodes.handle_game_mode_event(event, mouse_pos, game_state_instance, scaler)
+
+    elif application_state == cfg.STATE_PAUSED:
+        return gamemodes.handle_paused_event(event, mouse_pos, game_state_instance, scaler)
+
+    elif application_state == cfg.STATE_GAME_OVER:
+        return gamemodes.handle_game_over_event(event, mouse_pos, game_state_instance, scaler)
+
+    elif application_state == cfg.STATE_OPTIONS:
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            return cfg.STATE_MENU
+        action = ui_functions.check_options_menu_click(event, mouse_pos, scaler)
+        if action == "back":
+            return cfg.STATE_MENU
+        if action:
+            # Appliqué tout de suite et enregistré; l'affichage est recréé par la boucle si besoin
+            settings.cycle_option(settings.current_settings, action)
+            settings.apply_settings(settings.current_settings)
+            settings.save_settings(settings.current_settings)
+    return None
+
+
+def update_state(application_state, delta_time, game_state_instance):
+    if application_state in (cfg.STATE_GAMEPLAY, cfg.STATE_TUTORIAL):
+        return gamemodes.update_game_mode(delta_time, game_state_instance)
+
+    elif application_state in (cfg.STATE_PAUSED, cfg.STATE_GAME_OVER):
+        return gamemodes.update_modal_screen(delta_time, game_state_instance)
+    return None
+
+
+def draw_state(application_state, screen, game_state_instance, scaler):
+    if application_state == cfg.STATE_MENU:
+        ui_functions.draw_main_menu(screen, scaler)
+
+    elif application_state == cfg.STATE_LORE:
+        ui_functions.draw_lore_screen(screen, scaler)
+
+    elif application_state == cfg.STATE_OPTIONS:
+        ui_functions.draw_options_screen(screen, settings.current_settings, scaler)
+
+    elif application_state in (cfg.STATE_GAMEPLAY, cfg.STATE_TUTORIAL):
+        gamemodes.draw_game_mode(game_state_instance)
+
+    elif application_state in (cfg.STATE_PAUSED, cfg.STATE_GAME_OVER):
+        gamemodes.draw_game_mode(game_state_instance, use_frozen_world=True)
+
+
+def get_state_hover_key(application_state, mouse_pos):
+    # Élément survolé dans un écran statique: un changement déclenche un nouveau rendu
+    if application_state == cfg.STATE_MENU:
+        return ui_functions.get_main_menu_hovered_action(mouse_pos)
+    elif application_state == cfg.STATE_PAUSED:
+        return ui_functions.get_hovered_button_action(ui_functions.pause_menu_buttons_layout, mouse_pos)
+    elif application_state == cfg.STATE_GAME_OVER:
+        return ui_functions.get_hovered_button_action(ui_functions.game_over_buttons_layout, mouse_pos)
+    elif application_state == cfg.STATE_OPTIONS:
+        return ui_functions.get_hovered_button_action(ui_functions.options_menu_layout, mouse_pos)
+    return None
 
 
 def main_application_loop(screen, clock, scaler):
+    display_surface = screen  # Fenêtre; screen est la surface de rendu (la même si cfg.RENDER_SCALE == 1)
+    screen = create_render_surface(display_surface)
     current_game_state_instance = game_functions.GameState(scaler)
     current_game_state_instance.screen = screen
     current_game_state_instance.clock = clock #initialisation of the clock
     current_game_state_instance.load_ui_icons() #chargement des icones
 
-
-    ui_functions.initialize_main_menu_layout(scaler)
-    ui_functions.initialize_build_menu_layout(current_game_state_instance, scaler) # Passe game_state pour les coûts
-    ui_functions.initialize_pause_menu_layout(scaler) # pause menu
-    ui_functions.initialize_game_over_layout(scaler)  # game over screen
+    ui_functions.ensure_layouts_current(current_game_state_instance, scaler) # menus, build menu, pause, game over
+    metrics_server.exporter.start()
+    gc_policy.policy.install()
+    gc_policy.policy.freeze_loaded_objects()  # Sprites, polices et layouts chargés
 
     application_running = True
     current_application_state = cfg.STATE_MENU # Commencer par le menu principal
 
-    while application_running:
-        mouse_pos = pygame.mouse.get_pos()
-        # next_state doit être réinitialisé à chaque tour de boucle
-        # pour ne pas rester bloqué sur un état retourné par un mode de jeu
-        next_state_from_event = None
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                application_running = False
-                # exit for the loop
-
-
-            if current_application_state == cfg.STATE_MENU:
-                action = ui_functions.check_main_menu_click(event, mouse_pos, scaler)
-                if action is not None:
-                    next_state_from_event = action
-
-            elif current_application_state == cfg.STATE_LORE:
-                if event.type == pygame.MOUSEBUTTONDOWN or \
-                   (event.type == pygame.KEYDOWN and (event.key == pygame.K_SPACE or event.key == pygame.K_ESCAPE)):
-                    next_state_from_event = cfg.STATE_MENU
-
-            # Les événements pour GAMEPLAY et TUTORIAL sont gérés DANS leurs boucles respectives
-            # gamemodes.py gère les inputs quand le jeu est actif, en pause, ou game over.
-
-        # Si un événement a déjà déterminé le prochain état (ex: clic sur menu)
-        if next_state_from_event is not None:
-            if next_state_from_event == cfg.STATE_QUIT:
-                application_running = False
-            else:
-                if cfg.DEBUG_MODE and current_application_state != next_state_from_event:
-                    print(f"MAIN_APP_LOOP: Event changed state from {current_application_state} to {next_state_from_event}")
-                current_application_state = next_state_from_event
-
-        # --- Exécution et Dessin de l'État Actuel ---
-        screen.fill(cfg.COLOR_BACKGROUND) # Remplir l'écran au début de chaque frame de la boucle principale
-
-        if current_application_state == cfg.STATE_MENU:
-            ui_functions.draw_main_menu(screen, scaler)
-
-        elif current_application_state == cfg.STATE_LORE:
-            ui_functions.draw_lore_screen(screen, scaler)
-
-        elif current_application_state == cfg.STATE_GAMEPLAY:
-            returned_state = gamemodes.run_main_game_mode(screen, clock, current_game_state_instance, scaler)
-            # Après la fin de run_main_game_mode, on met à jour l'état
-            if returned_state == "restart_game": # Logique pour redémarrer
-                 # Réinitialiser l'instance GameState pour un nouveau jeu
-                 current_game_state_instance = game_functions.GameState(scaler)
-                 current_game_state_instance.screen = screen
-                 current_game_state_instance.clock = clock
-                 current_game_state_instance.load_ui_icons()
-                 # Il faut aussi réinitialiser les layouts qui dépendent de game_state si nécessaire
-                 ui_functions.initialize_build_menu_layout(current_game_state_instance, scaler)
-                 current_application_state = cfg.STATE_GAMEPLAY # Reste dans le même état, init_new_game sera appelé
-            elif returned_state == cfg.STATE_QUIT:
-                 application_running = False
-            else: # Typiquement retour au menu ou autre état défini par returned_state
-                 current_application_state = returned_state if returned_state else cfg.STATE_MENU
-                 if current_application_state == cfg.STATE_MENU:
-                     ui_functions.initialize_main_menu_layout(scaler)
-
-
-        elif current_application_state == cfg.STATE_TUTORIAL:
-            returned_state = gamemodes.run_tutorial_mode(screen, clock, current_game_state_instance, scaler)
-            if returned_state == "restart_tutorial":
-                # Réinitialiser l'instance GameState pour un nouveau tutoriel
-                current_game_state_instance = game_functions.GameState(scaler)
-                current_game_state_instance.screen = screen
-                current_game_state_instance.clock = clock
-                current_game_state_instance.load_ui_icons()
-                current_game_state_instance.is_tutorial = True # S'assurer que le mode tutoriel est bien actif
-                ui_functions.initialize_build_menu_layout(current_game_state_instance, scaler)
-                current_application_state = cfg.STATE_TUTORIAL
-            elif returned_state == cfg.STATE_QUIT:
-                application_running = False
-            else: # Typiquement retour au menu ou autre état défini par returned_state
-                current_application_state = returned_state if returned_state else cfg.STATE_MENU
-                if current_application_state == cfg.STATE_MENU:
-                    ui_functions.initialize_main_menu_layout(scaler)
-
-
-        elif current_application_state == cfg.STATE_OPTIONS:
-            if cfg.DEBUG_MODE: print("État Options (non implémenté)")
-            # action = ui_functions.check_options_menu_click(event, mouse_pos, scaler) ...
-            current_application_state = cfg.STATE_MENU # Placeholder pour retourner au menu
-
-        pygame.display.flip()
-        clock.tick(cfg.FPS)
+    def change_state(next_state):
+        # Applique une transition et retourne l'état effectivement atteint
+        nonlocal application_running, delta_time
+        if next_state == cfg.STATE_QUIT:
+            application_running = False
+            return current_application_state
+        if current_application_state in cfg.IDLE_STATES and next_state in (
+                cfg.STATE_GAMEPLAY, cfg.STATE_TUTORIAL, gamemodes.ACTION_RESTART):
+            # Le tick de cette frame inclut l'attente d'un événement sur l'écran statique (jusqu'à
+            # cfg.IDLE_EVENT_WAIT_TIMEOUT_MS): ce n'est pas du temps de jeu à simuler
+            delta_time = 0.0
+        if next_state == gamemodes.ACTION_RESTART:
+            input_recording.recorder.finish(current_game_state_instance, frame_stats.END_RESTART)
+            frame_stats.session.finish(frame_stats.END_RESTART, current_game_state_instance)
+            frame_stats.session.start(current_game_state_instance.is_tutorial)
+            metrics_stream.stream.start()
+            mode_state = gamemodes.start_game_mode(screen, clock, current_game_state_instance,
+                                                   is_tutorial=current_game_state_instance.is_tutorial)
+            input_recording.recorder.start(current_game_state_instance)
+            return mode_state
+        if next_state in (cfg.STATE_GAMEPLAY, cfg.STATE_TUTORIAL) and current_application_state != cfg.STATE_PAUSED:
+            # Nouvelle partie (depuis le menu); depuis la pause c'est une simple reprise
+            frame_stats.session.start(next_state == cfg.STATE_TUTORIAL)
+            metrics_stream.stream.start()
+            mode_state = gamemodes.start_game_mode(screen, clock, current_game_state_instance,
+                                                   is_tutorial=(next_state == cfg.STATE_TUTORIAL))
+            input_recording.recorder.start(current_game_state_instance)
+            return mode_state
+        if next_state == cfg.STATE_GAME_OVER:
+            frame_stats.session.finish(frame_stats.END_GAME_OVER, current_game_state_instance)
+            metrics_stream.stream.stop()
+            input_recording.recorder.finish(current_game_state_instance, frame_stats.END_GAME_OVER)
+            if cfg.MEMORY_REPORT_ON_GAME_OVER:
+                memory_report.reporter.write_report(current_game_state_instance, "game_over")
+        if next_state == cfg.STATE_MENU:
+            frame_stats.session.finish(frame_stats.END_MENU, current_game_state_instance)
+            metrics_stream.stream.stop()
+            input_recording.recorder.finish(current_game_state_instance, frame_stats.END_MENU)
+            ui_functions.initialize_main_menu_layout(scaler)
+        if next_state not in (cfg.STATE_PAUSED, cfg.STATE_GAME_OVER):
+            current_game_state_instance.frozen_world_surface = None
+        return next_state
+
+    is_fullscreen = False
+    windowed_size = display_surface.get_size()
+    applied_display_options = settings.get_display_options(settings.current_settings)
+
+    def resize_display(fullscreen, size):
+        # Nouvelle surface d'affichage puis Scaler recalculé sur place: layouts et GameState se re-dérivent
+        # d'eux-mêmes à la génération suivante (ensure_layouts_current / GameState.ensure_scale_current)
+        nonlocal display_surface, screen
+        display_surface = set_display_mode(size, fullscreen)
+        screen = create_render_surface(display_surface)
+        current_game_state_instance.screen = screen
+        scaler.rebuild(*screen.get_size())
+        ui_functions.ensure_layouts_current(current_game_state_instance, scaler)
+        # La simulation est en pixels de rendu: le rejeu doit changer d'échelle au même tick
+        input_recording.recorder.record(current_game_state_instance.sim_tick_index, input_recording.ACTION_RESIZE,
+                                        *screen.get_size())
+
+    needs_redraw = True
+    last_hover_key = None
 
+    while application_running:
+        profile_capture.capture.suspend()  # L'attente des événements et du tick n'est pas profilée
+        if current_application_state in cfg.IDLE_STATES and not needs_redraw:
+            # Écran statique inchangé: on dort jusqu'au prochain événement au lieu de redessiner
+            first_event = pygame.event.wait(cfg.IDLE_EVENT_WAIT_TIMEOUT_MS)
+            events = pygame.event.get()
+            if first_event.type != pygame.NOEVENT: events.insert(0, first_event)
+        else:
+            events = pygame.event.get()
+
+        # Un seul tick par frame, plafonné selon l'état courant
+        delta_time = clock.tick(get_state_fps_cap(current_application_state)) / 1000.0
+        if current_application_state in (cfg.STATE_GAMEPLAY, cfg.STATE_TUTORIAL):
+            # Temps de travail de la frame précédente, sans l'attente du tick
+            quality_level = quality_governor.governor.level
+            quality_governor.governor.record_frame(clock.get_rawtime() / 1000.0, delta_time)
+            if quality_governor.governor.level != quality_level:  # La densité des flammes change la simulation
+                input_recording.recorder.record(current_game_state_instance.sim_tick_index,
+                                                input_recording.ACTION_QUALITY, quality_governor.governor.level)
+        frame_profiler.profiler.end_frame(clock.get_rawtime() / 1000.0)  # Clôt la frame précédente (overlay F3)
+        frame_work_start = time.perf_counter()  # Les frames sautées (écran statique) ne sont pas comptées
+        profile_capture.capture.begin_frame(
+            clock.get_rawtime() / 1000.0, current_game_state_instance,
+            current_application_state in (cfg.STATE_GAMEPLAY, cfg.STATE_TUTORIAL))
+        metrics_server.exporter.update(delta_time, current_game_state_instance)
+        gc_policy.policy.update(current_game_state_instance,
+                                current_application_state in (cfg.STATE_GAMEPLAY, cfg.STATE_TUTORIAL))
+        mouse_pos = util.get_mouse_pos()
+
+        window_resize_pending = False
+        with frame_profiler.profiler.zone(frame_profiler.ZONE_INPUT):
+            for event in events:
+                if event.type == pygame.QUIT:
+                    application_running = False
+                    break
+                if event.type != pygame.MOUSEMOTION: needs_redraw = True
+                if event.type == pygame.VIDEORESIZE and not is_fullscreen:
+                    # Un bord de fenêtre tiré envoie une rafale d'événements: seule la dernière taille est appliquée
+                    windowed_size = (max(cfg.MIN_WINDOW_WIDTH, event.w), max(cfg.MIN_WINDOW_HEIGHT, event.h))
+                    window_resize_pending = True
+                    continue
+                if event.type == pygame.KEYDOWN and event.key == cfg.FULLSCREEN_TOGGLE_KEY:
+                    is_fullscreen = not is_fullscreen
+                    resize_display(is_fullscreen, windowed_size)
+                    continue
+                if event.type == pygame.KEYDOWN and event.key == cfg.PROFILER_TOGGLE_KEY:
+                    frame_profiler.profiler.toggle()
+                    continue
+                if event.type == pygame.KEYDOWN and event.key == cfg.PROFILE_CAPTURE_KEY:
+                    profile_capture.capture.request("touche")
+                    continue
+                if event.type == pygame.KEYDOWN and event.key == cfg.MEMORY_REPORT_KEY:
+                    memory_report.reporter.write_report(current_game_state_instance, "touche", start_tracing=True)
+                    continue
+                next_state = handle_state_event(current_application_state, event, mouse_pos,
+                                                current_game_state_instance, scaler)
+                # Les événements suivants sont traités par le nouvel état
+                if next_state is not None and next_state != current_application_state:
+                    if cfg.DEBUG_MODE:
+                        print(f"MAIN_APP_LOOP: Event changed state from {current_application_state} to {next_state}")
+                    current_application_state = change_state(next_state)
+                    needs_redraw = True
+                if not application_running: break
+        if not application_running: break
+
+        if window_resize_pending and not is_fullscreen and windowed_size != display_surface.get_size():
+            resize_display(False, windowed_size)
+
+        # Échelle de rendu, vsync ou lissage modifiés dans les options
+        display_options = settings.get_display_options(settings.current_settings)
+        if display_options != applied_display_options:
+            applied_display_options = display_options
+            resize_display(is_fullscreen, windowed_size)
+
+        next_state = update_state(current_application_state, delta_time, current_game_state_instance)
+        if next_state is not None and next_state != current_application_state:
+            current_application_state = change_state(next_state)
+            needs_redraw = True
+            if not application_running: break
+
+        if current_application_state in cfg.IDLE_STATES:
+            hover_key = get_state_hover_key(current_application_state, mouse_pos)
+            if hover_key != last_hover_key:
+                last_hover_key = hover_key
+                needs_redraw = True
+            if not needs_redraw: continue
+
+        # --- Dessin de l'état actuel: un seul fill et un seul flip par frame ---
+        screen.fill(STATE_FILL_COLORS.get(current_application_state, cfg.COLOR_BACKGROUND))
+        draw_state(current_application_state, screen, current_game_state_instance, scaler)
+        if frame_profiler.profiler.enabled:
+            ui_functions.draw_profiler_overlay(screen, frame_profiler.profiler, scaler)
+        present_frame(display_surface, screen)
+        needs_redraw = False
+        if current_application_state in (cfg.STATE_GAMEPLAY, cfg.STATE_TUTORIAL, cfg.STATE_PAUSED):
+            frame_work_ms = (time.perf_counter() - frame_work_start) * 1000.0
+            gc_pause_ms = gc_policy.policy.pop_frame_pause_ms()
+            frame_stats.session.record_frame(
+                frame_work_ms, current_game_state_instance.current_wave_number,
+                frame_stats.get_sub_state(current_game_state_instance, current_application_state == cfg.STATE_PAUSED),
+                gc_pause_ms)
+            metrics_stream.stream.record_frame(current_game_state_instance, frame_work_ms, delta_time, gc_pause_ms)
+            metrics_server.exporter.record_frame(frame_work_ms)
+
+    profile_capture.capture.finish()
+    frame_stats.session.finish(frame_stats.END_QUIT, current_game_state_instance)
+    input_recording.recorder.finish(current_game_state_instance, frame_stats.END_QUIT)
+    metrics_stream.stream.stop()
+    metrics_server.exporter.stop()
+    gc_policy.policy.restore_defaults()
     print("Fin de main_application_loop.")
 
 
 #main game running loop
 def run_game():
+    # Réglages lus avant toute mise à l'échelle (affichage, Scaler, sprites)
+    settings.current_settings = settings.load_settings()
+    settings.apply_settings(settings.current_settings)
+    if cfg.MEMORY_REPORT_TRACEMALLOC_AT_STARTUP:
+        tracemalloc.start()  # Sites d'allocation du rapport mémoire depuis le lancement (ralentit les allocations)
+
     print("Initialisation de Pygame...")
     pygame.init()
     try:
@@ -132,10 +349,10 @@ def run_game():
     screen_height_request = cfg.REF_HEIGHT
     if cfg.DEBUG_MODE: print(f"Configuration de l'affichage (demandé): {screen_width_request}x{screen_height_request}")
 
-    screen = pygame.display.set_mode((screen_width_request, screen_height_request))
+    screen = set_display_mode((screen_width_request, screen_height_request))
     pygame.display.set_caption(cfg.GAME_TITLE)
 
-    actual_screen_width, actual_screen_height = screen.get_size()
+    actual_screen_width, actual_screen_height = get_render_size(screen.get_size())
     scaler = util.Scaler(actual_screen_width, actual_screen_height, cfg.REF_WIDTH, cfg.REF_HEIGHT)
 
     try:
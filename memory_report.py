@@ -0,0 +1,144 @@
+# memory_report.py
+import collections
+import gc
+import json
+import os
+import time
+import tracemalloc
+import pygame
+import game_config as cfg
+import utility_functions as util
+import ui_functions
+
+
+def get_surface_bytes(surface):
+    # Une sous-surface partage les pixels de sa surface parente: elle ne coûte rien de plus
+    if surface.get_parent() is not None: return 0
+    return surface.get_pitch() * surface.get_height()
+
+
+def iter_surfaces(value):
+    # Surfaces d'un attribut: directement, ou un niveau dans une liste / un tuple / un dict (animations, layouts)
+    if isinstance(value, pygame.Surface):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            if isinstance(item, pygame.Surface): yield item
+            elif isinstance(item, dict): yield from (v for v in item.values() if isinstance(v, pygame.Surface))
+    elif isinstance(value, dict):
+        yield from (v for v in value.values() if isinstance(v, pygame.Surface))
+
+
+class SurfaceAccounting:
+    """Octets de Surface par catégorie; une surface partagée n'est comptée qu'une fois, pour son premier propriétaire."""
+
+    def __init__(self):
+        self.seen_surface_ids = set()
+        self.category_bytes = collections.Counter()
+        self.category_counts = collections.Counter()
+
+    def add(self, category, value):
+        for surface in iter_surfaces(value):
+            if id(surface) in self.seen_surface_ids: continue
+            self.seen_surface_ids.add(id(surface))
+            self.category_bytes[category] += get_surface_bytes(surface)
+            self.category_counts[category] += 1
+
+    def get_summary(self):
+        return {category: {"surfaces": self.category_counts[category], "bytes": self.category_bytes[category]}
+                for category, _ in self.category_bytes.most_common()}
+
+
+def account_surfaces(game_state):
+    # Les caches d'abord: un sprite partagé par plusieurs entités est attribué au cache qui le possède
+    accounting = SurfaceAccounting()
+    accounting.add("cache:sprite", list(util.sprite_cache.values()))
+    accounting.add("cache:scaled_tile_sprite", list(util.scaled_tile_sprite_cache.values()))
+    accounting.add("cache:hp_bar", list(util.hp_bar_cache.values()))
+    accounting.add("cache:ui_overlay", list(ui_functions.overlay_surface_cache.values()))
+    accounting.add("cache:static_layer", list(game_state.static_layer.chunks.values()))
+    accounting.add("cache:placement_overlay", getattr(game_state.placement_overlay, "surface", None))
+    accounting.add("cache:frozen_world", game_state.frozen_world_surface)
+    accounting.add("ui:icons", game_state.ui_icons)
+    accounting.add("ui:build_menu_layout", ui_functions.build_menu_layout)
+    for entity_list in (game_state.buildings, game_state.turrets, game_state.enemies, game_state.projectiles,
+                        game_state.particle_effects):
+        for entity in entity_list:
+            category = f"entity:{type(entity).__name__}"
+            for value in vars(entity).values():
+                accounting.add(category, value)
+    accounting.add("screen", game_state.screen)
+    return accounting
+
+
+def get_live_object_counts(top_n):
+    class_counts = collections.Counter(type(obj).__name__ for obj in gc.get_objects())
+    return dict(class_counts.most_common(top_n))
+
+
+def get_tracemalloc_top_sites(top_n):
+    if not tracemalloc.is_tracing(): return None
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)))
+    return [{"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "bytes": stat.size,
+             "blocks": stat.count} for stat in snapshot.statistics("lineno")[:top_n]]
+
+
+class MemoryReporter:
+    """
+    Rapport mémoire (touche cfg.MEMORY_REPORT_KEY et, si cfg.MEMORY_REPORT_ON_GAME_OVER, game over): octets
+    de Surface par propriétaire, principaux sites d'allocation tracemalloc et nombre d'objets vivants par
+    classe. L'écart avec le rapport précédent de la session montre la croissance d'une vague à l'autre.
+    Sans tracemalloc au lancement, la touche le démarre et le rapport suivant, qui en montre les sites,
+    l'arrête: le ralentissement des allocations ne dure pas le reste de la session.
+    """
+
+    def __init__(self):
+        self.previous_category_bytes = {}
+        self.is_tracing_until_next_report = False  # tracemalloc démarré ici (pas au lancement): arrêté au rapport suivant
+        self.report_count = 0  # Numéro du rapport dans la session (plusieurs rapports peuvent tomber dans la même seconde)
+
+    def write_report(self, game_state, trigger, start_tracing=False):
+        stop_tracing = self.is_tracing_until_next_report
+        if start_tracing and not tracemalloc.is_tracing():
+            # Rapport demandé à la touche sans tracemalloc au lancement: les sites apparaîtront au suivant
+            tracemalloc.start()
+            self.is_tracing_until_next_report = True
+        accounting = account_surfaces(game_state)
+        surface_summary = accounting.get_summary()
+        for category, entry in surface_summary.items():
+            entry["delta_bytes"] = entry["bytes"] - self.previous_category_bytes.get(category, 0)
+        self.previous_category_bytes = {category: entry["bytes"] for category, entry in surface_summary.items()}
+        traced_current, traced_peak = tracemalloc.get_traced_memory()
+        report = {
+            "trigger": trigger,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "game_time_sec": round(game_state.total_time_elapsed_seconds, 1),
+            "wave": game_state.current_wave_number,
+            "surface_bytes_total": sum(accounting.category_bytes.values()),
+            "surfaces": surface_summary,
+            "tracemalloc": {"current_bytes": traced_current, "peak_bytes": traced_peak,
+                            "top_sites": get_tracemalloc_top_sites(cfg.MEMORY_REPORT_TOP_N)},
+            "live_objects": get_live_object_counts(cfg.MEMORY_REPORT_TOP_N),
+        }
+        if stop_tracing:
+            tracemalloc.stop()
+            self.is_tracing_until_next_report = False
+        self.report_count += 1
+        report_path = os.path.join(cfg.FRAME_STATS_REPORT_DIR, time.strftime("memory_%Y%m%d_%H%M%S") +
+                                   f"_w{game_state.current_wave_number}_{self.report_count}.json")
+        try:
+            os.makedirs(cfg.FRAME_STATS_REPORT_DIR, exist_ok=True)
+            with open(report_path, "w", encoding="utf-8") as report_file:
+                json.dump(report, report_file, indent=2)
+        except OSError as e:
+            print(f"AVERTISSEMENT: Écriture du rapport mémoire échouée ({report_path}): {e}")
+            return None
+        print(f"MEMORY_REPORT: {report['surface_bytes_total'] / 1048576:.1f} Mo de Surfaces "
+              f"({len(accounting.seen_surface_ids)} surfaces), vague {report['wave']} -> {report_path}")
+        if self.is_tracing_until_next_report:
+            print("MEMORY_REPORT: tracemalloc actif jusqu'au prochain rapport (sites d'allocation depuis celui-ci)")
+        return report_path
+
+
+reporter = MemoryReporter()  # Instance unique: main.py l'appelle sur la touche et au game over
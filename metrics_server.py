@@ -0,0 +1,130 @@
+# metrics_server.py
+import collections
+import gc
+import http.server
+import threading
+import time
+import game_config as cfg
+import utility_functions as util
+import gc_policy
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+FRAME_TIME_QUANTILES = (0.5, 0.9, 0.99)
+SNAPSHOT_GAUGES = ("enemies", "projectiles", "turrets", "buildings", "spawn_queue", "wave", "money", "iron",
+                   "power_balance", "city_hp")
+
+
+class _MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = format_metrics(self.server.exporter.snapshot).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Un scrape par seconde pendant toute une nuit: pas de log par requête
+
+
+def format_metrics(snapshot):
+    # Format texte Prometheus, construit dans le thread serveur à partir du dict publié (aucun objet pygame)
+    if snapshot is None: return "# Aucune donnée publiée pour l'instant\n"
+    lines = [
+        "# TYPE game_uptime_seconds gauge", f"game_uptime_seconds {snapshot['uptime']:.1f}",
+        "# TYPE game_frames_total counter", f"game_frames_total {snapshot['frames']}",
+        "# TYPE game_frame_time_ms summary",
+    ]
+    lines += [f'game_frame_time_ms{{quantile="{quantile}"}} {value:.3f}'
+              for quantile, value in snapshot["frame_time_quantiles"]]
+    for key, value in snapshot["game"].items():
+        lines += [f"# TYPE game_{key} gauge", f"game_{key} {value}"]
+    lines.append("# TYPE game_kills_total counter")
+    lines.append(f"game_kills_total {snapshot['kills']}")
+    lines.append("# TYPE game_cache_hits_total counter")
+    lines += [f'game_cache_hits_total{{cache="{name}"}} {hits}' for name, (hits, _) in snapshot["caches"]]
+    lines.append("# TYPE game_cache_misses_total counter")
+    lines += [f'game_cache_misses_total{{cache="{name}"}} {misses}' for name, (_, misses) in snapshot["caches"]]
+    lines.append("# TYPE game_cache_entries gauge")
+    lines += [f'game_cache_entries{{cache="{name}"}} {size}' for name, size in snapshot["cache_sizes"]]
+    lines.append("# TYPE game_gc_collections_total counter")
+    lines += [f'game_gc_collections_total{{generation="{generation}"}} {count}'
+              for generation, count in enumerate(snapshot["gc_collections"])]
+    lines += ["# TYPE game_gc_pause_seconds_total counter", f"game_gc_pause_seconds_total {snapshot['gc_pause']:.6f}",
+              "# TYPE game_gc_pause_max_seconds gauge", f"game_gc_pause_max_seconds {snapshot['gc_pause_max']:.6f}"]
+    return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """
+    Compteurs et jauges pour les tests d'endurance, servis en HTTP sur localhost (cfg.METRICS_SERVER_PORT).
+    La boucle de jeu publie une fois par seconde un dict de valeurs simples; le thread serveur ne lit
+    que ce dict (remplacé d'un bloc, jamais modifié), jamais GameState ni une Surface.
+    """
+
+    def __init__(self):
+        self.server = None
+        self.snapshot = None
+        self.started_at = time.perf_counter()
+        self.time_since_publish = 0.0
+        self.frame_count = 0
+        self.recent_frame_times = collections.deque(maxlen=max(1, cfg.METRICS_SERVER_WINDOW_FRAMES))
+
+    def start(self):
+        if self.server is not None or not cfg.METRICS_SERVER_ENABLED: return
+        try:
+            self.server = http.server.HTTPServer((cfg.METRICS_SERVER_HOST, cfg.METRICS_SERVER_PORT),
+                                                 _MetricsRequestHandler)
+        except OSError as e:
+            print(f"AVERTISSEMENT: Serveur de métriques indisponible "
+                  f"({cfg.METRICS_SERVER_HOST}:{cfg.METRICS_SERVER_PORT}): {e}")
+            return
+        self.server.exporter = self
+        util.cache_stats_enabled = True
+        threading.Thread(target=self.server.serve_forever, name="metrics_server", daemon=True).start()
+        print(f"METRICS_SERVER: http://{cfg.METRICS_SERVER_HOST}:{self.server.server_address[1]}/metrics")
+
+    def stop(self):
+        if self.server is None: return
+        server, self.server = self.server, None
+        util.cache_stats_enabled = False
+        server.shutdown()
+        server.server_close()
+
+    def record_frame(self, frame_ms):
+        if self.server is None: return
+        self.frame_count += 1
+        self.recent_frame_times.append(frame_ms)
+
+    def update(self, delta_time, game_state):
+        # Appelé à chaque frame par main.py; ne construit l'instantané qu'une fois par intervalle
+        if self.server is None: return
+        self.time_since_publish += delta_time
+        if self.time_since_publish < cfg.METRICS_SERVER_PUBLISH_INTERVAL_SEC: return
+        self.time_since_publish = 0.0
+        sorted_frame_times = sorted(self.recent_frame_times)
+        frame_time_quantiles = [
+            (quantile, sorted_frame_times[min(len(sorted_frame_times) - 1, int(quantile * len(sorted_frame_times)))]
+             if sorted_frame_times else 0.0)
+            for quantile in FRAME_TIME_QUANTILES]
+        metrics_record = game_state.get_metrics_record()
+        self.snapshot = {
+            "uptime": time.perf_counter() - self.started_at,
+            "frames": self.frame_count,
+            "frame_time_quantiles": frame_time_quantiles,
+            "game": {key: metrics_record[key] for key in SNAPSHOT_GAUGES},
+            "kills": metrics_record["kills"],
+            "caches": [(name, tuple(counters)) for name, counters in sorted(util.cache_stats.items())],
+            "cache_sizes": [("sprite", len(util.sprite_cache)), ("font", len(util.font_cache)),
+                            ("hp_bar", len(util.hp_bar_cache)),
+                            ("scaled_tile_sprite", len(util.scaled_tile_sprite_cache))],
+            "gc_collections": [generation_stats["collections"] for generation_stats in gc.get_stats()],
+            "gc_pause": gc_policy.policy.pause_total_seconds,
+            "gc_pause_max": gc_policy.policy.pause_max_seconds,
+        }
+
+
+exporter = MetricsExporter()  # Instance unique: main.py la démarre (si activée) et la met à jour
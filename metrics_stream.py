@@ -0,0 +1,130 @@
+# metrics_stream.py
+import json
+import os
+import queue
+import threading
+import time
+import game_config as cfg
+
+_STOP = object()  # Sentinelle: le thread d'écriture vide la file puis s'arrête
+
+
+class JsonlFileSink:
+    """Destination par défaut: un enregistrement JSON par ligne. Toute destination expose write(record) et close()."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class MetricsStream:
+    """
+    Métriques d'une partie (GameState.get_metrics_record + temps de frame), une fois par
+    cfg.METRICS_STREAM_INTERVAL_SEC. L'écriture se fait dans un thread: la boucle de jeu ne fait que
+    déposer un dict dans une file bornée, sans jamais attendre (file pleine: enregistrement abandonné).
+    """
+
+    def __init__(self):
+        self.sink = None
+        self.record_queue = None
+        self.writer_thread = None
+        self.started_at = 0.0
+        self.time_since_last_record = 0.0
+        self.interval_frame_count = 0
+        self.interval_frame_ms_total = 0.0
+        self.interval_frame_ms_max = 0.0
+        self.interval_gc_pause_ms = 0.0
+        self.dropped_records = 0
+
+    @property
+    def active(self):
+        return self.writer_thread is not None
+
+    def start(self, sink=None):
+        self.stop()
+        if sink is None:
+            if not cfg.METRICS_STREAM_ENABLED: return
+            path = os.path.join(cfg.METRICS_STREAM_DIR, time.strftime("metrics_%Y%m%d_%H%M%S.jsonl"))
+            try:
+                sink = JsonlFileSink(path)
+            except OSError as e:
+                print(f"AVERTISSEMENT: Flux de métriques désactivé ({path}): {e}")
+                return
+            if cfg.DEBUG_MODE: print(f"METRICS_STREAM: écriture dans {path}")
+        self.sink = sink
+        self.record_queue = queue.Queue(maxsize=max(1, cfg.METRICS_STREAM_QUEUE_SIZE))
+        self.started_at = time.perf_counter()
+        self.time_since_last_record = 0.0
+        self.reset_interval()
+        self.dropped_records = 0
+        self.writer_thread = threading.Thread(target=self.run_writer, name="metrics_stream", daemon=True)
+        self.writer_thread.start()
+
+    def reset_interval(self):
+        self.interval_frame_count = 0
+        self.interval_frame_ms_total = 0.0
+        self.interval_frame_ms_max = 0.0
+        self.interval_gc_pause_ms = 0.0
+
+    def record_frame(self, game_state, frame_ms, delta_time, gc_pause_ms=0.0):
+        if self.writer_thread is None: return
+        self.interval_frame_count += 1
+        self.interval_frame_ms_total += frame_ms
+        self.interval_frame_ms_max = max(self.interval_frame_ms_max, frame_ms)
+        self.interval_gc_pause_ms += gc_pause_ms
+        self.time_since_last_record += delta_time
+        if self.time_since_last_record < cfg.METRICS_STREAM_INTERVAL_SEC: return
+        self.time_since_last_record = 0.0
+        record = {"t": round(time.perf_counter() - self.started_at, 3)}
+        record.update(game_state.get_metrics_record())
+        record["frames"] = self.interval_frame_count
+        record["frame_ms"] = round(self.interval_frame_ms_total / self.interval_frame_count, 3)
+        record["frame_ms_max"] = round(self.interval_frame_ms_max, 3)
+        record["gc_ms"] = round(self.interval_gc_pause_ms, 3)
+        record["dropped"] = self.dropped_records
+        self.reset_interval()
+        try:
+            self.record_queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_records += 1
+
+    def run_writer(self):
+        # Thread d'écriture: seul à toucher la destination
+        record_queue, sink = self.record_queue, self.sink
+        while True:
+            record = record_queue.get()
+            if record is _STOP: break
+            try:
+                sink.write(record)
+            except Exception as e:  # Destination quelconque: le thread ne doit pas mourir en laissant la file se remplir
+                print(f"AVERTISSEMENT: Écriture de métriques échouée: {e!r}")
+        try:
+            sink.close()
+        except Exception as e:
+            print(f"AVERTISSEMENT: Fermeture du flux de métriques échouée: {e!r}")
+
+    def stop(self):
+        if self.writer_thread is None: return
+        writer_thread, self.writer_thread = self.writer_thread, None
+        # Fin de partie: attente bornée, la boucle de jeu ne reste jamais bloquée sur un thread d'écriture arrêté
+        deadline = time.perf_counter() + cfg.METRICS_STREAM_STOP_TIMEOUT_SEC
+        try:
+            self.record_queue.put(_STOP, timeout=cfg.METRICS_STREAM_STOP_TIMEOUT_SEC)
+        except queue.Full:
+            print("AVERTISSEMENT: Flux de métriques abandonné: file pleine, thread d'écriture bloqué ou arrêté")
+            return
+        writer_thread.join(timeout=max(0.0, deadline - time.perf_counter()))
+        if writer_thread.is_alive():
+            print(f"AVERTISSEMENT: Flux de métriques non terminé après {cfg.METRICS_STREAM_STOP_TIMEOUT_SEC} s")
+        if cfg.DEBUG_MODE and self.dropped_records:
+            print(f"METRICS_STREAM: {self.dropped_records} enregistrements abandonnés (file pleine)")
+
+
+stream = MetricsStream()  # Instance unique: main.py l'ouvre à chaque nouvelle partie et la ferme à sa fin
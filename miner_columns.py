@@ -0,0 +1,78 @@
+# miner_columns.py
+import bisect
+
+# Clés de sprites des mines empilées (cf. BUILDING_STATS["miner"][STAT_SPRITE_VARIANTS_DICT])
+SPRITE_SINGLE = "single"
+SPRITE_STACKED_TOP = "stacked_top"  # Mine en dessous
+SPRITE_STACKED_MIDDLE = "stacked_middle"
+SPRITE_STACKED_BOTTOM = "stacked_bottom"  # Mine au-dessus
+
+
+class MinerColumnIndex:
+    """
+    Index des piles verticales de mines, colonne par colonne, sous forme de plages continues
+    (ligne du haut, ligne du bas). Le sprite d'une mine ne dépend que de sa position dans sa pile:
+    à l'ajout ou au retrait, add()/remove() renvoient seulement les cases dont le sprite change.
+    """
+
+    def __init__(self):
+        self.run_tops = {}  # {colonne: [ligne du haut de chaque pile, triée]}
+        self.run_bottoms = {}  # {(colonne, ligne du haut): ligne du bas}
+
+    def _find_run(self, grid_r, grid_c):
+        tops = self.run_tops.get(grid_c)
+        if not tops: return None
+        idx = bisect.bisect_right(tops, grid_r) - 1
+        if idx < 0: return None
+        top = tops[idx]
+        bottom = self.run_bottoms[(grid_c, top)]
+        return (top, bottom) if grid_r <= bottom else None
+
+    def get_sprite_key(self, grid_r, grid_c):
+        run = self._find_run(grid_r, grid_c)
+        if run is None: return None
+        top, bottom = run
+        if top == bottom: return SPRITE_SINGLE
+        if grid_r == top: return SPRITE_STACKED_TOP
+        if grid_r == bottom: return SPRITE_STACKED_BOTTOM
+        return SPRITE_STACKED_MIDDLE
+
+    def _add_run(self, grid_c, top, bottom):
+        bisect.insort(self.run_tops.setdefault(grid_c, []), top)
+        self.run_bottoms[(grid_c, top)] = bottom
+
+    def _remove_run(self, grid_c, top):
+        tops = self.run_tops[grid_c]
+        del tops[bisect.bisect_left(tops, top)]
+        del self.run_bottoms[(grid_c, top)]
+
+    def _get_changed_cells(self, grid_c, candidate_rows, old_keys):
+        return [(r, grid_c) for r, old_key in zip(candidate_rows, old_keys)
+                if self.get_sprite_key(r, grid_c) not in (None, old_key)]
+
+    def add(self, grid_r, grid_c):
+        if self._find_run(grid_r, grid_c) is not None: return []
+        candidate_rows = (grid_r - 1, grid_r, grid_r + 1)  # Seules les extrémités voisines peuvent changer
+        old_keys = [self.get_sprite_key(r, grid_c) for r in candidate_rows]
+        run_above = self._find_run(grid_r - 1, grid_c)
+        run_below = self._find_run(grid_r + 1, grid_c)
+        top, bottom = grid_r, grid_r
+        if run_above:
+            top = run_above[0]
+            self._remove_run(grid_c, run_above[0])
+        if run_below:
+            bottom = run_below[1]
+            self._remove_run(grid_c, run_below[0])
+        self._add_run(grid_c, top, bottom)
+        return self._get_changed_cells(grid_c, candidate_rows, old_keys)
+
+    def remove(self, grid_r, grid_c):
+        run = self._find_run(grid_r, grid_c)
+        if run is None: return []
+        candidate_rows = (grid_r - 1, grid_r + 1)
+        old_keys = [self.get_sprite_key(r, grid_c) for r in candidate_rows]
+        top, bottom = run
+        self._remove_run(grid_c, top)
+        if top < grid_r: self._add_run(grid_c, top, grid_r - 1)
+        if grid_r < bottom: self._add_run(grid_c, grid_r + 1, bottom)
+        return self._get_changed_cells(grid_c, candidate_rows, old_keys)
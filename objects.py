@@ -1,12 +1,11 @@
 # objects.py
-from random import randint
-
 import pygame
 import random
 import math
 import os
 import game_config as cfg
 import utility_functions as util
+import quality_governor
 
 # --- Global Scaled Gravity ---
 G_PHYSICS_SCALED = 0  # Will be initialized by the scaler once
@@ -450,11 +449,53 @@ class GameObject(pygame.sprite.Sprite):
         if self.active and self.sprite:
             surface.blit(self.sprite, self.rect.topleft)
 
+    def submit_draw(self, render_queue, layer):
+        if self.active and self.sprite:
+            render_queue.submit(self.sprite, self.rect.topleft, layer, self.rect.bottom)
+
     def update(self, delta_time, game_state_ref, scaler: util.Scaler):
         if self.scaler is None and scaler is not None:
             self.scaler = scaler
 
 
+class MovingObject(GameObject):
+    """
+    Objet déplacé à chaque tick de simulation. La position exacte (centre) est gardée en flottants dans
+    pos_x/pos_y et rect n'en est que l'arrondi: à pas fixe, un déplacement de moins d'un pixel par tick
+    s'accumule au lieu d'être perdu. prev_pos_x/prev_pos_y (position au tick précédent) servent à interpoler
+    le dessin entre deux ticks quand l'affichage est plus rapide que la simulation (120/144 FPS).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.pos_x, self.pos_y = 0.0, 0.0
+        self.prev_pos_x, self.prev_pos_y = 0.0, 0.0
+
+    def set_position(self, center_xy):
+        # Apparition ou transposition (changement d'échelle): pas d'interpolation depuis l'ancienne position
+        self.pos_x, self.pos_y = float(center_xy[0]), float(center_xy[1])
+        self.prev_pos_x, self.prev_pos_y = self.pos_x, self.pos_y
+        self.sync_rect()
+
+    def begin_tick(self):
+        self.prev_pos_x, self.prev_pos_y = self.pos_x, self.pos_y
+
+    def sync_rect(self):
+        self.rect.center = (round(self.pos_x), round(self.pos_y))
+
+    def get_draw_rect(self, alpha=1.0):
+        # alpha: fraction du tick suivant déjà écoulée (GameState.sim_interpolation_alpha)
+        if alpha >= 1.0: return self.rect
+        draw_x = self.prev_pos_x + (self.pos_x - self.prev_pos_x) * alpha
+        draw_y = self.prev_pos_y + (self.pos_y - self.prev_pos_y) * alpha
+        return self.rect.move(round(draw_x) - self.rect.centerx, round(draw_y) - self.rect.centery)
+
+    def submit_draw(self, render_queue, layer, alpha=1.0):
+        if self.active and self.sprite:
+            draw_rect = self.get_draw_rect(alpha)
+            render_queue.submit(self.sprite, draw_rect.topleft, layer, draw_rect.bottom)
+
+
 # --- Bâtiments ---
 class Building(GameObject):
     _id_counter = 0
@@ -525,25 +566,22 @@ class Building(GameObject):
         elif cfg.DEBUG_MODE:
             print(f"AVERTISSEMENT: Sprite pour frame state '{new_sprite_key}' non trouvé.")
 
-    def update_sprite_based_on_context(self, game_grid_ref, grid_r, grid_c, scaler: util.Scaler):
-        if self.type == "miner":
-            above_is_miner, below_is_miner = False, False;
-            row, col = grid_r, grid_c
-            if row > 0 and game_grid_ref[row - 1][col] and game_grid_ref[row - 1][
-                col].type == "miner": above_is_miner = True
-            if row < len(game_grid_ref) - 1 and game_grid_ref[row + 1][col] and game_grid_ref[row + 1][
-                col].type == "miner": below_is_miner = True
-            chosen_sprite_key = "single"
-            if above_is_miner and below_is_miner:
-                chosen_sprite_key = "stacked_middle"
-            elif below_is_miner:
-                chosen_sprite_key = "stacked_top"
-            elif above_is_miner:
-                chosen_sprite_key = "stacked_bottom"
-            if chosen_sprite_key in self.sprites_dict and self.original_sprite is not self.sprites_dict[
-                chosen_sprite_key]:
-                self.original_sprite = self.sprites_dict[chosen_sprite_key];
-                self.sprite = util.scale_sprite_to_tile(self.original_sprite, scaler)
+    def set_stack_sprite_key(self, sprite_key, scaler: util.Scaler):
+        # Sprite de mine empilée, choisi par game_functions via miner_columns.MinerColumnIndex
+        sprite_to_use = self.sprites_dict.get(sprite_key)
+        if sprite_to_use and self.original_sprite is not sprite_to_use:
+            self.original_sprite = sprite_to_use
+            self.sprite = util.get_scaled_tile_sprite(self.original_sprite, scaler)
+
+    def rescale_to_tile(self, pixel_pos_topleft, scaler: util.Scaler):
+        # Nouvelle taille de case: sprite re-dérivé de l'original (déjà en mémoire), position depuis grid_pos
+        if self.original_sprite:
+            self.sprite = util.get_scaled_tile_sprite(self.original_sprite, scaler)
+        else:
+            tile_size = scaler.get_tile_size()
+            self.sprite = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA);
+            self.sprite.fill(cfg.COLOR_MAGENTA + (180,))
+        self.rect = self.sprite.get_rect(topleft=pixel_pos_topleft)
 
     def apply_adjacency_bonus_effect(self, adj_count):
         if self.type == "storage" and self.adjacency_bonus_per_unit > 0: self.current_adjacency_bonus_value = adj_count * self.adjacency_bonus_per_unit
@@ -709,6 +747,22 @@ class Turret(GameObject):
         self.is_functional = True
         self._update_gun_sprite_visuals()
 
+    def rescale_to_tile(self, pixel_pos_center, scaler: util.Scaler):
+        # Mêmes calculs que __init__ pour tout ce qui dépend de l'échelle; l'état (visée, recharge) est conservé
+        self.range = scaler.scale_value(self.stats.get(cfg.STAT_RANGE_PIXELS, 0))
+        self.min_range = scaler.scale_value(self.stats.get(cfg.STAT_MIN_RANGE_PIXELS, 0))
+        self.max_range = scaler.scale_value(self.stats.get(cfg.STAT_MAX_RANGE_PIXELS, 0))
+        self.projectile_initial_speed = scaler.scale_value(self.stats.get(cfg.STAT_PROJECTILE_LAUNCH_SPEED_PIXELS, 0))
+        s = int(scaler.tile_size * 0.8)
+        if self.original_turret_base_sprite:
+            self.turret_base_sprite_scaled = util.scale_sprite_to_size(self.original_turret_base_sprite, s, s)
+        else:
+            self.turret_base_sprite_scaled = pygame.Surface((s, s), pygame.SRCALPHA);
+            self.turret_base_sprite_scaled.fill(cfg.COLOR_CYAN + (180,))
+        self.gun_sprite_scaled_original = None  # Force la remise à l'échelle du canon
+        self._update_gun_sprite_visuals()
+        self.rect = self.turret_base_sprite_scaled.get_rect(center=pixel_pos_center)
+
     def find_target(self, enemies_list):
         self.target_enemy = None
         closest_dist_sq = float('inf')
@@ -855,7 +909,7 @@ class Turret(GameObject):
                     if angles_rad and angles_rad[0] is not None:
                         self.can_hit_current_target = True
                         self.current_gun_elevation_deg = math.degrees(angles_rad[0])
-                        self.current_gun_elevation_deg = self.current_azimuth_deg + randint(25, 35)
+                        self.current_gun_elevation_deg = self.current_azimuth_deg + game_state_ref.rng.combat.randint(25, 35)
                         #self.current_gun_elevation_deg = max(30, min(self.current_gun_elevation_deg, 85))
                     else:
                         self.can_hit_current_target = False
@@ -871,7 +925,10 @@ class Turret(GameObject):
 
             if (
                     self.current_visual_angle_deg != old_azimuth_deg or self.gun_sprite_rotated is None) and not self.is_firing_animation:
+                if util.cache_stats_enabled: util.count_cache_lookup("turret_rotation", False)
                 self._update_gun_sprite_visuals()
+            else:
+                if util.cache_stats_enabled: util.count_cache_lookup("turret_rotation", True)  # Sprite tourné réutilisé
 
         else:
             self.can_hit_current_target = False
@@ -881,7 +938,10 @@ class Turret(GameObject):
 
             if (
                     self.current_visual_angle_deg != old_azimuth_deg or self.gun_sprite_rotated is None) and not self.is_firing_animation:
+                if util.cache_stats_enabled: util.count_cache_lookup("turret_rotation", False)
                 self._update_gun_sprite_visuals()
+            else:
+                if util.cache_stats_enabled: util.count_cache_lookup("turret_rotation", True)  # Sprite tourné réutilisé
 
         if self.has_sufficient_iron:
             if self.is_flamethrower:
@@ -949,11 +1009,15 @@ class Turret(GameObject):
             proj_origin = (proj_origin_x, proj_origin_y)
 
         if self.is_flamethrower:
-            num_flame_particles = 3
+            # Densité réduite (réglages): moins de particules, chacune plus forte, mêmes dégâts par jet
+            base_flame_particles = 3
+            num_flame_particles = max(1, round(base_flame_particles * quality_governor.governor.get_flame_particle_density()))
             for _ in range(num_flame_particles):
-                dispersion = random.uniform(-15, 15);
+                dispersion = game_state_ref.rng.visuals.uniform(-15, 15);
                 flame_angle = self.current_azimuth_deg + dispersion
                 new_proj = Projectile("flame_particle", proj_origin, flame_angle, self.scaler)
+                if num_flame_particles != base_flame_particles:
+                    new_proj.damage = new_proj.damage * base_flame_particles / num_flame_particles
                 game_state_ref.projectiles.append(new_proj)
             return
 
@@ -994,6 +1058,8 @@ class Turret(GameObject):
                 if not self.target_enemy.active and hasattr(game_state_ref, 'money'):
                     game_state_ref.money += self.target_enemy.get_money_value();
                     game_state_ref.score += self.target_enemy.get_score_value()
+                    game_state_ref.kills += 1
+                if quality_governor.governor.is_degraded(quality_governor.LEVEL_NO_BEAM_VISUALS): return
                 beam_proj = Projectile(self.projectile_type, proj_origin, self.current_azimuth_deg, self.scaler,
                                        target_pos_for_beam=self.target_enemy.rect.center)
                 game_state_ref.projectiles.append(beam_proj)
@@ -1004,10 +1070,9 @@ class Turret(GameObject):
     def set_active_state(self, is_powered):
         self.is_functional = is_powered
 
-    def draw(self, surface):
-        if not self.active:
-            return
-
+    def get_draw_surfaces(self):
+        """Retourne la liste des (surface, topleft) à dessiner pour la base puis le canon."""
+        draw_list = []
         current_base_sprite_to_draw = self.turret_base_sprite_scaled
         base_draw_rect = self.rect
 
@@ -1018,9 +1083,7 @@ class Turret(GameObject):
                 current_base_sprite_to_draw = rotated_base_sprite
 
         if current_base_sprite_to_draw:
-            surface.blit(current_base_sprite_to_draw, base_draw_rect.topleft)
-        elif cfg.DEBUG_MODE:
-            pygame.draw.circle(surface, cfg.COLOR_CYAN, self.rect.center, self.scaler.tile_size // 3, 2)
+            draw_list.append((current_base_sprite_to_draw, base_draw_rect.topleft))
 
         if self.gun_sprite_rotated and self.gun_sprite_scaled_original:
             pivot_screen_pos = self.rect.center
@@ -1043,30 +1106,48 @@ class Turret(GameObject):
             gun_display_rect = self.gun_sprite_rotated.get_rect(
                 center=(rotated_sprite_center_x, rotated_sprite_center_y))
 
-            surface.blit(self.gun_sprite_rotated, gun_display_rect.topleft)
+            draw_list.append((self.gun_sprite_rotated, gun_display_rect.topleft))
 
             if cfg.DEBUG_MODE:
                 self.gun_final_draw_pos_topleft = gun_display_rect.topleft
-        elif cfg.DEBUG_MODE:
-            if self.gun_sprite_scaled_original:
-                temp_rotated_fallback = pygame.transform.rotate(self.gun_sprite_scaled_original,
-                                                                self.current_visual_angle_deg)
-                fb_gun_rect = temp_rotated_fallback.get_rect(center=self.rect.center)
-                surface.blit(temp_rotated_fallback, fb_gun_rect.topleft)
-            else:
-                placeholder_gun_rect = pygame.Rect(0, 0, self.scaler.tile_size * 0.5, self.scaler.tile_size * 0.2);
-                placeholder_gun_rect.center = self.rect.center
-                pygame.draw.rect(surface, cfg.COLOR_MAGENTA, placeholder_gun_rect)
+        elif cfg.DEBUG_MODE and self.gun_sprite_scaled_original:
+            temp_rotated_fallback = pygame.transform.rotate(self.gun_sprite_scaled_original,
+                                                            self.current_visual_angle_deg)
+            fb_gun_rect = temp_rotated_fallback.get_rect(center=self.rect.center)
+            draw_list.append((temp_rotated_fallback, fb_gun_rect.topleft))
+        return draw_list
+
+    def submit_draw(self, render_queue, layer):
+        if not self.active:
+            return
+        for surface_to_draw, topleft in self.get_draw_surfaces():
+            render_queue.submit(surface_to_draw, topleft, layer, self.rect.bottom)
 
-        if cfg.DEBUG_MODE:
-            pygame.draw.circle(surface, cfg.COLOR_RED, self.rect.center, 3)
-            if self.gun_sprite_rotated and hasattr(self, 'gun_final_draw_pos_topleft'):
-                debug_gun_rect = self.gun_sprite_rotated.get_rect(topleft=self.gun_final_draw_pos_topleft);
-                pygame.draw.rect(surface, cfg.COLOR_YELLOW, debug_gun_rect, 1)
+    def draw(self, surface):
+        if not self.active:
+            return
+        for surface_to_draw, topleft in self.get_draw_surfaces():
+            surface.blit(surface_to_draw, topleft)
+        self.draw_debug(surface)
+
+    def draw_debug(self, surface, camera_offset=(0, 0)):
+        if not cfg.DEBUG_MODE or not self.active:
+            return
+        screen_center = (self.rect.centerx - camera_offset[0], self.rect.centery - camera_offset[1])
+        if not self.turret_base_sprite_scaled:
+            pygame.draw.circle(surface, cfg.COLOR_CYAN, screen_center, self.scaler.tile_size // 3, 2)
+        if not self.gun_sprite_scaled_original:
+            placeholder_gun_rect = pygame.Rect(0, 0, self.scaler.tile_size * 0.5, self.scaler.tile_size * 0.2);
+            placeholder_gun_rect.center = screen_center
+            pygame.draw.rect(surface, cfg.COLOR_MAGENTA, placeholder_gun_rect)
+        pygame.draw.circle(surface, cfg.COLOR_RED, screen_center, 3)
+        if self.gun_sprite_rotated and hasattr(self, 'gun_final_draw_pos_topleft'):
+            debug_gun_rect = self.gun_sprite_rotated.get_rect(topleft=self.gun_final_draw_pos_topleft);
+            pygame.draw.rect(surface, cfg.COLOR_YELLOW, debug_gun_rect.move(-camera_offset[0], -camera_offset[1]), 1)
 
 
 # --- Projectiles ---
-class Projectile(GameObject):
+class Projectile(MovingObject):
     _id_counter = 0
 
     def __init__(self, projectile_type, origin_xy_pixels, angle_deg, scaler: util.Scaler,
@@ -1096,17 +1177,7 @@ class Projectile(GameObject):
             fallback_path = os.path.join(cfg.PROJECTILE_SPRITE_PATH, cfg.DEFAULT_BULLET_SPRITE_NAME)
             self.original_sprite = util.load_sprite(os.path.join(cfg.PROJECTILE_SPRITE_PATH, sprite_name),
                                                     specific_fallback_path=fallback_path)
-            if self.original_sprite:
-                b_w, b_h = self.original_sprite.get_size()
-                t_h = self.scaler.tile_size * cfg.BASE_PROJECTILE_SPRITE_SCALE_FACTOR
-                s_f = t_h / b_h if b_h > 0 else 1
-                t_w = b_w * s_f
-                self.sprite_scaled_original = util.scale_sprite_to_size(self.original_sprite, int(max(1, t_w)),
-                                                                        int(max(1, t_h)))
-            else:
-                fb_size_px = self.scaler.scale_value(cfg.BASE_PROJECTILE_FALLBACK_SIZE)
-                self.sprite_scaled_original = pygame.Surface((fb_size_px, fb_size_px), pygame.SRCALPHA);
-                self.sprite_scaled_original.fill(cfg.COLOR_MAGENTA + (180,))
+            self.sprite_scaled_original = self.build_scaled_sprite()
         self.is_mortar_shell = (self.type == "mortar_shell")
         if self.is_mortar_shell:
             self.vx = initial_vx or 0;
@@ -1125,8 +1196,47 @@ class Projectile(GameObject):
             fb_size = self.scaler.scale_value(cfg.BASE_PROJECTILE_FALLBACK_SIZE)
             self.rect = pygame.Rect(origin_xy_pixels[0] - fb_size // 2, origin_xy_pixels[1] - fb_size // 2, fb_size,
                                     fb_size)
+        self.set_position(origin_xy_pixels)
         self.has_impacted = False
 
+    def build_scaled_sprite(self):
+        # Sprite non tourné, à la taille de case courante
+        if self.original_sprite:
+            b_w, b_h = self.original_sprite.get_size()
+            t_h = self.scaler.tile_size * cfg.BASE_PROJECTILE_SPRITE_SCALE_FACTOR
+            s_f = t_h / b_h if b_h > 0 else 1
+            t_w = b_w * s_f
+            return util.scale_sprite_to_size(self.original_sprite, int(max(1, t_w)), int(max(1, t_h)))
+        fb_size_px = self.scaler.scale_value(cfg.BASE_PROJECTILE_FALLBACK_SIZE)
+        fallback_sprite = pygame.Surface((fb_size_px, fb_size_px), pygame.SRCALPHA);
+        fallback_sprite.fill(cfg.COLOR_MAGENTA + (180,))
+        return fallback_sprite
+
+    def rescale(self, map_point, scale_ratio):
+        # Redimensionnement en plein vol: même trajectoire relative à la grille (cf. Enemy.rescale)
+        center = map_point((self.pos_x, self.pos_y))
+        self.speed = self.scaler.scale_value(self.stats.get(cfg.STAT_PROJECTILE_FLAT_SPEED_PIXELS, 0))
+        self.aoe_radius = self.scaler.scale_value(self.stats.get(cfg.STAT_AOE_RADIUS_PIXELS, 0))
+        self.gravity_scaled = G_PHYSICS_SCALED if G_PHYSICS_SCALED != 0 else self.scaler.gravity
+        if self.is_beam:
+            if self.origin_pos: self.origin_pos = map_point(self.origin_pos)
+            if self.beam_target_pos: self.beam_target_pos = map_point(self.beam_target_pos)
+            self.set_position(center)
+            return
+        if hasattr(self, 'vx'):
+            self.vx *= scale_ratio;
+            self.vy_physics *= scale_ratio
+        self.sprite_scaled_original = self.build_scaled_sprite()
+        if self.is_mortar_shell:
+            self.sprite = self.sprite_scaled_original  # Réorienté au tick suivant
+        elif self.sprite:
+            self.sprite = pygame.transform.rotate(self.sprite_scaled_original, math.degrees(self.angle_rad))
+        if self.sprite:
+            self.rect = self.sprite.get_rect(center=self.rect.center)
+        else:
+            self.rect.size = (max(1, round(self.rect.width * scale_ratio)), max(1, round(self.rect.height * scale_ratio)))
+        self.set_position(center)
+
     def update(self, delta_time, game_state_ref=None, scaler: util.Scaler = None):
         if not self.active: return
         self.lifetime_seconds -= delta_time
@@ -1134,23 +1244,29 @@ class Projectile(GameObject):
             if self.is_mortar_shell and not self.has_impacted: self.on_hit(game_state_ref)
             self.active = False;
             return
+        self.begin_tick()
         if self.is_beam:
             pass
         elif self.is_mortar_shell:
-            self.rect.x += self.vx * delta_time;
-            self.rect.y += (-self.vy_physics )* delta_time
+            self.pos_x += self.vx * delta_time;
+            self.pos_y += (-self.vy_physics )* delta_time
+            self.sync_rect()
             self.vy_physics -= self.gravity_scaled * delta_time  # Use self.gravity_scaled
             self.vy_physics -= G_PHYSICS_SCALED  #application of the gravity
             if self.sprite_scaled_original:
                 angle_rad_traj = math.atan2(self.vy_physics, self.vx)
                 self.sprite = pygame.transform.rotate(self.sprite_scaled_original, math.degrees(-angle_rad_traj))
         else:
-            self.rect.x += self.vx * delta_time;
-            self.rect.y += -self.vy_physics * delta_time
+            self.pos_x += self.vx * delta_time;
+            self.pos_y += -self.vy_physics * delta_time
+            self.sync_rect()
         off_buf = self.scaler.scale_value(cfg.BASE_PROJECTILE_OFFSCREEN_BUFFER)
-        screen_bounds_with_buffer = pygame.Rect(-off_buf, -off_buf, self.scaler.actual_w + 2 * off_buf,
-                                                self.scaler.actual_h + 2 * off_buf)
-        if not screen_bounds_with_buffer.colliderect(self.rect): self.active = False
+        if game_state_ref is not None and hasattr(game_state_ref, 'camera'):
+            world_bounds = game_state_ref.camera.world_rect  # Le monde peut dépasser l'écran
+        else:
+            world_bounds = pygame.Rect(0, 0, self.scaler.actual_w, self.scaler.actual_h)
+        world_bounds_with_buffer = world_bounds.inflate(2 * off_buf, 2 * off_buf)
+        if not world_bounds_with_buffer.colliderect(self.rect): self.active = False
 
     def on_hit(self, game_state_ref):
         if self.is_mortar_shell and self.aoe_radius > 0 and hasattr(game_state_ref,
@@ -1159,24 +1275,36 @@ class Projectile(GameObject):
             self.has_impacted = True
         self.active = False
 
+    def is_beam_visible(self):
+        if not self.beam_target_pos or not self.origin_pos: return False
+        beam_total_duration = self.stats.get(cfg.STAT_PROJECTILE_BEAM_DURATION_SEC, 0.1)
+        return self.lifetime_seconds > beam_total_duration * 0.2
+
     def draw(self, surface):
         if not self.active: return
         if self.is_beam:
-            if self.beam_target_pos and self.origin_pos:
-                beam_total_duration = self.stats.get(cfg.STAT_PROJECTILE_BEAM_DURATION_SEC, 0.1)
-                if self.lifetime_seconds > beam_total_duration * 0.2:
-                    pygame.draw.line(surface, self.beam_color, self.origin_pos, self.beam_target_pos, 2)
+            if self.is_beam_visible():
+                pygame.draw.line(surface, self.beam_color, self.origin_pos, self.beam_target_pos, 2)
         elif self.sprite:
             surface.blit(self.sprite, self.rect.topleft)
 
+    def submit_draw(self, render_queue, layer, alpha=1.0):
+        if not self.active: return
+        if self.is_beam:
+            if self.is_beam_visible():
+                render_queue.submit_line(self.beam_color, self.origin_pos, self.beam_target_pos, 2, layer)
+        elif self.sprite:
+            super().submit_draw(render_queue, layer, alpha)
+
 
 # --- Ennemis ---
-class Enemy(GameObject):
+class Enemy(MovingObject):
     _id_counter = 0
 
-    def __init__(self, initial_pos_xy_on_screen, enemy_type_id, variant_data, scaler: util.Scaler):
+    def __init__(self, initial_pos_xy_on_screen, enemy_type_id, variant_data, scaler: util.Scaler, rng=None):
         super().__init__();
         self.scaler = scaler
+        self.rng = rng if rng is not None else random  # Flux "spawn" de la partie (cf. game_rng.py)
         Enemy._id_counter += 1;
         self.id = Enemy._id_counter
         self.type_id = enemy_type_id;
@@ -1191,7 +1319,7 @@ class Enemy(GameObject):
         self.original_sprite = util.load_sprite(os.path.join(cfg.ENEMY_SPRITE_PATH, sprite_name))
         min_s, max_s = self.stats.get(cfg.STAT_SIZE_MIN_SCALE_FACTOR, 1.0), self.stats.get(
             cfg.STAT_SIZE_MAX_SCALE_FACTOR, 1.0)
-        rand_type_scale = random.uniform(min_s, max_s)
+        rand_type_scale = self.rng.uniform(min_s, max_s)
         glob_scale_mult = getattr(cfg, 'GLOBAL_ENEMY_SPRITE_SCALE_MULTIPLIER', 1.0)
         final_scale = rand_type_scale * glob_scale_mult
         if self.original_sprite:
@@ -1214,15 +1342,38 @@ class Enemy(GameObject):
         hb_s_w, hb_s_h = self.stats.get(cfg.STAT_HITBOX_SCALE_FACTORS_WH, (0.8, 0.8))
         hb_w, hb_h = int(self.rect.width * hb_s_w), int(self.rect.height * hb_s_h)
         self.hitbox = pygame.Rect(0, 0, max(1, hb_w), max(1, hb_h));
+        self.set_position(initial_pos_xy_on_screen)
+
+    def sync_rect(self):
+        super().sync_rect()
         self.hitbox.center = self.rect.center
 
     def update(self, delta_time, game_state_ref=None, scaler: util.Scaler = None):
         if not self.active: return
-        self.rect.x -= self.speed_pixels_sec * delta_time;
-        self.hitbox.center = self.rect.center
+        self.begin_tick()
+        self.pos_x -= self.speed_pixels_sec * delta_time;
+        self.sync_rect()
         despawn_x_limit = self.scaler.screen_origin_x - self.scaler.scale_value(cfg.BASE_ENEMY_OFFSCREEN_DESPAWN_BUFFER)
         if self.rect.right < despawn_x_limit: self.active = False
 
+    def rescale(self, map_point, scale_ratio):
+        # Redimensionnement en cours de vague: position transposée par map_point, sprite re-dérivé de l'original
+        center = map_point((self.pos_x, self.pos_y))
+        self.speed_pixels_sec = self.scaler.scale_value(self.stats.get(cfg.STAT_MOVE_SPEED_PIXELS_SEC, 30))
+        if self.sprite:
+            s_w, s_h = max(1, round(self.sprite.get_width() * scale_ratio)), max(1, round(self.sprite.get_height() * scale_ratio))
+            if self.original_sprite:
+                self.sprite = util.scale_sprite_to_size(self.original_sprite, s_w, s_h)
+            else:
+                self.sprite = util.scale_sprite_to_size(self.sprite, s_w, s_h)
+            self.rect = self.sprite.get_rect(center=center)
+        else:
+            self.rect.size = (max(1, round(self.rect.width * scale_ratio)), max(1, round(self.rect.height * scale_ratio)))
+            self.rect.center = center
+        hb_s_w, hb_s_h = self.stats.get(cfg.STAT_HITBOX_SCALE_FACTORS_WH, (0.8, 0.8))
+        self.hitbox = pygame.Rect(0, 0, max(1, int(self.rect.width * hb_s_w)), max(1, int(self.rect.height * hb_s_h)))
+        self.set_position(center)
+
     def take_damage(self, amount):
         if not self.active: return
         self.current_hp -= amount
@@ -1239,27 +1390,33 @@ class Enemy(GameObject):
 
     def draw(self, surface):
         super().draw(surface)
-        if self.active and self.current_hp < self.max_hp and self.max_hp > 0:
-            bar_bg_col = getattr(cfg, 'COLOR_HP_BAR_BACKGROUND', cfg.COLOR_GREY_DARK)
-            bar_fill_col = getattr(cfg, 'COLOR_HP_FULL', cfg.COLOR_GREEN)
-            hp_r = self.current_hp / self.max_hp
-            if hp_r < 0.3:
-                bar_fill_col = getattr(cfg, 'COLOR_HP_CRITICAL', cfg.COLOR_RED)
-            elif hp_r < 0.6:
-                bar_fill_col = getattr(cfg, 'COLOR_HP_LOW', cfg.COLOR_ORANGE)
-            bar_w, bar_h, bar_off_y = self.scaler.scale_value(cfg.BASE_ENEMY_HP_BAR_WIDTH), self.scaler.scale_value(
-                cfg.BASE_ENEMY_HP_BAR_HEIGHT), self.scaler.scale_value(cfg.BASE_ENEMY_HP_BAR_OFFSET_Y)
-            bg_r = pygame.Rect(self.rect.centerx - bar_w // 2, self.rect.top - bar_h - bar_off_y, bar_w, bar_h)
-            hp_fill_w = int(bar_w * hp_r);
-            hp_r_rect = pygame.Rect(bg_r.left, bg_r.top, hp_fill_w, bar_h)
-            pygame.draw.rect(surface, bar_bg_col, bg_r);
-            pygame.draw.rect(surface, bar_fill_col, hp_r_rect)
+        self.draw_hp_bar(surface)
+
+    def get_hp_bar_blit(self, alpha=1.0):
+        """Retourne (surface, topleft) de la barre de vie, ou None si l'ennemi est à pleine vie."""
+        if not self.active or self.current_hp >= self.max_hp or self.max_hp <= 0:
+            return None
+        hp_r = self.current_hp / self.max_hp
+        if hp_r < 0.3:
+            bar_fill_col = cfg.COLOR_HP_CRITICAL
+        elif hp_r < 0.6:
+            bar_fill_col = cfg.COLOR_HP_LOW
+        else:
+            bar_fill_col = cfg.COLOR_HP_FULL
+        bar_w, bar_h = self.scaler.enemy_hp_bar_w, self.scaler.enemy_hp_bar_h
+        bar_surf = util.get_hp_bar_surface(bar_w, bar_h, int(bar_w * hp_r), bar_fill_col)
+        draw_rect = self.get_draw_rect(alpha)
+        return bar_surf, (draw_rect.centerx - bar_w // 2, draw_rect.top - bar_h - self.scaler.enemy_hp_bar_offset_y)
 
+    def draw_hp_bar(self, surface):
+        hp_bar_blit = self.get_hp_bar_blit()
+        if hp_bar_blit:
+            surface.blit(*hp_bar_blit)
 
 
 class KamikazePlane(Enemy):
-    def __init__(self, initial_pos_xy_on_screen, enemy_type_id, variant_data, scaler: util.Scaler):
-        super().__init__(initial_pos_xy_on_screen, enemy_type_id, variant_data, scaler)
+    def __init__(self, initial_pos_xy_on_screen, enemy_type_id, variant_data, scaler: util.Scaler, rng=None):
+        super().__init__(initial_pos_xy_on_screen, enemy_type_id, variant_data, scaler, rng)
 
         self.is_kamikaze = True  # Flag pour identifier ce type spécial
         self.is_diving = False
@@ -1298,7 +1455,7 @@ class KamikazePlane(Enemy):
             # PUIS le scaling spécifique du kamikaze
             min_s = self.stats.get(cfg.STAT_SIZE_MIN_SCALE_FACTOR, 0.9)  # Utiliser les stats du kamikaze
             max_s = self.stats.get(cfg.STAT_SIZE_MAX_SCALE_FACTOR, 1.1)
-            rand_type_scale = random.uniform(min_s, max_s)
+            rand_type_scale = self.rng.uniform(min_s, max_s)
             glob_scale_mult = getattr(cfg, 'GLOBAL_ENEMY_SPRITE_SCALE_MULTIPLIER', 1.0)
 
             base_scale_factor = rand_type_scale * glob_scale_mult
@@ -1333,6 +1490,22 @@ class KamikazePlane(Enemy):
         if cfg.DEBUG_MODE:
             print(f"Kamikaze {self.id} créé. Dive trigger dist sq: {self.dive_trigger_distance_sq}")
 
+    def rescale(self, map_point, scale_ratio):
+        super().rescale(map_point, scale_ratio)
+        if self.sprite_diving_scaled:
+            s_w = max(1, round(self.sprite_diving_scaled.get_width() * scale_ratio))
+            s_h = max(1, round(self.sprite_diving_scaled.get_height() * scale_ratio))
+            self.sprite_diving_scaled = util.scale_sprite_to_size(
+                self.sprite_diving_orig_unscaled or self.sprite_diving_scaled, s_w, s_h)
+        self.dive_trigger_distance_sq = self.scaler.scale_value(cfg.KAMIKAZE_DIVE_TRIGGER_DISTANCE_BASE) ** 2
+        self.current_dive_speed_x *= scale_ratio
+        self.dive_acceleration_x *= scale_ratio
+        self.max_dive_speed_x *= scale_ratio
+        # Trajectoire de plongée en cours: y = A * x^2 reste la même courbe si A est divisé par le ratio
+        if self.dive_start_pos is not None: self.dive_start_pos = pygame.math.Vector2(map_point(self.dive_start_pos))
+        if self.dive_target_pos is not None: self.dive_target_pos = map_point(self.dive_target_pos)
+        if scale_ratio > 0: self.A_parabola /= scale_ratio
+
     def select_target_generator(self, generators_list):
         closest_gen = None
         min_dist_sq = float('inf')
@@ -1365,7 +1538,7 @@ class KamikazePlane(Enemy):
             # Utiliser la même logique de scaling que dans Enemy.__init__ (ou une méthode partagée)
             min_s, max_s = self.stats.get(cfg.STAT_SIZE_MIN_SCALE_FACTOR, 1.0), self.stats.get(
                 cfg.STAT_SIZE_MAX_SCALE_FACTOR, 1.0)
-            rand_type_scale = random.uniform(min_s, max_s)  # Peut-être pas de random scale pour le diving sprite ?
+            rand_type_scale = self.rng.uniform(min_s, max_s)  # Peut-être pas de random scale pour le diving sprite ?
             glob_scale_mult = getattr(cfg, 'GLOBAL_ENEMY_SPRITE_SCALE_MULTIPLIER', 1.0)
             final_scale = rand_type_scale * glob_scale_mult  # Ou juste glob_scale_mult si diving sprite a une taille fixe
 
@@ -1376,7 +1549,7 @@ class KamikazePlane(Enemy):
             if self.sprite: self.rect = self.sprite.get_rect(center=self.rect.center)  # Conserver le centre
 
         #self.dive_start_pos = self.rect.center
-        self.dive_start_pos = pygame.math.Vector2(self.rect.center)
+        self.dive_start_pos = pygame.math.Vector2(self.pos_x, self.pos_y)
         self.dive_target_pos = self.target_generator_object.rect.center
         self.dive_horizontal_progress = 0.0
         self.current_dive_speed_x = self.scaler.scale_value(
@@ -1411,6 +1584,7 @@ class KamikazePlane(Enemy):
         if self.scaler is None and scaler: self.scaler = scaler
 
         if self.is_diving:
+            self.begin_tick()
             if not self.target_generator_object or not self.target_generator_object.active:
                 # Cible détruite ou disparue en cours de plongée, l'avion continue sa trajectoire ou explose ?
                 # Pour l'instant, il continue sur sa lancée et se désactive s'il sort de l'écran
@@ -1428,17 +1602,16 @@ class KamikazePlane(Enemy):
             if self.dive_target_pos[0] < self.dive_start_pos[0]:  # Cible à gauche
                 dx = -dx
 
-            self.rect.x += dx
+            self.pos_x += dx
             self.dive_horizontal_progress += abs(dx)  # Progression horizontale absolue
 
             # Calculer la position Y basée sur la parabole relative au point de départ de la plongée
-            x_rel_parabola = self.rect.centerx - self.dive_start_pos[0]
+            x_rel_parabola = self.pos_x - self.dive_start_pos[0]
             y_rel_parabola = self.A_parabola * (
                         x_rel_parabola ** 2)  # y = A * x^2 (A peut être <0 si on plonge vers le bas)
 
-            self.rect.centery = self.dive_start_pos[1] + y_rel_parabola
-
-            self.hitbox.center = self.rect.center
+            self.pos_y = self.dive_start_pos[1] + y_rel_parabola
+            self.sync_rect()  # rect et hitbox
 
             # Vérifier collision avec la cible
             if self.hitbox.colliderect(self.target_generator_object.rect):
@@ -1469,7 +1642,9 @@ class KamikazePlane(Enemy):
                     self.start_dive()
 
         # Désactivation si sort de l'écran (en plus de la logique de base de Enemy.update)
-        if self.rect.top > scaler.actual_h or self.rect.bottom < 0:
+        world_bounds = game_state_ref.camera.world_rect if hasattr(game_state_ref, 'camera') else \
+            pygame.Rect(0, 0, scaler.actual_w, scaler.actual_h)
+        if self.rect.top > world_bounds.bottom or self.rect.bottom < world_bounds.top:
             self.active = False
 
 
@@ -1514,12 +1689,8 @@ class ParticleEffect(GameObject):
     def __init__(self, position_xy_abs, animation_frames_list_original, frame_duration, scaler: util.Scaler):
         super().__init__();
         self.scaler = scaler;
-        self.frames = []
-        if animation_frames_list_original:
-            for f_orig in animation_frames_list_original:
-                if isinstance(f_orig, pygame.Surface):
-                    s_w, s_h = self.scaler.scale_value(f_orig.get_width()), self.scaler.scale_value(f_orig.get_height())
-                    self.frames.append(util.scale_sprite_to_size(f_orig, s_w, s_h))
+        self.frames_original = animation_frames_list_original
+        self.frames = self.build_scaled_frames()
         self.frame_duration = frame_duration;
         self.current_frame_index = 0;
         self.time_on_current_frame = 0
@@ -1542,4 +1713,22 @@ class ParticleEffect(GameObject):
                 self.active = False
             else:
                 self.sprite = self.frames[self.current_frame_index]
-                if self.sprite: self.rect = self.sprite.get_rect(center=self.rect.center)
\ No newline at end of file
+                if self.sprite: self.rect = self.sprite.get_rect(center=self.rect.center)
+
+    def build_scaled_frames(self):
+        frames = []
+        for f_orig in self.frames_original or ():
+            if isinstance(f_orig, pygame.Surface):
+                s_w, s_h = self.scaler.scale_value(f_orig.get_width()), self.scaler.scale_value(f_orig.get_height())
+                frames.append(util.scale_sprite_to_size(f_orig, s_w, s_h))
+        return frames
+
+    def rescale(self, map_point, scale_ratio):
+        # Animation en cours: images re-dérivées des originales, même position relative à la grille
+        center = map_point(self.rect.center)
+        self.frames = self.build_scaled_frames()
+        if self.current_frame_index < len(self.frames):
+            self.sprite = self.frames[self.current_frame_index]
+            self.rect = self.sprite.get_rect(center=center)
+        else:
+            self.active = False
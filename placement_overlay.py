@@ -0,0 +1,69 @@
+# placement_overlay.py
+import pygame
+import game_config as cfg
+
+
+class PlacementMaskOverlay:
+    """
+    Masque de validité du placement sur toute la grille pour l'objet sélectionné,
+    rendu dans une seule surface transparente mise en cache.
+    Les règles d'une case ne dépendent que de cette case et de celle du dessous: quand la grille
+    change, seules les cases modifiées et celles juste au-dessus sont réévaluées.
+    L'argent et l'énergie valent pour toutes les cases: ils décident seulement si le masque est affiché.
+    """
+
+    def __init__(self):
+        self.item_type = None
+        self.layout_key = None  # (ligne d'origine, largeur, taille de case, origine écran)
+        self.mask = {}  # {(ligne, colonne): bool}
+        self.surface = None
+        self.surface_topleft = (0, 0)
+
+    def invalidate(self):
+        self.item_type = None
+        self.layout_key = None
+
+    def refresh(self, game_state):
+        # Appelé une fois par frame
+        changed_tiles = game_state.tile_index.pop_changed_tiles()
+        item_type = game_state.selected_item_to_place_type
+        if not item_type:
+            self.invalidate()  # Les cases modifiées d'ici la prochaine sélection seront perdues
+            return
+        layout_key = (game_state.grid_origin_row, game_state.grid_width_tiles, game_state.scaler.tile_size,
+                      game_state.grid_origin_pixels)
+        if item_type != self.item_type or layout_key != self.layout_key:
+            self.rebuild(game_state, item_type, layout_key)
+            return
+        for grid_r, grid_c in changed_tiles:
+            for r in (grid_r, grid_r - 1):  # La case au-dessus dépend de celle-ci (support)
+                if game_state.is_tile_in_grid(r, grid_c):
+                    self.update_tile(game_state, r, grid_c)
+
+    def rebuild(self, game_state, item_type, layout_key):
+        self.item_type = item_type
+        self.layout_key = layout_key
+        area_rect = game_state.buildable_area_rect_pixels
+        self.surface = pygame.Surface(area_rect.size, pygame.SRCALPHA)
+        self.surface_topleft = area_rect.topleft
+        self.mask = {}
+        for r in range(game_state.grid_origin_row, game_state.grid_bottom_row + 1):
+            for c in range(game_state.grid_width_tiles):
+                self.update_tile(game_state, r, c)
+        if cfg.DEBUG_MODE: print(f"PlacementMaskOverlay: masque reconstruit pour {item_type}")
+
+    def update_tile(self, game_state, grid_r, grid_c):
+        is_valid, _ = game_state.check_placement_rules_at(self.item_type, grid_r, grid_c)
+        if self.mask.get((grid_r, grid_c)) == is_valid: return
+        self.mask[(grid_r, grid_c)] = is_valid
+        tile_size = game_state.scaler.tile_size
+        tile_rect = pygame.Rect(grid_c * tile_size, (grid_r - game_state.grid_origin_row) * tile_size,
+                                tile_size, tile_size)
+        self.surface.fill(cfg.COLOR_PLACEMENT_VALID + (cfg.PLACEMENT_MASK_ALPHA,) if is_valid else (0, 0, 0, 0),
+                          tile_rect)
+
+    def draw(self, screen, game_state):
+        if not self.item_type or self.surface is None: return
+        resources_ok, _ = game_state.check_placement_resources(self.item_type)
+        if resources_ok:
+            screen.blit(self.surface, game_state.camera.world_to_screen(self.surface_topleft))
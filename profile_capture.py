@@ -0,0 +1,140 @@
+# profile_capture.py
+import cProfile
+import json
+import os
+import pstats
+import time
+import game_config as cfg
+
+SPEEDSCOPE_SCHEMA_URL = "https://www.speedscope.app/file-format-schema.json"
+
+
+def get_capture_tags(game_state):
+    # Contexte de la capture: temps de jeu, vague et nombre d'entités vivantes
+    return {
+        "game_time_sec": round(game_state.total_time_elapsed_seconds, 1),
+        "wave": game_state.current_wave_number,
+        "enemies": len(game_state.enemies),
+        "projectiles": len(game_state.projectiles),
+        "turrets": len(game_state.turrets),
+        "buildings": len(game_state.buildings),
+        "particle_effects": len(game_state.particle_effects),
+    }
+
+
+def build_speedscope_profile(stats: pstats.Stats, profile_name):
+    """
+    Profil "sampled" speedscope tiré des statistiques cProfile. cProfile ne garde pas l'arbre d'appels,
+    seulement les arêtes appelant -> appelé: chaque pile est donc [appelant, fonction], pondérée par
+    le temps propre de la fonction quand elle est appelée depuis cet appelant (valeur exacte).
+    """
+    frame_indices = {}
+    speedscope_frames = []
+
+    def get_frame_index(function_key):
+        if function_key not in frame_indices:
+            file_name, line_number, function_name = function_key
+            frame_indices[function_key] = len(speedscope_frames)
+            speedscope_frames.append({"name": function_name, "file": file_name, "line": line_number})
+        return frame_indices[function_key]
+
+    samples, weights = [], []
+    for function_key, (_, _, total_time, _, callers) in stats.stats.items():
+        if not callers:
+            if total_time > 0:
+                samples.append([get_frame_index(function_key)])
+                weights.append(total_time)
+            continue
+        for caller_key, caller_edge in callers.items():
+            edge_self_time = caller_edge[2] if isinstance(caller_edge, tuple) else 0.0
+            if edge_self_time <= 0: continue
+            samples.append([get_frame_index(caller_key), get_frame_index(function_key)])
+            weights.append(edge_self_time)
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA_URL,
+        "name": profile_name,
+        "exporter": cfg.GAME_TITLE,
+        "shared": {"frames": speedscope_frames},
+        "profiles": [{"type": "sampled", "name": profile_name, "unit": "seconds", "startValue": 0,
+                      "endValue": sum(weights), "samples": samples, "weights": weights}],
+    }
+
+
+class ProfileCapture:
+    """
+    Passe les N frames suivantes sous cProfile (cfg.PROFILE_CAPTURE_FRAMES), à la demande (touche) ou, si
+    cfg.PROFILE_CAPTURE_AUTO, automatiquement après une frame plus lente que cfg.PROFILE_CAPTURE_AUTO_RATIO
+    fois le budget.
+    Seul le travail de la frame est profilé: suspend() est appelé avant l'attente des événements et du tick.
+    """
+
+    def __init__(self):
+        self.profile = None
+        self.requested_frames = 0
+        self.frames_remaining = 0
+        self.capture_reason = ""
+        self.capture_tags = {}
+        self.last_capture_end_time = -cfg.PROFILE_CAPTURE_AUTO_COOLDOWN_SEC
+
+    @property
+    def active(self):
+        return self.profile is not None
+
+    def request(self, reason, frame_count=None):
+        if self.active or self.requested_frames: return
+        self.requested_frames = max(1, int(frame_count or cfg.PROFILE_CAPTURE_FRAMES))
+        self.capture_reason = reason
+        if cfg.DEBUG_MODE: print(f"PROFILE_CAPTURE: capture de {self.requested_frames} frames demandée ({reason})")
+
+    def suspend(self):
+        if self.profile is not None: self.profile.disable()
+
+    def begin_frame(self, last_frame_work_seconds, game_state, is_game_running):
+        # Appelé après le tick: décide du déclenchement automatique, puis (re)lance la mesure de la frame
+        if self.profile is None:
+            if (cfg.PROFILE_CAPTURE_AUTO and is_game_running and cfg.FPS > 0
+                    and last_frame_work_seconds > cfg.PROFILE_CAPTURE_AUTO_RATIO / cfg.FPS
+                    and time.perf_counter() - self.last_capture_end_time >= cfg.PROFILE_CAPTURE_AUTO_COOLDOWN_SEC):
+                self.request(f"auto {last_frame_work_seconds * 1000:.0f} ms")
+            if not self.requested_frames: return
+            self.frames_remaining = self.requested_frames
+            self.requested_frames = 0
+            self.capture_tags = get_capture_tags(game_state)
+            self.profile = cProfile.Profile()
+        elif self.frames_remaining <= 1:
+            self.finish()
+            return
+        else:
+            self.frames_remaining -= 1
+        try:
+            self.profile.enable()
+        except ValueError as e:  # Un autre profileur est déjà actif
+            print(f"AVERTISSEMENT: Capture de profil impossible: {e}")
+            self.profile = None
+
+    def finish(self):
+        # Écrit le .pstats et le .speedscope.json de la capture en cours; retourne le chemin de base
+        if self.profile is None: return None
+        profile, self.profile = self.profile, None
+        profile.disable()
+        self.last_capture_end_time = time.perf_counter()
+        tags = self.capture_tags
+        base_path = os.path.join(cfg.PROFILE_CAPTURE_DIR, time.strftime("capture_%Y%m%d_%H%M%S") +
+                                 f"_w{tags['wave']}_t{tags['game_time_sec']:.0f}s")
+        profile_name = (f"{self.capture_reason}, t={tags['game_time_sec']}s, vague {tags['wave']}, "
+                        + ", ".join(f"{key} {value}" for key, value in tags.items()
+                                    if key not in ("game_time_sec", "wave")))
+        try:
+            os.makedirs(cfg.PROFILE_CAPTURE_DIR, exist_ok=True)
+            stats = pstats.Stats(profile)
+            stats.dump_stats(base_path + ".pstats")
+            with open(base_path + ".speedscope.json", "w", encoding="utf-8") as speedscope_file:
+                json.dump(build_speedscope_profile(stats, profile_name), speedscope_file)
+        except (OSError, TypeError) as e:  # TypeError: capture vide (aucune fonction mesurée)
+            print(f"AVERTISSEMENT: Écriture de la capture de profil échouée ({base_path}): {e}")
+            return None
+        print(f"PROFILE_CAPTURE: {profile_name} -> {base_path}.pstats")
+        return base_path
+
+
+capture = ProfileCapture()  # Instance unique: main.py l'alimente à chaque frame
@@ -0,0 +1,79 @@
+# quality_governor.py
+import collections
+import game_config as cfg
+
+# Paliers de qualité, abandonnés dans cet ordre quand les frames dépassent la cible (1 / cfg.FPS)
+LEVEL_FULL = 0
+LEVEL_REDUCED_FLAMES = 1  # Moins de particules par jet de lance-flammes (Turret.shoot)
+LEVEL_NO_BEAM_VISUALS = 2  # Tirs de mitrailleuse sans le trait (les dégâts restent appliqués)
+LEVEL_FAST_SCALING = 3  # pygame.transform.scale au lieu de smoothscale pour les nouvelles mises à l'échelle
+LEVEL_FEWER_HP_BARS = 4  # Barres de vie seulement pour les ennemis bien entamés
+MAX_LEVEL = LEVEL_FEWER_HP_BARS
+
+LEVEL_NAMES = {
+    LEVEL_FULL: "complète",
+    LEVEL_REDUCED_FLAMES: "flammes réduites",
+    LEVEL_NO_BEAM_VISUALS: "sans traits de mitrailleuse",
+    LEVEL_FAST_SCALING: "mise à l'échelle rapide",
+    LEVEL_FEWER_HP_BARS: "barres de vie réduites",
+}
+
+
+class QualityGovernor:
+    """
+    Ajuste la qualité au temps de travail des frames (hors attente du clock.tick), en moyenne glissante.
+    Un palier est abandonné quand la moyenne dépasse la cible de plus de STEP_DOWN_RATIO, et retrouvé
+    quand elle repasse sous STEP_UP_RATIO. L'écart entre les deux seuils, la fenêtre pleine exigée et le
+    délai minimum entre deux changements évitent les oscillations.
+    """
+
+    def __init__(self, window_frames=cfg.QUALITY_GOVERNOR_WINDOW_FRAMES):
+        self.level = LEVEL_FULL
+        self.frame_times = collections.deque(maxlen=max(1, int(window_frames)))
+        self.frame_time_sum = 0.0
+        self.time_since_level_change = 0.0
+
+    def clear_samples(self):
+        self.frame_times.clear()
+        self.frame_time_sum = 0.0
+
+    def get_average_frame_time(self):
+        if not self.frame_times: return 0.0
+        return self.frame_time_sum / len(self.frame_times)
+
+    def record_frame(self, work_time_seconds, delta_time):
+        if len(self.frame_times) == self.frame_times.maxlen:
+            self.frame_time_sum -= self.frame_times[0]
+        self.frame_times.append(work_time_seconds)
+        self.frame_time_sum += work_time_seconds
+        self.time_since_level_change += delta_time
+        if not cfg.QUALITY_GOVERNOR_ENABLED or cfg.FPS <= 0: return
+        if len(self.frame_times) < self.frame_times.maxlen: return
+        if self.time_since_level_change < cfg.QUALITY_GOVERNOR_COOLDOWN_SEC: return
+        target_frame_time = 1.0 / cfg.FPS
+        average_frame_time = self.get_average_frame_time()
+        if average_frame_time > target_frame_time * cfg.QUALITY_GOVERNOR_STEP_DOWN_RATIO and self.level < MAX_LEVEL:
+            self.set_level(self.level + 1)
+        elif average_frame_time < target_frame_time * cfg.QUALITY_GOVERNOR_STEP_UP_RATIO and self.level > LEVEL_FULL:
+            self.set_level(self.level - 1)
+
+    def set_level(self, level):
+        if cfg.DEBUG_MODE: print(f"QUALITY_GOVERNOR: palier {self.level} -> {level} ({LEVEL_NAMES[level]}), "
+                                 f"moyenne {self.get_average_frame_time() * 1000:.1f} ms")
+        self.level = level
+        self.time_since_level_change = 0.0
+        self.clear_samples()  # La décision suivante ne porte que sur des frames au nouveau palier
+
+    def is_degraded(self, level):
+        return self.level >= level
+
+    def get_flame_particle_density(self):
+        if self.is_degraded(LEVEL_REDUCED_FLAMES):
+            return cfg.FLAME_PARTICLE_DENSITY * cfg.QUALITY_GOVERNOR_FLAME_DENSITY_FACTOR
+        return cfg.FLAME_PARTICLE_DENSITY
+
+    def is_smooth_scaling(self):
+        return cfg.SMOOTH_SCALING and not self.is_degraded(LEVEL_FAST_SCALING)
+
+
+governor = QualityGovernor()  # Instance unique, alimentée par main.py et consultée au rendu / au tir
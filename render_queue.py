@@ -0,0 +1,98 @@
+# render_queue.py
+import pygame
+
+# --- Couches de rendu (dessinées dans cet ordre) ---
+LAYER_BUILDINGS = 0
+LAYER_TURRETS = 1
+LAYER_ENTITIES = 2  # Ennemis, projectiles, effets de particules
+LAYER_OVERLAY = 3
+NUM_LAYERS = 4
+
+
+class RenderQueue:
+    """
+    File de rendu par couches. Les objets soumettent (surface, position, couche, clé de tri)
+    et la file est vidée avec un seul Surface.blits() par couche.
+    Le tri par rect.bottom est maintenu à l'insertion en rangeant chaque entrée dans un
+    "seau" correspondant à une bande horizontale de l'écran: pas de sort() à chaque frame.
+    Les positions soumises sont en coordonnées monde: set_view() donne la vue de la caméra,
+    tout ce qui est hors de la vue est écarté dès la soumission.
+    """
+
+    def __init__(self, screen_height, bucket_height):
+        self.bucket_height = max(1, int(bucket_height))
+        # Un seau par bande de bucket_height pixels, + 1 pour tout ce qui dépasse en bas
+        self.num_buckets = screen_height // self.bucket_height + 2
+        self.buckets = [[[] for _ in range(self.num_buckets)] for _ in range(NUM_LAYERS)]
+        self.lines = [[] for _ in range(NUM_LAYERS)]
+        # Plage de seaux utilisés par couche, pour ne parcourir que ce qui a été rempli
+        self.bucket_min = [self.num_buckets] * NUM_LAYERS
+        self.bucket_max = [-1] * NUM_LAYERS
+        self.view_x, self.view_y = 0, 0
+        self.view_w, self.view_h = 0, screen_height  # Largeur 0: pas de vue définie, rien n'est écarté
+        self.culled_count = 0
+
+    def set_view(self, view_rect):
+        self.view_x, self.view_y = view_rect.x, view_rect.y
+        self.view_w, self.view_h = view_rect.width, view_rect.height
+        self.culled_count = 0  # Début de frame
+
+    def is_outside_view(self, x, y, w, h):
+        # x, y déjà en coordonnées écran
+        if self.view_w <= 0: return False
+        return x >= self.view_w or y >= self.view_h or x + w <= 0 or y + h <= 0
+
+    def submit(self, surface, position, layer, sort_key):
+        if surface is None: return
+        x, y = position[0] - self.view_x, position[1] - self.view_y
+        w, h = surface.get_size()
+        if self.is_outside_view(x, y, w, h):
+            self.culled_count += 1
+            return
+        position = (x, y)
+        bucket_idx = int(sort_key - self.view_y) // self.bucket_height
+        if bucket_idx < 0:
+            bucket_idx = 0
+        elif bucket_idx >= self.num_buckets:
+            bucket_idx = self.num_buckets - 1
+        self.buckets[layer][bucket_idx].append((surface, position))
+        if bucket_idx < self.bucket_min[layer]: self.bucket_min[layer] = bucket_idx
+        if bucket_idx > self.bucket_max[layer]: self.bucket_max[layer] = bucket_idx
+
+    def submit_line(self, color, start_pos, end_pos, width, layer):
+        # Les lignes (ex: tirs de mitrailleuse) ne passent pas par blits, dessinées après la couche
+        start_pos = (start_pos[0] - self.view_x, start_pos[1] - self.view_y)
+        end_pos = (end_pos[0] - self.view_x, end_pos[1] - self.view_y)
+        min_x, min_y = min(start_pos[0], end_pos[0]), min(start_pos[1], end_pos[1])
+        if self.is_outside_view(min_x - width, min_y - width, abs(start_pos[0] - end_pos[0]) + 2 * width,
+                                abs(start_pos[1] - end_pos[1]) + 2 * width):
+            self.culled_count += 1
+            return
+        self.lines[layer].append((color, start_pos, end_pos, width))
+
+    def flush(self, target_surface):
+        for layer in range(NUM_LAYERS):
+            lo, hi = self.bucket_min[layer], self.bucket_max[layer]
+            if lo <= hi:
+                layer_buckets = self.buckets[layer]
+                blit_sequence = []
+                for bucket_idx in range(lo, hi + 1):
+                    bucket = layer_buckets[bucket_idx]
+                    if bucket:
+                        blit_sequence.extend(bucket)
+                        bucket.clear()
+                target_surface.blits(blit_sequence, doreturn=False)
+                self.bucket_min[layer] = self.num_buckets
+                self.bucket_max[layer] = -1
+            if self.lines[layer]:
+                for color, start_pos, end_pos, width in self.lines[layer]:
+                    pygame.draw.line(target_surface, color, start_pos, end_pos, width)
+                self.lines[layer].clear()
+
+    def clear(self):
+        for layer in range(NUM_LAYERS):
+            for bucket in self.buckets[layer]:
+                bucket.clear()
+            self.lines[layer].clear()
+            self.bucket_min[layer] = self.num_buckets
+            self.bucket_max[layer] = -1
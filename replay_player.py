@@ -0,0 +1,227 @@
+# replay_player.py
+"""
+Rejoue une partie enregistrée par input_recording.py: même graine, mêmes réglages de simulation, mêmes
+actions au même tick. Les points de contrôle de l'enregistrement sont comparés à l'état rejoué; le temps
+de calcul de chaque tick est mesuré (une partie lente chez un joueur se rejoue sous le profileur).
+
+    python replay_player.py reports/replays/replay_20240101_120000_123.jsonl          # fenêtre, temps réel
+    python replay_player.py replay.jsonl --speed 4                                     # fenêtre, 4x
+    python replay_player.py replay.jsonl --headless                                    # sans fenêtre, vitesse max
+    python replay_player.py replay.jsonl --headless --profile                          # sous cProfile
+
+Code de sortie 1 si l'état rejoué diffère de l'enregistrement.
+"""
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+import pygame
+import game_config as cfg
+import utility_functions as util
+import ui_functions
+import game_functions
+import gamemodes
+import quality_governor
+import frame_stats
+import profile_capture
+import input_recording
+
+SLOWEST_TICKS_SHOWN = 5
+
+
+def apply_header_settings(header):
+    # Réglages qui influent sur la simulation: ceux de l'enregistrement, pas ceux de cette machine
+    cfg.SIM_TICK_RATE = header["tick_rate"]
+    cfg.SIM_TICK_SEC = 1.0 / cfg.SIM_TICK_RATE
+    cfg.RENDER_SCALE = header["render_scale"]
+    cfg.FLAME_PARTICLE_DENSITY = header["flame_density"]
+    cfg.LARGE_BATTLEFIELD_MODE = header["large_battlefield"]
+    cfg.QUALITY_GOVERNOR_ENABLED = False  # Les changements de palier sont rejoués depuis l'enregistrement
+    cfg.REPLAY_RECORD_ENABLED = False
+    quality_governor.governor.level = header["quality_level"]
+
+
+def set_replay_screen(game_state, size):
+    # Surface de rendu à la taille enregistrée (la simulation est en pixels de rendu)
+    screen = pygame.display.set_mode(size)
+    util.set_render_surface_size(size, size)
+    game_state.screen = screen
+    game_state.scaler.rebuild(*size)
+    ui_functions.ensure_layouts_current(game_state, game_state.scaler)
+    game_state.ensure_scale_current()
+
+
+def create_replay_game(header):
+    size = tuple(header["render_size"])
+    screen = pygame.display.set_mode(size)
+    pygame.display.set_caption(f"{cfg.GAME_TITLE} - rejeu (graine {header['seed']})")
+    util.set_render_surface_size(size, size)
+    scaler = util.Scaler(*size, cfg.REF_WIDTH, cfg.REF_HEIGHT)
+    game_state = game_functions.GameState(scaler)
+    game_state.screen = screen
+    ui_functions.ensure_layouts_current(game_state, scaler)
+    gamemodes.start_game_mode(screen, pygame.time.Clock(), game_state, is_tutorial=header["tutorial"],
+                              seed=header["seed"])
+    return game_state
+
+
+def get_checkpoint_differences(recorded_checkpoint, game_state):
+    # Aller-retour JSON pour comparer ce qui a été écrit (tuples -> listes) à ce qui l'aurait été
+    replayed_checkpoint = json.loads(json.dumps(input_recording.build_checkpoint(game_state)))
+    return {key: (recorded_value, replayed_checkpoint.get(key)) for key, recorded_value in recorded_checkpoint.items()
+            if replayed_checkpoint.get(key) != recorded_value}
+
+
+class ReplayRun:
+    """Rejoue les enregistrements dans l'ordre: avant chaque ligne, la partie avance jusqu'à son tick."""
+
+    def __init__(self, game_state, records, window_speed=None):
+        self.game_state = game_state
+        self.records = records
+        self.window_speed = window_speed  # None: sans affichage; 0: fenêtre sans limite; sinon multiple du temps réel
+        self.clock = pygame.time.Clock()
+        self.tick_times = frame_stats.FrameTimeHistogram()
+        self.slowest_ticks = []  # (ms, tick, vague)
+        self.action_count = 0
+        self.checkpoint_count = 0
+        self.divergences = []  # (tick, type, détail)
+        self.end_reason = None
+        self.stopped_by_user = False
+
+    def step(self):
+        game_state = self.game_state
+        tick_start = time.perf_counter()
+        next_state = gamemodes.step_game_mode(game_state)
+        tick_ms = (time.perf_counter() - tick_start) * 1000.0
+        self.tick_times.add(tick_ms, cfg.SIM_TICK_SEC * 1000.0)
+        if len(self.slowest_ticks) < SLOWEST_TICKS_SHOWN or tick_ms > self.slowest_ticks[-1][0]:
+            self.slowest_ticks.append((tick_ms, game_state.sim_tick_index, game_state.current_wave_number))
+            self.slowest_ticks.sort(reverse=True)
+            del self.slowest_ticks[SLOWEST_TICKS_SHOWN:]
+        if self.window_speed is not None: self.present()
+        return next_state
+
+    def present(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                self.stopped_by_user = True
+        self.game_state.screen.fill(cfg.COLOR_BACKGROUND)
+        gamemodes.draw_game_mode(self.game_state)
+        pygame.display.flip()
+        if self.window_speed > 0: self.clock.tick(cfg.SIM_TICK_RATE * self.window_speed)
+
+    def advance_to(self, tick_index):
+        game_state = self.game_state
+        while game_state.sim_tick_index < tick_index and not self.stopped_by_user:
+            if game_state.game_over_flag:
+                self.divergences.append((game_state.sim_tick_index, "game_over",
+                                         f"partie perdue avant le tick {tick_index} enregistré"))
+                return False
+            self.step()
+        return game_state.sim_tick_index == tick_index
+
+    def check(self, record, checkpoint):
+        self.checkpoint_count += 1
+        differences = get_checkpoint_differences(checkpoint, self.game_state)
+        if differences: self.divergences.append((record[0], record[1], differences))
+
+    def run(self):
+        for record in self.records:
+            if not self.advance_to(record[0]): break
+            kind = record[1]
+            if kind == input_recording.RECORD_CHECKPOINT:
+                self.check(record, record[2])
+            elif kind == input_recording.RECORD_END:
+                self.end_reason = record[2]
+                self.check(record, record[3])
+                break
+            elif kind == input_recording.ACTION_RESIZE:
+                set_replay_screen(self.game_state, (record[2], record[3]))
+                self.action_count += 1
+            elif input_recording.apply_action(self.game_state, record):
+                self.action_count += 1
+            else:
+                print(f"AVERTISSEMENT: Action inconnue ignorée au tick {record[0]}: {record[1]}")
+        return not self.divergences
+
+
+def write_profile(profile, recording_path, game_state):
+    base_path = os.path.join(cfg.PROFILE_CAPTURE_DIR, os.path.splitext(os.path.basename(recording_path))[0])
+    profile_name = f"rejeu {os.path.basename(recording_path)}, {game_state.sim_tick_index} ticks"
+    try:
+        os.makedirs(cfg.PROFILE_CAPTURE_DIR, exist_ok=True)
+        stats = pstats.Stats(profile)
+        stats.dump_stats(base_path + ".pstats")
+        with open(base_path + ".speedscope.json", "w", encoding="utf-8") as speedscope_file:
+            json.dump(profile_capture.build_speedscope_profile(stats, profile_name), speedscope_file)
+    except (OSError, TypeError) as e:
+        print(f"AVERTISSEMENT: Écriture du profil du rejeu échouée ({base_path}): {e}")
+        return
+    print(f"Profil: {base_path}.pstats (+ .speedscope.json)")
+
+
+def print_report(replay_run, elapsed_seconds):
+    game_state = replay_run.game_state
+    summary = replay_run.tick_times.get_summary()
+    game_seconds = game_state.sim_tick_index * cfg.SIM_TICK_SEC
+    print(f"{game_state.sim_tick_index} ticks ({game_seconds:.1f} s de jeu) en {elapsed_seconds:.2f} s "
+          f"(x{game_seconds / elapsed_seconds if elapsed_seconds > 0 else 0:.1f}), "
+          f"{replay_run.action_count} actions, fin: "
+          f"{'interrompu' if replay_run.stopped_by_user else replay_run.end_reason or 'enregistrement incomplet'}")
+    print(f"Tick: moyenne {summary['mean_ms']} ms, p95 {summary['p95_ms']} ms, p99 {summary['p99_ms']} ms, "
+          f"max {summary['max_ms']} ms, {summary['over_budget']} au-delà de {cfg.SIM_TICK_SEC * 1000:.1f} ms")
+    print("Ticks les plus lents: " + ", ".join(f"{tick_ms:.2f} ms (tick {tick}, vague {wave})"
+                                               for tick_ms, tick, wave in replay_run.slowest_ticks))
+    print(f"Vague {game_state.current_wave_number}, argent {game_state.money}, ville {game_state.city_hp} PV, "
+          f"{game_state.kills} ennemis détruits")
+    if not replay_run.divergences:
+        print(f"Identique à l'enregistrement ({replay_run.checkpoint_count} points de contrôle).")
+        return
+    print(f"DIVERGENCE: {len(replay_run.divergences)} point(s) de contrôle sur {replay_run.checkpoint_count} diffèrent "
+          f"(valeur enregistrée, valeur rejouée)")
+    for tick, kind, detail in replay_run.divergences[:SLOWEST_TICKS_SHOWN]:
+        print(f"  tick {tick} ({kind}): {detail}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rejoue une partie enregistrée et vérifie qu'elle se déroule à l'identique.")
+    parser.add_argument("recording", help="fichier .jsonl de cfg.REPLAY_DIR")
+    parser.add_argument("--headless", action="store_true", help="sans fenêtre, à vitesse maximale")
+    parser.add_argument("--speed", type=float, default=1.0, help="fenêtre: multiple du temps réel (0 = sans limite)")
+    parser.add_argument("--profile", action="store_true", help="rejoue sous cProfile (.pstats + speedscope)")
+    args = parser.parse_args(argv)
+
+    try:
+        header, records = input_recording.read_recording(args.recording)
+    except (OSError, ValueError) as e:
+        print(f"Enregistrement illisible ({args.recording}): {e}")
+        return 2
+    if args.headless:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    cfg.DEBUG_MODE = False
+    apply_header_settings(header)
+    pygame.init()
+    game_state = create_replay_game(header)
+    replay_run = ReplayRun(game_state, records, None if args.headless else max(0.0, args.speed))
+    print(f"Rejeu de {args.recording}: graine {header['seed']}, {header['render_size'][0]}x{header['render_size'][1]}, "
+          f"{len(records)} lignes, enregistré le {header.get('recorded_at', '?')}")
+
+    profile = cProfile.Profile() if args.profile else None
+    start = time.perf_counter()
+    if profile: profile.enable()
+    is_identical = replay_run.run()
+    if profile: profile.disable()
+    elapsed_seconds = time.perf_counter() - start
+
+    print_report(replay_run, elapsed_seconds)
+    if profile: write_profile(profile, args.recording, game_state)
+    pygame.quit()
+    return 0 if is_identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# settings.py
+import json
+import game_config as cfg
+
+# Réglages de performance de l'écran Options, enregistrés dans cfg.SETTINGS_FILE_PATH.
+# main.run_game les lit et les applique aux constantes de game_config avant la création du Scaler
+# et le chargement des sprites: tout ce qui est mis à l'échelle l'est directement avec les bons réglages.
+
+PRESET_LOW = "low"
+PRESET_MEDIUM = "medium"
+PRESET_HIGH = "high"
+PRESET_CUSTOM = "custom"  # Un réglage modifié à la main ne correspond plus à aucun préréglage
+PRESET_ORDER = (PRESET_LOW, PRESET_MEDIUM, PRESET_HIGH)
+
+PRESETS = {
+    PRESET_LOW: {"render_scale": 0.5, "fps_cap": 30, "vsync": False, "smooth_scaling": False,
+                 "flame_particle_density": 0.34},
+    PRESET_MEDIUM: {"render_scale": 0.75, "fps_cap": 60, "vsync": False, "smooth_scaling": True,
+                    "flame_particle_density": 0.67},
+    PRESET_HIGH: {"render_scale": 1.0, "fps_cap": 60, "vsync": False, "smooth_scaling": True,
+                  "flame_particle_density": 1.0},
+}
+
+# Valeurs proposées pour chaque réglage, dans l'ordre du clic (l'écran Options les fait défiler)
+OPTION_CHOICES = {
+    "preset": PRESET_ORDER,
+    "render_scale": (1.0, 0.75, 0.5),
+    "fps_cap": (30, 60, 120, 144),
+    "vsync": (False, True),
+    "smooth_scaling": (True, False),
+    "flame_particle_density": (1.0, 0.67, 0.34),
+    "show_hp_bars": (True, False),
+    "debug_overlays": (False, True),
+}
+
+# Réglages qui imposent de recréer l'affichage (surface de rendu, vsync) ou de remettre les sprites à l'échelle
+DISPLAY_OPTION_KEYS = ("render_scale", "vsync", "smooth_scaling")
+
+
+def get_default_settings():
+    default_settings = {"preset": PRESET_HIGH, "show_hp_bars": True, "debug_overlays": cfg.DEBUG_MODE}
+    default_settings.update(PRESETS[PRESET_HIGH])
+    return default_settings
+
+
+def load_settings(path=cfg.SETTINGS_FILE_PATH):
+    # Fichier absent ou invalide: réglages par défaut. Les clés ou valeurs inconnues sont ignorées.
+    loaded_settings = get_default_settings()
+    try:
+        with open(path, "r", encoding="utf-8") as settings_file:
+            file_settings = json.load(settings_file)
+    except FileNotFoundError:
+        return loaded_settings
+    except (OSError, ValueError) as e:
+        print(f"AVERTISSEMENT: Lecture des réglages échouée ({path}): {e}")
+        return loaded_settings
+    if not isinstance(file_settings, dict):
+        print(f"AVERTISSEMENT: Réglages ignorés ({path}): objet JSON attendu.")
+        return loaded_settings
+    for key, value in file_settings.items():
+        choices = OPTION_CHOICES.get(key, ())
+        if key == "preset": choices += (PRESET_CUSTOM,)
+        if value in choices and type(value) is type(choices[0]):  # json: true == 1 == 1.0
+            loaded_settings[key] = value
+        elif cfg.DEBUG_MODE:
+            print(f"SETTINGS: Réglage ignoré {key}={value!r}")
+    if loaded_settings["preset"] != PRESET_CUSTOM and any(
+            loaded_settings[key] != value for key, value in PRESETS[loaded_settings["preset"]].items()):
+        loaded_settings["preset"] = PRESET_CUSTOM
+    return loaded_settings
+
+
+def save_settings(current_settings, path=cfg.SETTINGS_FILE_PATH):
+    try:
+        with open(path, "w", encoding="utf-8") as settings_file:
+            json.dump(current_settings, settings_file, indent=2, sort_keys=True)
+    except OSError as e:
+        print(f"AVERTISSEMENT: Enregistrement des réglages échoué ({path}): {e}")
+
+
+def apply_settings(current_settings):
+    cfg.RENDER_SCALE = current_settings["render_scale"]
+    cfg.FPS = current_settings["fps_cap"]
+    for game_state_name in (cfg.STATE_GAMEPLAY, cfg.STATE_TUTORIAL):
+        cfg.STATE_FPS_CAPS[game_state_name] = cfg.FPS
+    cfg.VSYNC = current_settings["vsync"]
+    cfg.SMOOTH_SCALING = current_settings["smooth_scaling"]
+    cfg.FLAME_PARTICLE_DENSITY = current_settings["flame_particle_density"]
+    cfg.SHOW_ENEMY_HP_BARS = current_settings["show_hp_bars"]
+    cfg.DEBUG_OVERLAYS = current_settings["debug_overlays"]
+
+
+def get_display_options(current_settings):
+    return tuple(current_settings[key] for key in DISPLAY_OPTION_KEYS)
+
+
+def cycle_option(current_settings, key):
+    # Passe à la valeur suivante du réglage; un préréglage remplace toutes ses valeurs d'un coup
+    choices = OPTION_CHOICES[key]
+    current_value = current_settings.get(key)
+    next_index = (choices.index(current_value) + 1) % len(choices) if current_value in choices else 0
+    if key == "preset":
+        current_settings.update(PRESETS[choices[next_index]])
+        current_settings["preset"] = choices[next_index]
+        return
+    current_settings[key] = choices[next_index]
+    if key in PRESETS[PRESET_HIGH]:
+        current_settings["preset"] = PRESET_CUSTOM
+        for preset_name in PRESET_ORDER:
+            if all(current_settings[k] == v for k, v in PRESETS[preset_name].items()):
+                current_settings["preset"] = preset_name
+
+
+current_settings = get_default_settings()  # Remplacé au démarrage par load_settings() (main.run_game)
@@ -0,0 +1,95 @@
+# storage_clusters.py
+
+NEIGHBOR_OFFSETS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+
+class StorageClusterIndex:
+    """
+    Regroupement des stockages adjacents (union-find par case).
+    Tient à jour, à chaque ajout / retrait, le nombre de voisins de chaque stockage,
+    la taille de chaque groupe et la capacité de fer totale apportée par les stockages:
+    le bilan (iron_storage_capacity) est corrigé par delta, sans reparcourir les bâtiments.
+    """
+
+    def __init__(self):
+        self.storages = {}  # {(ligne, colonne): Building}
+        self.neighbor_counts = {}  # {(ligne, colonne): nombre de stockages adjacents}
+        self.parent = {}
+        self.cluster_sizes = {}  # Indexé par la racine du groupe
+        self.total_capacity_increase = 0
+
+    # --- Union-find ---
+    def find(self, cell):
+        root = cell
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[cell] != root:  # Compression de chemin
+            self.parent[cell], cell = root, self.parent[cell]
+        return root
+
+    def union(self, cell_a, cell_b):
+        root_a, root_b = self.find(cell_a), self.find(cell_b)
+        if root_a == root_b: return
+        if self.cluster_sizes[root_a] < self.cluster_sizes[root_b]: root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.cluster_sizes[root_a] += self.cluster_sizes.pop(root_b)
+
+    def get_cluster_size(self, cell):
+        if cell not in self.storages: return 0
+        return self.cluster_sizes[self.find(cell)]
+
+    # --- Ajout / retrait ---
+    def get_adjacent_storage_cells(self, cell):
+        r, c = cell
+        return [(r + dr, c + dc) for dr, dc in NEIGHBOR_OFFSETS if (r + dr, c + dc) in self.storages]
+
+    def _set_neighbor_count(self, cell, count):
+        storage = self.storages[cell]
+        old_bonus = storage.current_adjacency_bonus_value
+        self.neighbor_counts[cell] = count
+        storage.apply_adjacency_bonus_effect(count)
+        self.total_capacity_increase += storage.current_adjacency_bonus_value - old_bonus
+
+    def add(self, storage):
+        cell = storage.grid_pos
+        if cell in self.storages: self.remove(self.storages[cell])
+        self.storages[cell] = storage
+        self.parent[cell] = cell
+        self.cluster_sizes[cell] = 1
+        storage.current_adjacency_bonus_value = 0
+        self.total_capacity_increase += storage.iron_storage_increase
+        adjacent_cells = self.get_adjacent_storage_cells(cell)
+        self._set_neighbor_count(cell, len(adjacent_cells))
+        for adjacent_cell in adjacent_cells:
+            self._set_neighbor_count(adjacent_cell, self.neighbor_counts[adjacent_cell] + 1)
+            self.union(cell, adjacent_cell)
+
+    def get_connected_cells(self, start_cell):
+        connected_cells, cells_to_visit = {start_cell}, [start_cell]
+        while cells_to_visit:
+            for adjacent_cell in self.get_adjacent_storage_cells(cells_to_visit.pop()):
+                if adjacent_cell not in connected_cells:
+                    connected_cells.add(adjacent_cell)
+                    cells_to_visit.append(adjacent_cell)
+        return connected_cells
+
+    def remove(self, storage):
+        cell = storage.grid_pos
+        if self.storages.get(cell) is not storage: return
+        cluster_cells = self.get_connected_cells(cell)
+        self.total_capacity_increase -= storage.iron_storage_increase + storage.current_adjacency_bonus_value
+        del self.storages[cell]
+        del self.neighbor_counts[cell]
+        for adjacent_cell in self.get_adjacent_storage_cells(cell):
+            self._set_neighbor_count(adjacent_cell, self.neighbor_counts[adjacent_cell] - 1)
+        # L'union-find ne sait pas séparer: seul le groupe de la case retirée est reconstruit
+        cluster_cells.discard(cell)
+        del self.parent[cell]
+        self.cluster_sizes.pop(cell, None)
+        for other in cluster_cells:
+            self.cluster_sizes.pop(other, None)
+            self.parent[other] = other
+            self.cluster_sizes[other] = 1
+        for other in cluster_cells:
+            for adjacent_cell in self.get_adjacent_storage_cells(other):
+                self.union(other, adjacent_cell)
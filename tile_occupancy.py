@@ -0,0 +1,73 @@
+# tile_occupancy.py
+import objects
+
+# --- Couches d'occupation d'une case ---
+LAYER_STRUCTURE = 0  # Fondations et structures (frame)
+LAYER_BUILDING = 1  # Mines, générateurs, stockages, ruines
+LAYER_TURRET = 2  # Tourelles posées sur une structure
+NUM_LAYERS = 3
+
+STRUCTURE_TYPES = ("foundation", "frame")
+
+
+def get_layer_for_item(item):
+    if isinstance(item, objects.Turret): return LAYER_TURRET
+    if item.type in STRUCTURE_TYPES: return LAYER_STRUCTURE
+    return LAYER_BUILDING
+
+
+class TileOccupancyIndex:
+    """
+    Index d'occupation de la grille par couches: une case peut contenir à la fois une structure
+    et une tourelle, ce que game_grid (un seul objet par case) ne représente pas.
+    Chaque couche est un dict {(ligne, colonne): objet} -> lecture en O(1).
+    Le nombre d'objets par type est tenu à jour pour les conditions du tutoriel.
+    """
+
+    def __init__(self):
+        self.layers = [{} for _ in range(NUM_LAYERS)]
+        self.type_counts = {}
+        self.changed_tiles = set()  # Cases modifiées depuis le dernier pop_changed_tiles()
+
+    def place(self, item):
+        # Remplace ce qui occupait la même couche sur la case de l'objet
+        layer = self.layers[get_layer_for_item(item)]
+        previous_item = layer.get(item.grid_pos)
+        if previous_item is not None: self._decrement_type(previous_item.type)
+        layer[item.grid_pos] = item
+        self.changed_tiles.add(item.grid_pos)
+        self.type_counts[item.type] = self.type_counts.get(item.type, 0) + 1
+
+    def remove(self, item):
+        layer = self.layers[get_layer_for_item(item)]
+        if layer.get(item.grid_pos) is item:
+            del layer[item.grid_pos]
+            self.changed_tiles.add(item.grid_pos)
+            self._decrement_type(item.type)
+
+    def _decrement_type(self, item_type):
+        remaining = self.type_counts.get(item_type, 0) - 1
+        if remaining > 0:
+            self.type_counts[item_type] = remaining
+        else:
+            self.type_counts.pop(item_type, None)
+
+    def get(self, layer, grid_r, grid_c):
+        return self.layers[layer].get((grid_r, grid_c))
+
+    def get_top(self, grid_r, grid_c):
+        # Même objet que game_grid[r][c]: le bâtiment s'il y en a un, sinon la structure
+        building = self.layers[LAYER_BUILDING].get((grid_r, grid_c))
+        if building is not None: return building
+        return self.layers[LAYER_STRUCTURE].get((grid_r, grid_c))
+
+    def has_turret(self, grid_r, grid_c):
+        return (grid_r, grid_c) in self.layers[LAYER_TURRET]
+
+    def pop_changed_tiles(self):
+        changed_tiles = self.changed_tiles
+        self.changed_tiles = set()
+        return changed_tiles
+
+    def has_type(self, item_type):
+        return self.type_counts.get(item_type, 0) > 0
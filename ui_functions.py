@@ -6,18 +6,40 @@ import utility_functions as util  # Gardez l'alias util si vous l'utilisez aille
 import objects  # Import nécessaire pour get_item_stats si utilisé ailleurs
 import math  # Ajouté car scaler._scale_dim_floor/font utilise math.floor/round
 import os  # For os.path.join in initialize_build_menu_layout
+import quality_governor
+import frame_profiler
 
 # --- Constantes spécifiques à l'UI (si non déjà dans cfg) ---
 TOOLTIP_BG_COLOR = (30, 30, 30, 220)  # Fond semi-transparent pour les tooltips
 TOOLTIP_TEXT_COLOR = cfg.COLOR_WHITE
 
+# Surfaces de voile semi-transparent (pause, game over), créées une seule fois par taille/couleur
+overlay_surface_cache = {}
+
+
+def get_overlay_surface(size, color):
+    key = (size, color)
+    if key not in overlay_surface_cache:
+        overlay = pygame.Surface(size, pygame.SRCALPHA)
+        overlay.fill(color)
+        overlay_surface_cache[key] = overlay
+    return overlay_surface_cache[key]
+
+
+def get_hovered_button_action(buttons_layout, mouse_pos):
+    for btn_info in buttons_layout:
+        if btn_info["rect"].collidepoint(mouse_pos):
+            return btn_info["action"]
+    return None
+
 # --- Menu Principal ---
 
 main_menu_options = [
     {"text": "Jouer", "action": cfg.STATE_GAMEPLAY, "key": pygame.K_1},
     {"text": "Tutoriel", "action": cfg.STATE_TUTORIAL, "key": pygame.K_2},
     # {"text": "Lore",            "action": cfg.STATE_LORE,     "key": pygame.K_3},
-    {"text": "Quitter", "action": cfg.STATE_QUIT, "key": pygame.K_3},
+    {"text": "Options", "action": cfg.STATE_OPTIONS, "key": pygame.K_3},
+    {"text": "Quitter", "action": cfg.STATE_QUIT, "key": pygame.K_4},
 ]
 
 main_menu_rendered_rects = {}
@@ -33,8 +55,6 @@ def draw_main_menu(screen, scaler: Scaler):
     global main_menu_rendered_rects
     main_menu_rendered_rects = {}
 
-    screen.fill(cfg.COLOR_MENU_BACKGROUND)  # Full screen background
-
     usable_center_x, usable_center_y = scaler.get_center_of_usable_area()
 
     title_surf = util.render_text_surface(cfg.GAME_TITLE, scaler.font_size_title, cfg.COLOR_TITLE_TEXT)
@@ -44,7 +64,7 @@ def draw_main_menu(screen, scaler: Scaler):
     title_rect = title_surf.get_rect(center=(usable_center_x, title_y_abs))
     screen.blit(title_surf, title_rect)
 
-    mouse_pos = pygame.mouse.get_pos()
+    mouse_pos = util.get_mouse_pos()
     num_options = len(main_menu_options)
 
     button_height_approx = scaler.scale_value(cfg.BASE_MAIN_MENU_BUTTON_HEIGHT)
@@ -76,6 +96,13 @@ def draw_main_menu(screen, scaler: Scaler):
         current_y_center += button_height_approx + button_spacing
 
 
+def get_main_menu_hovered_action(mouse_pos):
+    for action, rect in main_menu_rendered_rects.items():
+        if rect and rect.collidepoint(mouse_pos):
+            return action
+    return None
+
+
 def check_main_menu_click(event, mouse_pos, scaler: Scaler):
     if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
         for action, rect in main_menu_rendered_rects.items():
@@ -92,7 +119,6 @@ def check_main_menu_click(event, mouse_pos, scaler: Scaler):
 
 
 def draw_lore_screen(screen, scaler: Scaler):
-    screen.fill(cfg.COLOR_MENU_BACKGROUND)
     lore_text = [
         "Année 1941. L'ennemi déferle du ciel.",
         "Votre mission: construire et défendre la dernière ligne.",
@@ -241,37 +267,6 @@ def draw_top_bar_ui(screen, game_state, scaler: Scaler):
                 screen.blit(warning_surf, warning_rect)
 
 
-def draw_base_grid(screen, game_state, scaler: Scaler):
-    if not hasattr(game_state, 'buildable_area_rect_pixels') or not game_state.buildable_area_rect_pixels:
-        return
-    grid_origin_x_abs = game_state.buildable_area_rect_pixels.left
-    grid_origin_y_abs = game_state.buildable_area_rect_pixels.top
-    tile_size = scaler.tile_size
-    if tile_size <= 0: return
-
-    for r in range(game_state.grid_height_tiles):
-        for c in range(game_state.grid_width_tiles):
-            tile_rect = pygame.Rect(
-                grid_origin_x_abs + c * tile_size,
-                grid_origin_y_abs + r * tile_size,
-                tile_size, tile_size
-            )
-            is_reinforced_spot = False
-            if hasattr(cfg, 'BASE_GRID_INITIAL_HEIGHT_TILES') and hasattr(game_state, 'get_reinforced_row_index'):
-                reinforced_row_from_top = game_state.get_reinforced_row_index()
-                if r == reinforced_row_from_top and c < game_state.grid_initial_width_tiles:
-                    is_reinforced_spot = True
-
-            color_reinforced = getattr(cfg, 'COLOR_GRID_REINFORCED', (65, 75, 85))
-            color_default = getattr(cfg, 'COLOR_GRID_DEFAULT', (45, 55, 65))
-            color_border = getattr(cfg, 'COLOR_GRID_BORDER', (80, 90, 100))
-            border_thickness = scaler.scale_value(cfg.BASE_GRID_BORDER_THICKNESS)
-
-            tile_color = color_reinforced if is_reinforced_spot else color_default
-            pygame.draw.rect(screen, tile_color, tile_rect)
-            pygame.draw.rect(screen, color_border, tile_rect, border_thickness)
-
-
 build_menu_layout = []
 
 
@@ -396,7 +391,7 @@ def draw_build_menu_ui(screen, game_state, scaler: Scaler):
     border_thickness = scaler.scale_value(cfg.BASE_UI_BORDER_THICKNESS)
     pygame.draw.line(screen, cfg.COLOR_GRID_BORDER, menu_rect_abs.topleft, menu_rect_abs.topright, border_thickness)
 
-    mouse_x, mouse_y = pygame.mouse.get_pos()
+    mouse_x, mouse_y = util.get_mouse_pos()
     hovered_tooltip_text = None
 
     for button_info in build_menu_layout:
@@ -504,11 +499,12 @@ def draw_placement_preview(screen, game_state, scaler: Scaler):
         preview_sprite_orig = game_state.placement_preview_sprite
         preview_sprite_scaled = util.scale_sprite_to_tile(preview_sprite_orig, scaler)
         if preview_sprite_scaled:
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            grid_origin_abs = (game_state.buildable_area_rect_pixels.x, game_state.buildable_area_rect_pixels.y)
-            grid_r, grid_c = util.convert_pixels_to_grid((mouse_x, mouse_y), grid_origin_abs, scaler)
-            if 0 <= grid_r < game_state.grid_height_tiles and 0 <= grid_c < game_state.grid_width_tiles:
-                preview_x, preview_y = util.convert_grid_to_pixels((grid_r, grid_c), grid_origin_abs, scaler)
+            world_mouse_pos = game_state.camera.screen_to_world(util.get_mouse_pos())
+            grid_origin_abs = game_state.grid_origin_pixels
+            grid_r, grid_c = util.convert_pixels_to_grid(world_mouse_pos, grid_origin_abs, scaler)
+            if game_state.is_tile_in_grid(grid_r, grid_c):
+                preview_x, preview_y = game_state.camera.world_to_screen(
+                    util.convert_grid_to_pixels((grid_r, grid_c), grid_origin_abs, scaler))
                 temp_sprite = preview_sprite_scaled.copy()
                 color_tint = cfg.COLOR_PLACEMENT_INVALID
                 if hasattr(game_state, 'is_placement_valid_preview') and game_state.is_placement_valid_preview:
@@ -517,6 +513,22 @@ def draw_placement_preview(screen, game_state, scaler: Scaler):
                 screen.blit(temp_sprite, (preview_x, preview_y))
 
 
+def draw_drag_build_area(screen, game_state, scaler: Scaler):
+    # Contour du rectangle en cours de placement par glisser
+    start_tile = getattr(game_state, 'drag_build_start_tile', None)
+    if not start_tile or not game_state.selected_item_to_place_type or not game_state.is_tile_in_grid(*start_tile):
+        return
+    end_tile = game_state.get_drag_build_end_tile(game_state.camera.screen_to_world(util.get_mouse_pos()))
+    if end_tile == start_tile: return
+    top_left = util.convert_grid_to_pixels((min(start_tile[0], end_tile[0]), min(start_tile[1], end_tile[1])),
+                                           game_state.grid_origin_pixels, scaler)
+    width_tiles = abs(start_tile[1] - end_tile[1]) + 1
+    height_tiles = abs(start_tile[0] - end_tile[0]) + 1
+    area_rect = pygame.Rect(game_state.camera.world_to_screen(top_left),
+                            (width_tiles * scaler.tile_size, height_tiles * scaler.tile_size))
+    pygame.draw.rect(screen, cfg.COLOR_PLACEMENT_VALID, area_rect, scaler.scale_value(cfg.BASE_DRAG_BUILD_BORDER_THICKNESS))
+
+
 def draw_error_message(screen, message, game_state, scaler: Scaler):
     if not message or not hasattr(game_state, 'error_message_timer') or game_state.error_message_timer <= 0:
         return
@@ -562,8 +574,7 @@ def initialize_pause_menu_layout(scaler: Scaler):
 def draw_pause_screen(screen, scaler: Scaler):
     if not pause_menu_buttons_layout: initialize_pause_menu_layout(scaler)
     if not pause_menu_buttons_layout: return
-    overlay = pygame.Surface((scaler.usable_w, scaler.usable_h), pygame.SRCALPHA)
-    overlay.fill(cfg.COLOR_PAUSE_OVERLAY_BG)
+    overlay = get_overlay_surface((scaler.usable_w, scaler.usable_h), cfg.COLOR_PAUSE_OVERLAY_BG)
     screen.blit(overlay, (scaler.screen_origin_x, scaler.screen_origin_y))
     usable_center_x, _ = scaler.get_center_of_usable_area()
     pause_title_y_abs = scaler.screen_origin_y + scaler.usable_h // 3
@@ -571,7 +582,7 @@ def draw_pause_screen(screen, scaler: Scaler):
     if pause_text_surf:
         text_rect = pause_text_surf.get_rect(center=(usable_center_x, pause_title_y_abs))
         screen.blit(pause_text_surf, text_rect)
-    mouse_pos = pygame.mouse.get_pos()
+    mouse_pos = util.get_mouse_pos()
     border_thickness = scaler.scale_value(cfg.BASE_UI_BUTTON_BORDER_THICKNESS)
     for btn_info in pause_menu_buttons_layout:
         btn_rect = btn_info["rect"]
@@ -625,8 +636,7 @@ def initialize_game_over_layout(scaler: Scaler):
 def draw_game_over_screen(screen, final_score, scaler: Scaler):
     if not game_over_buttons_layout: initialize_game_over_layout(scaler)
     if not game_over_buttons_layout: return
-    overlay = pygame.Surface((scaler.usable_w, scaler.usable_h), pygame.SRCALPHA)
-    overlay.fill(cfg.COLOR_GAMEOVER_OVERLAY_BG)
+    overlay = get_overlay_surface((scaler.usable_w, scaler.usable_h), cfg.COLOR_GAMEOVER_OVERLAY_BG)
     screen.blit(overlay, (scaler.screen_origin_x, scaler.screen_origin_y))
     usable_center_x, usable_center_y = scaler.get_center_of_usable_area()
     go_text_surf = util.render_text_surface("GAME OVER", scaler.font_size_xlarge, cfg.COLOR_GAMEOVER_TEXT)
@@ -640,7 +650,7 @@ def draw_game_over_screen(screen, final_score, scaler: Scaler):
         score_rect_y_rel_to_center = scaler.scale_value(cfg.BASE_GAMEOVER_SCORE_Y_OFFSET)
         score_rect = score_text_surf.get_rect(center=(usable_center_x, usable_center_y + score_rect_y_rel_to_center))
         screen.blit(score_text_surf, score_rect)
-    mouse_pos = pygame.mouse.get_pos()
+    mouse_pos = util.get_mouse_pos()
     border_thickness = scaler.scale_value(cfg.BASE_UI_BUTTON_BORDER_THICKNESS)
     for btn in game_over_buttons_layout:
         is_hovered = btn["rect"].collidepoint(mouse_pos)
@@ -684,4 +694,147 @@ def draw_tutorial_message(screen, message, game_state, scaler: Scaler):
             pos_y_abs = top_bar_bottom_y_abs + scaler.ui_general_padding
         pos_x_abs = max(scaler.screen_origin_x, pos_x_abs)
         pos_x_abs = min(scaler.screen_origin_x + scaler.usable_w - msg_surf.get_width(), pos_x_abs)
-        screen.blit(msg_surf, (pos_x_abs, pos_y_abs))
\ No newline at end of file
+        screen.blit(msg_surf, (pos_x_abs, pos_y_abs))
+
+
+def draw_debug_hud(screen, game_state, scaler: Scaler):
+    # Overlays de debug: FPS, temps de frame moyen et palier du gouverneur de qualité, sous la barre du haut
+    governor = quality_governor.governor
+    current_fps = game_state.clock.get_fps() if game_state.clock else 0.0
+    hud_lines = [
+        f"FPS: {current_fps:.0f} / {cfg.FPS}",
+        f"Frame: {governor.get_average_frame_time() * 1000:.1f} ms",
+        f"Qualité: palier {governor.level} ({quality_governor.LEVEL_NAMES[governor.level]})",
+    ]
+    pos_x_abs = scaler.screen_origin_x + scaler.ui_general_padding
+    pos_y_abs = scaler.screen_origin_y + scaler.ui_top_bar_height + scaler.ui_general_padding
+    for hud_line in hud_lines:
+        util.draw_debug_text(screen, hud_line, (pos_x_abs, pos_y_abs), scaler)
+        pos_y_abs += scaler.font_size_small
+
+
+def draw_profiler_overlay(screen, profiler: frame_profiler.FrameProfiler, scaler: Scaler):
+    # Overlay F3: temps moyen par sous-système et courbe des temps de frame, budget (1 / cfg.FPS) en rouge
+    line_height = scaler.font_size_small
+    padding = scaler.ui_general_padding
+    overlay_width = scaler.scale_value(cfg.BASE_PROFILER_OVERLAY_WIDTH)
+    sparkline_height = scaler.scale_value(cfg.BASE_PROFILER_SPARKLINE_HEIGHT)
+    frame_times = profiler.frame_time_history.get_ordered_values()
+    budget_seconds = 1.0 / cfg.FPS if cfg.FPS > 0 else 0.0
+    overlay_lines = [f"Frame: {profiler.frame_time_history.average() * 1000:.2f} ms "
+                     f"(budget {budget_seconds * 1000:.1f} ms)"]
+    overlay_lines += [f"{zone_name}: {profiler.get_zone_average_ms(zone_name):.2f} ms"
+                      for zone_name in frame_profiler.ZONES]
+    overlay_height = padding * 3 + line_height * len(overlay_lines) + sparkline_height
+    overlay_rect = pygame.Rect(scaler.screen_origin_x + scaler.usable_w - overlay_width - padding,
+                               scaler.screen_origin_y + scaler.ui_top_bar_height + padding,
+                               overlay_width, overlay_height)
+    background = pygame.Surface(overlay_rect.size, pygame.SRCALPHA)
+    background.fill(cfg.COLOR_PROFILER_OVERLAY_BG)
+    screen.blit(background, overlay_rect.topleft)
+    pos_y_abs = overlay_rect.top + padding
+    for overlay_line in overlay_lines:
+        util.draw_debug_text(screen, overlay_line, (overlay_rect.left + padding, pos_y_abs), scaler)
+        pos_y_abs += line_height
+    # Courbe: la plus récente à droite, échelle verticale à au moins deux fois le budget
+    sparkline_rect = pygame.Rect(overlay_rect.left + padding, pos_y_abs + padding,
+                                 overlay_width - 2 * padding, sparkline_height)
+    max_frame_time = max(max(frame_times, default=0.0), budget_seconds * 2) or 1.0
+    if budget_seconds > 0:
+        budget_y = sparkline_rect.bottom - round(budget_seconds / max_frame_time * sparkline_rect.height)
+        pygame.draw.line(screen, cfg.COLOR_PROFILER_BUDGET_LINE, (sparkline_rect.left, budget_y),
+                         (sparkline_rect.right, budget_y))
+    if len(frame_times) >= 2:
+        step_x = sparkline_rect.width / (profiler.frame_time_history.size - 1)
+        first_x = sparkline_rect.right - step_x * (len(frame_times) - 1)
+        sparkline_points = [(round(first_x + i * step_x),
+                             sparkline_rect.bottom - round(frame_time / max_frame_time * sparkline_rect.height))
+                            for i, frame_time in enumerate(frame_times)]
+        pygame.draw.lines(screen, cfg.COLOR_PROFILER_SPARKLINE, False, sparkline_points)
+
+
+# --- Menu Options ---
+OPTIONS_MENU_ROWS = [
+    {"key": "preset", "label": "Préréglage"},
+    {"key": "render_scale", "label": "Échelle de rendu"},
+    {"key": "fps_cap", "label": "Limite FPS"},
+    {"key": "vsync", "label": "VSync"},
+    {"key": "smooth_scaling", "label": "Lissage des sprites"},
+    {"key": "flame_particle_density", "label": "Particules lance-flammes"},
+    {"key": "show_hp_bars", "label": "Barres de vie"},
+    {"key": "debug_overlays", "label": "Overlays de debug"},
+]
+OPTIONS_PRESET_NAMES = {"low": "Bas", "medium": "Moyen", "high": "Élevé", "custom": "Personnalisé"}
+
+options_menu_layout = []  # action = clé du réglage (clic: valeur suivante) ou "back"
+
+
+def initialize_options_menu_layout(scaler: Scaler):
+    global options_menu_layout
+    options_menu_layout = []
+    btn_width = scaler.scale_value(cfg.BASE_OPTIONS_MENU_BUTTON_WIDTH)
+    btn_height = scaler.scale_value(cfg.BASE_OPTIONS_MENU_BUTTON_HEIGHT)
+    spacing = scaler.scale_value(cfg.BASE_OPTIONS_MENU_SPACING)
+    usable_center_x, _ = scaler.get_center_of_usable_area()
+    block_start_y_abs = scaler.screen_origin_y + scaler.scale_value(cfg.BASE_OPTIONS_MENU_START_Y_OFFSET)
+    rows = OPTIONS_MENU_ROWS + [{"key": "back", "label": "Retour"}]
+    for i, row in enumerate(rows):
+        rect = pygame.Rect(usable_center_x - btn_width // 2, block_start_y_abs + i * (btn_height + spacing),
+                           btn_width, btn_height)
+        options_menu_layout.append({"text": row["label"], "rect": rect, "action": row["key"]})
+    if cfg.DEBUG_MODE: print("UI DEBUG: Options menu layout initialized.")
+
+
+def format_option_value(key, value):
+    if key == "preset": return OPTIONS_PRESET_NAMES.get(value, value)
+    if isinstance(value, bool): return "Oui" if value else "Non"
+    if isinstance(value, float): return f"{round(value * 100)}%"
+    return str(value)
+
+
+def draw_options_screen(screen, current_settings, scaler: Scaler):
+    if not options_menu_layout: initialize_options_menu_layout(scaler)
+    usable_center_x, _ = scaler.get_center_of_usable_area()
+    title_surf = util.render_text_surface("Options", scaler.font_size_xlarge, cfg.COLOR_TITLE_TEXT)
+    if title_surf:
+        title_y_abs = scaler.screen_origin_y + scaler.scale_value(cfg.BASE_OPTIONS_MENU_START_Y_OFFSET) // 2
+        screen.blit(title_surf, title_surf.get_rect(center=(usable_center_x, title_y_abs)))
+    mouse_pos = util.get_mouse_pos()
+    border_thickness = scaler.scale_value(cfg.BASE_UI_BUTTON_BORDER_THICKNESS)
+    for btn_info in options_menu_layout:
+        btn_rect = btn_info["rect"]
+        is_hovered = btn_rect.collidepoint(mouse_pos)
+        bg_color = cfg.COLOR_BUTTON_HOVER_BG if is_hovered else cfg.COLOR_BUTTON_BG
+        border_color_current = cfg.COLOR_BUTTON_HOVER_BORDER if is_hovered else cfg.COLOR_BUTTON_BORDER
+        pygame.draw.rect(screen, bg_color, btn_rect)
+        pygame.draw.rect(screen, border_color_current, btn_rect, border_thickness)
+        button_text = btn_info["text"]
+        if btn_info["action"] in current_settings:
+            button_text += f" : {format_option_value(btn_info['action'], current_settings[btn_info['action']])}"
+        text_surf = util.render_text_surface(button_text, scaler.font_size_medium, cfg.COLOR_TEXT)
+        if text_surf:
+            screen.blit(text_surf, text_surf.get_rect(center=btn_rect.center))
+
+
+def check_options_menu_click(event, mouse_pos, scaler: Scaler):
+    if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+        return get_hovered_button_action(options_menu_layout, mouse_pos)
+    return None
+
+
+# --- Layouts et redimensionnement ---
+layouts_scale_generation = None  # Génération du Scaler pour laquelle les layouts ont été calculés
+
+
+def ensure_layouts_current(game_state, scaler: Scaler):
+    # Appelé au démarrage et après chaque redimensionnement (resize_display dans main.py, replay_player.py):
+    # sans effet si le Scaler n'a pas changé de génération depuis le dernier calcul des layouts
+    global layouts_scale_generation
+    if layouts_scale_generation == scaler.generation: return
+    layouts_scale_generation = scaler.generation
+    overlay_surface_cache.clear()  # Voiles à la taille d'écran précédente (un par taille traversée en redimensionnant)
+    initialize_main_menu_layout(scaler)
+    initialize_build_menu_layout(game_state, scaler)  # Passe game_state pour les coûts
+    initialize_pause_menu_layout(scaler)
+    initialize_game_over_layout(scaler)
+    initialize_options_menu_layout(scaler)
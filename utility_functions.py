@@ -3,20 +3,34 @@ import pygame
 import os
 import math  # Importé pour math.floor et math.round
 import game_config as cfg
+import quality_governor
 
 
 class Scaler:
     def __init__(self, actual_screen_width, actual_screen_height,
                  ref_width=cfg.REF_WIDTH, ref_height=cfg.REF_HEIGHT):
-        self.actual_w = actual_screen_width
-        self.actual_h = actual_screen_height
         self.ref_w = ref_width
         self.ref_h = ref_height
+        # Incrémenté à chaque rebuild(): les caches de sprites / layouts se re-dérivent en le comparant
+        self.generation = 0
+        self._compute_dimensions(actual_screen_width, actual_screen_height)
+
+    def rebuild(self, actual_screen_width, actual_screen_height):
+        # Redimensionnement de la fenêtre: recalcul sur place, les objets gardent la même référence au Scaler
+        self._compute_dimensions(actual_screen_width, actual_screen_height)
+        self.generation += 1
+        # Clés à la taille de case / de barre de l'ancienne échelle: jamais réutilisées, on ne les garde pas
+        hp_bar_cache.clear()
+        scaled_tile_sprite_cache.clear()
+
+    def _compute_dimensions(self, actual_screen_width, actual_screen_height):
+        self.actual_w = actual_screen_width
+        self.actual_h = actual_screen_height
 
-        # Marges réelles en pixels
+        # Marges réelles en pixels (marges de la fenêtre ramenées à la surface de rendu, cf. cfg.RENDER_SCALE)
         # Ensure these are defined in game_config.py, otherwise default to a single SCREEN_MARGIN
-        self.screen_margin_v = getattr(cfg, 'SCREEN_MARGIN_VERTICAL', cfg.SCREEN_MARGIN_VERTICAL)
-        self.screen_margin_h = getattr(cfg, 'SCREEN_MARGIN_HORIZONTAL', cfg.SCREEN_MARGIN_HORIZONTAL)
+        self.screen_margin_v = int(getattr(cfg, 'SCREEN_MARGIN_VERTICAL', cfg.SCREEN_MARGIN_VERTICAL) * cfg.RENDER_SCALE)
+        self.screen_margin_h = int(getattr(cfg, 'SCREEN_MARGIN_HORIZONTAL', cfg.SCREEN_MARGIN_HORIZONTAL) * cfg.RENDER_SCALE)
 
         # Origine de la zone utilisable sur l'écran réel
         self.screen_origin_x = self.screen_margin_h
@@ -59,6 +73,10 @@ class Scaler:
 
         self.scaled_grid_offset_x = self._scale_dim_floor(cfg.BASE_GRID_OFFSET_X)
 
+        self.enemy_hp_bar_w = self._scale_dim_floor(cfg.BASE_ENEMY_HP_BAR_WIDTH)
+        self.enemy_hp_bar_h = self._scale_dim_floor(cfg.BASE_ENEMY_HP_BAR_HEIGHT)
+        self.enemy_hp_bar_offset_y = self._scale_dim_floor(cfg.BASE_ENEMY_HP_BAR_OFFSET_Y)
+
         self.font_size_small = self._scale_dim_font(cfg.BASE_FONT_SIZE_SMALL)
         self.font_size_medium = self._scale_dim_font(cfg.BASE_FONT_SIZE_MEDIUM)
         self.font_size_large = self._scale_dim_font(cfg.BASE_FONT_SIZE_LARGE)
@@ -121,13 +139,25 @@ class Scaler:
 sprite_cache = {}
 font_cache = {}
 sound_cache = {}
+hp_bar_cache = {}  # (largeur, hauteur, largeur remplie, couleur) -> Surface de barre de vie pré-rendue
+scaled_tile_sprite_cache = {}  # (sprite original, taille de case, lissage) -> sprite mis à l'échelle, partagé (ne pas modifier)
+cache_stats = {}  # Nom du cache -> [succès, échecs], exporté par metrics_server
+cache_stats_enabled = False  # Compteurs tenus seulement pendant que metrics_server exporte (start/stop)
 # Ensure FAILSAFE_SPRITE_PATH is a valid path, e.g., taken from a known existing sprite in your assets
 # This might need adjustment if your turret path or mortar_sketch.png changes.
 FAILSAFE_SPRITE_PATH = os.path.join(cfg.ASSET_PATH, "turrets", "mortar_sketch.png")
 
 
+def count_cache_lookup(cache_name, is_hit):
+    if not cache_stats_enabled: return
+    counters = cache_stats.get(cache_name)
+    if counters is None: counters = cache_stats[cache_name] = [0, 0]
+    counters[0 if is_hit else 1] += 1
+
+
 def load_sprite(path, use_alpha=True, specific_fallback_path=None):
     cache_key = path
+    count_cache_lookup("sprite", cache_key in sprite_cache)
     if cache_key in sprite_cache:
         return sprite_cache[cache_key]
 
@@ -178,30 +208,66 @@ def load_sprite(path, use_alpha=True, specific_fallback_path=None):
     return sprite_cache.get(cache_key, sprite_cache.get(FAILSAFE_SPRITE_PATH))
 
 
+def scale_surface(surface, size, dest_surface=None):
+    # smoothscale ou plus proche voisin selon les réglages (cfg.SMOOTH_SCALING) et le gouverneur de qualité
+    scale_function = pygame.transform.smoothscale if quality_governor.governor.is_smooth_scaling() \
+        else pygame.transform.scale
+    if dest_surface is None:
+        return scale_function(surface, size)
+    return scale_function(surface, size, dest_surface)
+
+
 def scale_sprite_to_tile(original_sprite, scaler: Scaler):
     if not original_sprite or not scaler: return None
     try:
         tile_w = max(1, scaler.tile_size)
         tile_h = max(1, scaler.tile_size)
-        return pygame.transform.smoothscale(original_sprite, (tile_w, tile_h))
+        return scale_surface(original_sprite, (tile_w, tile_h))
     except pygame.error as e:
         if cfg.DEBUG_MODE: print(f"ERREUR: scale_sprite_to_tile échoué: {e}")
         return original_sprite
 
 
+def get_scaled_tile_sprite(original_sprite, scaler: Scaler):
+    # Version partagée de scale_sprite_to_tile: la surface renvoyée ne doit pas être modifiée
+    if not original_sprite or not scaler: return None
+    key = (original_sprite, scaler.tile_size, quality_governor.governor.is_smooth_scaling())
+    scaled_sprite = scaled_tile_sprite_cache.get(key)
+    count_cache_lookup("scaled_tile_sprite", scaled_sprite is not None)
+    if scaled_sprite is None:
+        scaled_sprite = scale_sprite_to_tile(original_sprite, scaler)
+        scaled_tile_sprite_cache[key] = scaled_sprite
+    return scaled_sprite
+
+
 def scale_sprite_to_size(original_sprite, target_width, target_height):
     if not original_sprite: return None
     tw, th = max(1, int(target_width)), max(1, int(target_height))
     try:
-        return pygame.transform.smoothscale(original_sprite, (tw, th))
+        return scale_surface(original_sprite, (tw, th))
     except pygame.error as e:
         if cfg.DEBUG_MODE: print(f"ERREUR: scale_sprite_to_size échoué pour ({tw}x{th}): {e}")
         return original_sprite
 
 
+def get_hp_bar_surface(bar_w, bar_h, fill_w, fill_color):
+    # La largeur remplie est déjà quantifiée au pixel: au plus (bar_w + 1) surfaces par couleur
+    key = (bar_w, bar_h, fill_w, fill_color)
+    bar_surf = hp_bar_cache.get(key)
+    count_cache_lookup("hp_bar", bar_surf is not None)
+    if bar_surf is None:
+        bar_surf = pygame.Surface((bar_w, bar_h))
+        bar_surf.fill(cfg.COLOR_HP_BAR_BACKGROUND)
+        if fill_w > 0:
+            bar_surf.fill(fill_color, pygame.Rect(0, 0, fill_w, bar_h))
+        hp_bar_cache[key] = bar_surf
+    return bar_surf
+
+
 def get_font(scaled_size, font_name=cfg.FONT_NAME_DEFAULT):
     safe_scaled_size = max(1, scaled_size)
     key = (font_name, safe_scaled_size)
+    count_cache_lookup("font", key in font_cache)
 
     if key not in font_cache:
         try:
@@ -286,6 +352,24 @@ def convert_pixels_to_grid(pixel_pos_tuple, grid_origin_xy_pixels, scaler: Scale
     return (grid_row, grid_col)
 
 
+# Rapport surface de rendu / fenêtre (cf. cfg.RENDER_SCALE), tenu à jour par main.py
+window_to_render_ratio = (1.0, 1.0)
+
+
+def set_render_surface_size(render_size, window_size):
+    global window_to_render_ratio
+    window_to_render_ratio = (render_size[0] / max(1, window_size[0]), render_size[1] / max(1, window_size[1]))
+
+
+def window_to_render_pos(window_pos):
+    return int(window_pos[0] * window_to_render_ratio[0]), int(window_pos[1] * window_to_render_ratio[1])
+
+
+def get_mouse_pos():
+    # pygame.mouse.get_pos() ramené aux coordonnées de la surface de rendu
+    return window_to_render_pos(pygame.mouse.get_pos())
+
+
 def draw_debug_rect(surface, rect, color=cfg.COLOR_RED, width=1):
     if rect and isinstance(rect, pygame.Rect):
         pygame.draw.rect(surface, color, rect, width)